@@ -0,0 +1,5 @@
+"""
+Benchmarks of the simulation, windowing and loading hot paths
+
+Run with `python -m benchmarks.run`, see benchmarks/run.py.
+"""
@@ -0,0 +1,20 @@
+"""
+Benchmarks of the package import time, as paid by every CLI call and worker process
+"""
+
+import subprocess
+import sys
+
+
+class ImportTime:
+    """Import of the package and of its entry points in a fresh interpreter"""
+    params = ([
+        "portfolio_simulations",
+        "portfolio_simulations.rebalancing",
+        "portfolio_simulations.portfolio",
+        "portfolio_simulations.cli",
+    ],)
+    param_names = ["module"]
+
+    def time_import(self, module):
+        subprocess.run([sys.executable, "-c", f"import {module}"], check=True)
@@ -0,0 +1,46 @@
+"""
+Benchmarks of building assets from custom series and of bulk loading panels
+"""
+
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+from benchmarks.synthetic import synthetic_prices
+from portfolio_simulations.asset import Asset
+from portfolio_simulations.loaders import read_prices, save_prices
+from portfolio_simulations.panel import PricePanel
+
+
+class Ingestion:
+    """Custom assets from lists and arrays, and panels read from CSV and .npy files, as series grow"""
+    params = ([100, 1000],)
+    param_names = ["num_series"]
+
+    def setup(self, num_series):
+        dates, prices = synthetic_prices(num_series, 10)
+        self.dates, self.prices = dates, np.asfortranarray(prices)
+        self.names = [f"ASSET{column}" for column in range(num_series)]
+        self.directory = tempfile.mkdtemp()
+        panel = PricePanel(self.dates, self.prices, self.names)
+        save_prices(panel, os.path.join(self.directory, "panel"))
+        frame = pd.DataFrame(self.prices, columns=self.names)
+        frame.insert(0, "Date", self.dates)
+        frame.to_csv(os.path.join(self.directory, "prices.csv"), index=False)
+
+    def time_assets_from_lists(self, num_series):
+        dates = list(self.dates)
+        for column in range(min(len(self.names), 100)):
+            Asset(self.names[column], 1.0, values=list(self.prices[:, column]), dates=dates)
+
+    def time_assets_from_arrays(self, num_series):
+        for column in range(min(len(self.names), 100)):
+            Asset(self.names[column], 1.0, values=self.prices[:, column], dates=self.dates)
+
+    def time_read_csv(self, num_series):
+        read_prices(os.path.join(self.directory, "prices.csv"))
+
+    def time_read_npy_panel(self, num_series):
+        panel = read_prices(os.path.join(self.directory, "panel"))
+        for name in panel.names:
+            panel.asset(name, 1.0)
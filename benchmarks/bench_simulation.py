@@ -0,0 +1,122 @@
+"""
+Benchmarks of the return distribution and Monte Carlo statistics
+"""
+
+from datetime import datetime
+from benchmarks.synthetic import synthetic_portfolio, synthetic_prices
+from portfolio_simulations.portfolio import Portfolio
+from portfolio_simulations.rebalancing import Rebalancing
+from portfolio_simulations.utils import (
+    bootstrap_portfolio_paths, calculate_portfolio_statistics, daily_log_returns, estimate_daily_moments,
+    simulate_portfolio_paths
+)
+
+
+class ReturnDistribution:
+    """compute_return_distribution as assets, history and simulations grow"""
+    params = ([2, 20], [10, 30], [1000, 10000])
+    param_names = ["num_assets", "num_years", "num_simulations"]
+
+    def setup(self, num_assets, num_years, num_simulations):
+        self.portfolio = synthetic_portfolio(num_assets, num_years)
+        self.portfolio.panel
+
+    def time_vectorized(self, num_assets, num_years, num_simulations):
+        self.portfolio.compute_return_distribution(rolling_window=5, num_simulations=num_simulations, replace=True)
+
+    def time_exhaustive(self, num_assets, num_years, num_simulations):
+        self.portfolio.compute_return_distribution(rolling_window=5, exhaustive=True)
+
+
+class ReturnDistributionLoop:
+    """compute_return_distribution through the per-window reference engine"""
+    params = ([2, 20], [10], [100])
+    param_names = ["num_assets", "num_years", "num_simulations"]
+
+    def setup(self, num_assets, num_years, num_simulations):
+        self.portfolio = synthetic_portfolio(num_assets, num_years)
+
+    def time_loop(self, num_assets, num_years, num_simulations):
+        self.portfolio.compute_return_distribution(rolling_window=5, num_simulations=num_simulations, engine="loop")
+
+
+class WeightSweep:
+    """sweep_weights over Dirichlet candidates on every window"""
+    params = ([5, 20], [1000, 10000])
+    param_names = ["num_assets", "num_candidates"]
+
+    def setup(self, num_assets, num_candidates):
+        self.portfolio = synthetic_portfolio(num_assets, 20)
+        self.portfolio.panel
+
+    def time_dirichlet(self, num_assets, num_candidates):
+        self.portfolio.sweep_weights(candidates="dirichlet", num_candidates=num_candidates, seed=0)
+
+
+class PortfolioStatistics:
+    """calculate_portfolio_statistics and the path engines as the simulation count grows"""
+    params = ([2, 20], [10000, 1000000])
+    param_names = ["num_assets", "num_simulations"]
+
+    def setup(self, num_assets, num_simulations):
+        self.portfolio = synthetic_portfolio(num_assets, 10)
+        self.moments = estimate_daily_moments(self.portfolio.panel)
+        self.returns = daily_log_returns(self.portfolio.panel)
+        self.weights = [asset.weight for asset in self.portfolio.assets]
+
+    def time_calculate_portfolio_statistics(self, num_assets, num_simulations):
+        calculate_portfolio_statistics(
+            self.portfolio.assets, datetime(1991, 1, 1), datetime(1998, 1, 1), num_simulations=num_simulations, seed=0
+        )
+
+    def time_simulate_portfolio_paths(self, num_assets, num_simulations):
+        simulate_portfolio_paths(
+            self.moments["mean"], self.moments["cov"], self.weights,
+            num_simulations=num_simulations // 100, num_steps=252, seed=0
+        )
+
+    def time_bootstrap_portfolio_paths(self, num_assets, num_simulations):
+        bootstrap_portfolio_paths(self.returns, self.weights, num_simulations=num_simulations // 100, num_steps=252, seed=0)
+
+
+class RebalancedPaths:
+    """simulate_portfolio_paths with path-level rebalancing accounting"""
+    params = (["none", "monthly", "threshold"], [10000, 100000])
+    param_names = ["policy", "num_simulations"]
+
+    def setup(self, policy, num_simulations):
+        self.rebalancing = Rebalancing(policy, transaction_cost=0.001, contribution=0.01)
+
+    def time_simulate_portfolio_paths(self, policy, num_simulations):
+        simulate_portfolio_paths(
+            [0.0003, 0.0002, 0.0001], [[1e-4, 0, 0], [0, 5e-5, 0], [0, 0, 2e-5]], [0.5, 0.3, 0.2],
+            num_simulations=num_simulations, num_steps=252, seed=0, rebalancing=self.rebalancing
+        )
+
+
+class IncrementalUpdate:
+    """Daily append of one bar per asset and update of an exhaustive distribution, against a full recompute"""
+    params = ([2, 20], [10, 30])
+    param_names = ["num_assets", "num_years"]
+
+    def setup(self, num_assets, num_years):
+        dates, prices = synthetic_prices(num_assets, num_years)
+        # Days held back, one appended per timed call
+        held = 40
+        self.portfolio = Portfolio()
+        for column in range(num_assets):
+            self.portfolio.add_asset(f"ASSET{column}", 1 / num_assets, values=prices[:-held, column], dates=dates[:-held])
+        self.portfolio.compute_return_distribution(rolling_window=5, exhaustive=True)
+        self.days = [
+            {f"ASSET{column}": (dates[row], prices[row, column]) for column in range(num_assets)}
+            for row in range(len(dates) - held, len(dates))
+        ]
+
+    def time_append_and_update(self, num_assets, num_years):
+        if self.days:
+            self.portfolio.append_bars(self.days.pop(0))
+        self.portfolio.update_return_distribution()
+
+    def time_full_recompute(self, num_assets, num_years):
+        self.portfolio._panel = None
+        self.portfolio.compute_return_distribution(rolling_window=5, exhaustive=True)
@@ -0,0 +1,57 @@
+"""
+Benchmarks of asset windowing, portfolio window returns and calendar building
+"""
+
+import pandas as pd
+from benchmarks.synthetic import synthetic_portfolio
+from portfolio_simulations.return_cache import ReturnCache
+
+
+class Windowing:
+    """Asset.set_window and compute_portfolio_returns as history and assets grow"""
+    params = ([2, 20], [10, 30])
+    param_names = ["num_assets", "num_years"]
+
+    def setup(self, num_assets, num_years):
+        self.portfolio = synthetic_portfolio(num_assets, num_years)
+        # A cache of its own, so that the shared default cache does not carry hits across benchmarks
+        self.portfolio.return_cache = ReturnCache()
+        dates = self.portfolio.assets[0].dates
+        self.starts = [pd.Timestamp(date) for date in dates[:len(dates) // 2:max(1, len(dates) // 200)]]
+
+    def time_set_window(self, num_assets, num_years):
+        asset = self.portfolio.assets[0]
+        for start in self.starts:
+            asset.set_window(start, start + pd.DateOffset(years=5))
+
+    def time_compute_portfolio_returns(self, num_assets, num_years):
+        # Every window return is computed, not read from the cache filled by earlier repeats
+        self.portfolio.return_cache.clear()
+        for start in self.starts:
+            self.portfolio.compute_portfolio_returns(start, start + pd.DateOffset(years=5))
+
+    def time_compute_portfolio_returns_cached(self, num_assets, num_years):
+        # The untimed warm-up run fills the cache, so every window return is a hit
+        for start in self.starts:
+            self.portfolio.compute_portfolio_returns(start, start + pd.DateOffset(years=5))
+
+
+class Calendar:
+    """Shared calendar updates and the price panel as assets and history grow"""
+    params = ([20, 200], [10, 30])
+    param_names = ["num_assets", "num_years"]
+
+    def setup(self, num_assets, num_years):
+        self.portfolio = synthetic_portfolio(num_assets, num_years)
+
+    def time_update_shared_time_window(self, num_assets, num_years):
+        self.portfolio._update_shared_time_window()
+
+    def time_add_remove_asset(self, num_assets, num_years):
+        asset = self.portfolio.assets[0]
+        self.portfolio.remove_asset(asset.asset_name)
+        self.portfolio.add_asset(asset.asset_name, asset.weight, values=asset.closes, dates=asset.dates)
+
+    def time_build_panel(self, num_assets, num_years):
+        self.portfolio._panel = None
+        self.portfolio.panel
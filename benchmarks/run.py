@@ -0,0 +1,139 @@
+"""
+Runner of the benchmark suite
+
+Benchmarks follow the asv layout: classes in benchmarks/bench_*.py with params,
+param_names, an optional setup and time_* methods. Every combination of params
+is timed (median of --repeat runs) and its peak traced memory is recorded.
+
+    python -m benchmarks.run                       # run and print the results
+    python -m benchmarks.run --quick               # only the smallest parameters
+    python -m benchmarks.run --save                # store the results as baselines
+    python -m benchmarks.run --compare             # fail if slower than the baselines
+"""
+
+import argparse
+import gc
+import importlib
+import itertools
+import json
+import os
+import pkgutil
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Dict, Iterator, Tuple
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(BENCHMARK_DIR, "baselines.json")
+
+
+def discover(pattern: str = "") -> Iterator[Tuple[str, type, str]]:
+    """
+    Yield (module, class, method) of every time_* benchmark whose name contains pattern.
+    """
+    for module_info in pkgutil.iter_modules([BENCHMARK_DIR]):
+        if not module_info.name.startswith("bench_"):
+            continue
+        module = importlib.import_module(f"benchmarks.{module_info.name}")
+        for name, cls in vars(module).items():
+            if not isinstance(cls, type) or cls.__module__ != module.__name__:
+                continue
+            for method in sorted(vars(cls)):
+                full_name = f"{module_info.name}.{name}.{method}"
+                if method.startswith("time_") and pattern in full_name:
+                    yield full_name, cls, method
+
+
+def run_benchmark(cls: type, method: str, params: Tuple, repeat: int) -> Dict[str, float]:
+    """
+    Median wall time and peak traced memory of one benchmark for one combination of params.
+    """
+    instance = cls()
+    if hasattr(instance, "setup"):
+        instance.setup(*params)
+    function = getattr(instance, method)
+
+    function(*params)
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        function(*params)
+        times.append(time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        function(*params)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"seconds": statistics.median(times), "peak_bytes": peak}
+
+
+def run_suite(pattern: str = "", quick: bool = False, repeat: int = 5) -> Dict[str, Dict[str, float]]:
+    """
+    Run every matching benchmark over its parameter grid.
+
+    Returns:
+        Dictionary of results keyed by "module.Class.method(name=value, ...)"
+    """
+    results = {}
+    for full_name, cls, method in discover(pattern):
+        grid = [values[:1] if quick else values for values in cls.params]
+        for params in itertools.product(*grid):
+            key = f"{full_name}({', '.join(f'{n}={v}' for n, v in zip(cls.param_names, params))})"
+            results[key] = run_benchmark(cls, method, params, repeat)
+            print(f"{key:<100} {results[key]['seconds'] * 1000:>10.2f} ms {results[key]['peak_bytes'] / 2 ** 20:>9.2f} MiB")
+    return results
+
+
+def compare(results: Dict, baselines: Dict, threshold: float) -> list:
+    """
+    Benchmarks whose time or peak memory exceed threshold times their baseline.
+    """
+    regressions = []
+    for key, result in results.items():
+        baseline = baselines.get(key)
+        if baseline is None:
+            continue
+        for metric in ("seconds", "peak_bytes"):
+            if baseline[metric] > 0 and result[metric] > threshold * baseline[metric]:
+                regressions.append(f"{key}: {metric} {result[metric]:.4g} > {threshold} x {baseline[metric]:.4g}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Portfolio Simulations benchmarks")
+    parser.add_argument("--filter", default="", help="Only run benchmarks whose name contains this text")
+    parser.add_argument("--quick", action="store_true", help="Only run the smallest parameters")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs of each benchmark")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline file")
+    parser.add_argument("--save", action="store_true", help="Store the results in the baseline file")
+    parser.add_argument("--compare", action="store_true", help="Compare the results with the baseline file")
+    parser.add_argument("--threshold", type=float, default=1.5, help="Allowed slowdown ratio before failing")
+    args = parser.parse_args()
+
+    results = run_suite(args.filter, args.quick, args.repeat)
+
+    if args.compare:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+    if args.save:
+        baselines = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baselines = json.load(f)
+        baselines.update(results)
+        with open(args.baseline, "w") as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
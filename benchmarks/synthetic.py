@@ -0,0 +1,33 @@
+"""
+Synthetic price series, so that the benchmarks need no network access
+"""
+
+import numpy as np
+import pandas as pd
+from portfolio_simulations.portfolio import Portfolio
+
+
+def synthetic_prices(num_assets: int, num_years: int, seed: int = 0, start: str = "1990-01-01"):
+    """
+    Business-day prices of correlated geometric random walks.
+
+    Returns:
+        Tuple of the datetime64[ns] dates and the price matrix of shape (dates, assets)
+    """
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(start, periods=num_years * 261).to_numpy(dtype="datetime64[ns]")
+    market = rng.normal(0.0003, 0.008, size=(len(dates), 1))
+    idiosyncratic = rng.normal(0.0, 0.008, size=(len(dates), num_assets))
+    prices = 100 * np.exp(np.cumsum(market + idiosyncratic, axis=0))
+    return dates, prices
+
+
+def synthetic_portfolio(num_assets: int, num_years: int, seed: int = 0) -> Portfolio:
+    """
+    Portfolio of equally weighted synthetic assets.
+    """
+    dates, prices = synthetic_prices(num_assets, num_years, seed)
+    portfolio = Portfolio(seed=seed)
+    for column in range(num_assets):
+        portfolio.add_asset(f"ASSET{column}", weight=1 / num_assets, values=list(prices[:, column]), dates=list(dates))
+    return portfolio
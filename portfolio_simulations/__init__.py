@@ -2,18 +2,92 @@
 Portfolio Simulations Package
 
 A Python package for simulating portfolio returns and analyzing investment strategies.
+
+The public names are imported from their module on first access (PEP 562), so
+importing the package or a compute module such as portfolio_simulations.rebalancing
+does not load pandas, matplotlib or yfinance until they are needed.
 """
 
-from .asset import Asset
-from .portfolio import Portfolio
-from .utils import calculate_portfolio_statistics
+import importlib
+from typing import TYPE_CHECKING
 
 __version__ = "0.0.0"
 __author__ = "Emanuele Gugliandolo"
 __email__ = "emanuelegugliandolo@gmail.com"
 
+# Module of each public name
+_LAZY_NAMES = {
+    "Asset": "asset",
+    "AssetWindow": "asset",
+    "Portfolio": "portfolio",
+    "PriceCache": "cache",
+    "PricePanel": "panel",
+    "Rebalancing": "rebalancing",
+    "ResultStore": "store",
+    "ReturnCache": "return_cache",
+    "StreamingResults": "results",
+    "bootstrap_portfolio_paths": "utils",
+    "calculate_portfolio_statistics": "utils",
+    "daily_log_returns": "utils",
+    "dirichlet_weights": "sweep",
+    "estimate_daily_moments": "utils",
+    "load_directory": "loaders",
+    "read_prices": "loaders",
+    "sample_windows": "sampling",
+    "save_prices": "loaders",
+    "simulate_portfolio_paths": "utils",
+    "weight_grid": "sweep",
+}
+
 __all__ = [
     "Asset",
-    "Portfolio", 
-    "calculate_portfolio_statistics"
+    "AssetWindow",
+    "Portfolio",
+    "PriceCache",
+    "PricePanel",
+    "Rebalancing",
+    "ResultStore",
+    "ReturnCache",
+    "bootstrap_portfolio_paths",
+    "calculate_portfolio_statistics",
+    "daily_log_returns",
+    "dirichlet_weights",
+    "StreamingResults",
+    "sample_windows",
+    "estimate_daily_moments",
+    "load_directory",
+    "read_prices",
+    "save_prices",
+    "simulate_portfolio_paths",
+    "weight_grid",
 ]
+
+
+def __getattr__(name: str):
+    if name not in _LAZY_NAMES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{_LAZY_NAMES[name]}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
+
+
+if TYPE_CHECKING:
+    from .asset import Asset, AssetWindow
+    from .cache import PriceCache
+    from .loaders import load_directory, read_prices, save_prices
+    from .panel import PricePanel
+    from .portfolio import Portfolio
+    from .rebalancing import Rebalancing
+    from .results import StreamingResults
+    from .return_cache import ReturnCache
+    from .store import ResultStore
+    from .sweep import dirichlet_weights, weight_grid
+    from .sampling import sample_windows
+    from .utils import (
+        bootstrap_portfolio_paths, calculate_portfolio_statistics, daily_log_returns, estimate_daily_moments,
+        simulate_portfolio_paths
+    )
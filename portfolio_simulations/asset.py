@@ -1,55 +1,258 @@
+import hashlib
 from datetime import datetime
-import yfinance as yf
+from typing import Tuple, Union
+import numpy as np
 import pandas as pd
+from portfolio_simulations import profiling
+from portfolio_simulations.cache import PriceCache, fetch_yfinance
+from portfolio_simulations.return_cache import default_return_cache
+
+class AssetWindow:
+    """
+    Lightweight view of an asset between two integer offsets of its price arrays.
+    """
+    __slots__ = ("asset", "start", "stop")
+
+    def __init__(self, asset: "Asset", start: int, stop: int):
+        self.asset = asset
+        self.start = start
+        self.stop = stop
+
+    def __len__(self) -> int:
+        return self.stop - self.start
+
+    @property
+    def dates(self) -> np.ndarray:
+        """
+        Dates inside the window, as a view on the asset's date array.
+        """
+        return self.asset.dates[self.start:self.stop]
+
+    @property
+    def closes(self) -> np.ndarray:
+        """
+        Close prices inside the window, as a view on the asset's price array.
+        """
+        return self.asset.closes[self.start:self.stop]
+
+    def years(self) -> float:
+        """
+        Length in years between the first and the last bar of the window.
+        """
+        self._check_not_empty()
+        days = (self.asset.dates[self.stop - 1] - self.asset.dates[self.start]) // np.timedelta64(1, "D")
+        return days / 365.25
+
+    def total_return(self) -> float:
+        """
+        Return between the first and the last bar of the window.
+        """
+        self._check_not_empty()
+        return self.asset.closes[self.stop - 1] / self.asset.closes[self.start] - 1
+
+    def get_returns(self) -> float:
+        """
+        Compute annualized return of the asset over the window.
+        """
+        return (1 + self.total_return()) ** (1 / self.years()) - 1
+
+    def _check_not_empty(self):
+        if self.stop <= self.start:
+            raise ValueError(f"The window of the asset {self.asset.asset_name} contains no prices.")
+
+
+def _clean_series(dates, values) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Dates sorted as datetime64[ns] and float closes whose missing values are replaced by their mean.
+
+    A datetime64[ns] array or Series of sorted dates and a float64 array or Series of
+    closes without NaN are returned as views, without copying or building a DataFrame.
+    """
+    try:
+        clean_dates = np.asarray(dates, dtype="datetime64[ns]")
+        closes = np.asarray(values, dtype=float)
+    except (TypeError, ValueError):
+        clean_dates = None
+    if clean_dates is None or np.isnat(clean_dates).any():
+        # Timezones and missing dates are left to pandas
+        data = pd.DataFrame({"Date": dates, "Close": values})
+        data = data.fillna(data.mean())
+        data = data.sort_values('Date').reset_index(drop=True)
+        return data['Date'].to_numpy(dtype="datetime64[ns]"), data['Close'].to_numpy(dtype=float, copy=True)
+
+    if len(clean_dates) > 1 and np.any(clean_dates[1:] < clean_dates[:-1]):
+        order = np.argsort(clean_dates, kind="stable")
+        clean_dates, closes = clean_dates[order], closes[order]
+    missing = np.isnan(closes)
+    if missing.any():
+        closes = np.where(missing, closes[~missing].mean() if not missing.all() else np.nan, closes)
+    return clean_dates, closes
+
 
 class Asset:
     def __init__(self,
         asset_name: str,
         weight: float,
-        values: list[float] = None,
-        dates: list[datetime] = None
+        values: Union[list[float], np.ndarray, pd.Series] = None,
+        dates: Union[list[datetime], np.ndarray, pd.Series] = None,
+        cache: PriceCache = None
     ):
+        """
+        Asset of custom values and dates, or fetched from yfinance (through cache if given) when both are None.
+
+        Sorted datetime64[ns] dates and float64 values without NaN, as arrays or Series,
+        are kept without copying: they should not be modified afterwards.
+        """
         self.asset_name = asset_name
         self.weight = weight
         if values is not None and dates is not None:
             if len(values) != len(dates):
                 raise ValueError("The length of values and dates must be the same.")
-            self.historical_data = pd.DataFrame({"Date": dates, "Close": values})
         elif values is not None or dates is not None:
             raise ValueError("Both values and dates must be passed to the constructor. Or you can pass both as None and the asset will be fetched from yfinance.")
         else:
-            ticker = yf.Ticker(asset_name)
-            self.historical_data = ticker.history(period="max")
-            if self.historical_data.empty:
+            with profiling.stage("fetch"):
+                dates, values = cache.load(asset_name) if cache is not None else fetch_yfinance(asset_name)
+            if len(dates) == 0:
                 raise ValueError("The ticker passed is not valid. Please pass a valid ticker or a custom name and its values and dates.")
-        
-        self.historical_data = self.historical_data.fillna(self.historical_data.mean())
+
+        with profiling.stage("clean"):
+            self._set_arrays(*_clean_series(dates, values))
+        profiling.count("assets_loaded")
+
+    @classmethod
+    def from_arrays(cls,
+        asset_name: str,
+        weight: float,
+        dates: np.ndarray,
+        closes: np.ndarray
+    ) -> "Asset":
+        """
+        Create an asset on top of sorted datetime64[ns] dates and float close prices without copying them.
+        """
+        if len(dates) != len(closes):
+            raise ValueError("The length of values and dates must be the same.")
+        asset = cls.__new__(cls)
+        asset.asset_name = asset_name
+        asset.weight = weight
+        asset._set_arrays(np.asarray(dates, dtype="datetime64[ns]"), np.asarray(closes))
+        return asset
+
+    def _append(self, dates: np.ndarray, closes: np.ndarray) -> int:
+        """
+        Append bars dated after the last one, e.g. the close of a new day.
+
+        Portfolio.append_bars calls it and keeps the calendar and the panel of the
+        portfolio in step with the appended bars.
+
+        The arrays are extended in place while their buffer has room, and the buffer
+        doubles when it is full, so appending a day at a time costs amortized O(1)
+        copies. Views taken before the append keep their data. Missing closes carry the
+        previous close forward. The window set with set_window is kept.
+
+        Returns:
+            Number of bars appended
+        """
+        dates = np.atleast_1d(np.asarray(dates, dtype="datetime64[ns]"))
+        closes = np.atleast_1d(np.asarray(closes, dtype=float))
+        if len(dates) != len(closes):
+            raise ValueError("The length of values and dates must be the same.")
+        if len(dates) == 0:
+            return 0
+        if np.any(dates[1:] <= dates[:-1]) or (len(self.dates) and dates[0] <= self.dates[-1]):
+            raise ValueError(f"The appended dates of the asset {self.asset_name} must be increasing and after {pd.Timestamp(self.dates[-1])}.")
+        if np.isnan(closes).any():
+            closes = pd.Series(closes).ffill().fillna(self.closes[-1] if len(self.closes) else np.nan).to_numpy()
+
+        size, added = len(self.dates), len(dates)
+        buffers = getattr(self, "_buffers", None)
+        if buffers is None or len(buffers[0]) < size + added:
+            capacity = max(2 * (size + added), 64)
+            buffers = (np.empty(capacity, dtype="datetime64[ns]"), np.empty(capacity, dtype=self.closes.dtype))
+            buffers[0][:size] = self.dates
+            buffers[1][:size] = self.closes
+        buffers[0][size:size + added] = dates
+        buffers[1][size:size + added] = closes
+
+        window = self._window
+        self._set_arrays(buffers[0][:size + added], buffers[1][:size + added])
+        self._buffers = buffers
+        self._window = window
+        return added
+
+    def _set_arrays(self, dates: np.ndarray, closes: np.ndarray):
+        # Windows memoized on the previous data are no longer valid
+        if getattr(self, "_content_key", None) is not None:
+            default_return_cache.invalidate(self._content_key)
+        self._content_key = None
+        self.dates = dates.view()
+        self.closes = closes.view()
+        self.dates.flags.writeable = False
+        self.closes.flags.writeable = False
+        self._buffers = None
+        self._data = None
+        self._window = None
+
+    @property
+    def content_key(self) -> str:
+        """
+        Hash of the dates and prices, identifying the series independently of the asset name and weight.
+        """
+        if self._content_key is None:
+            digest = hashlib.blake2b(digest_size=16)
+            digest.update(np.ascontiguousarray(self.dates.view(np.int64)))
+            digest.update(np.ascontiguousarray(self.closes, dtype=np.float64))
+            self._content_key = digest.hexdigest()
+        return self._content_key
+
+    @property
+    def historical_data(self) -> pd.DataFrame:
+        """
+        Historical data inside the current window, or the full history if no window is set.
+        """
+        if self._data is None:
+            self._data = pd.DataFrame({"Date": self.dates, "Close": self.closes})
+        if self._window is None:
+            return self._data
+        return self._data.iloc[self._window.start:self._window.stop].reset_index(drop=True)
+
+    def window(self,
+        start_date: datetime,
+        end_date: datetime
+    ) -> AssetWindow:
+        """
+        Get the window of values between two dates as offsets into the price arrays, without copying.
+        """
+        start_date = np.datetime64(pd.Timestamp(start_date), "ns")
+        end_date = np.datetime64(pd.Timestamp(end_date), "ns")
+        if (self.dates[0] - start_date) // np.timedelta64(1, "D") > 0:
+            raise ValueError(f"The earliest date of the asset {self.asset_name} is {pd.Timestamp(self.dates[0])}. Please insert a start date after that.")
+        if (end_date - self.dates[-1]) // np.timedelta64(1, "D") > 0:
+            raise ValueError(f"The latest date of the asset {self.asset_name} is {pd.Timestamp(self.dates[-1])}. Please insert an end date before that.")
+
+        start = int(np.searchsorted(self.dates, start_date, side="left"))
+        stop = int(np.searchsorted(self.dates, end_date, side="right"))
+        return AssetWindow(self, start, stop)
 
     def set_window(self,
         start_date: datetime,
         end_date: datetime
-    ) -> pd.DataFrame:
+    ) -> AssetWindow:
         """
-        Get the window of values as a subset of historical_data
+        Restrict historical_data and get_returns to a date range. The full history is kept.
         """
-        if (self.historical_data['Date'].min() - start_date).days > 0:
-            raise ValueError(f"The earliest date of the asset {self.asset_name} is {self.historical_data['Date'].min()}. Please insert a start date after that.")
-        if (end_date - self.historical_data['Date'].max()).days > 0:
-            raise ValueError(f"The latest date of the asset {self.asset_name} is {self.historical_data['Date'].max()}. Please insert an end date before that.")
-        
-        self.historical_data = self.historical_data[(self.historical_data['Date'] >= start_date) & (self.historical_data['Date'] <= end_date)].reset_index(drop=True)
+        self._window = self.window(start_date, end_date)
+        return self._window
+
+    def reset_window(self):
+        """
+        Remove the current window so that the full history is used again.
+        """
+        self._window = None
 
     def get_returns(self):
         """
         Compute annualized return of the asset between two dates.
         """
-        time_series = self.historical_data.sort_values('Date')
-
-        initial_price = time_series['Close'].iloc[0]
-        final_price = time_series['Close'].iloc[-1]
-
-        years = (time_series['Date'].iloc[-1] - time_series['Date'].iloc[0]).days / 365.25
-
-        annualized_return = (final_price / initial_price) ** (1 / years) - 1
-
-        return annualized_return
+        window = self._window if self._window is not None else AssetWindow(self, 0, len(self.dates))
+        return window.get_returns()
@@ -0,0 +1,201 @@
+"""
+Evaluation of many portfolio specifications against prices loaded once
+"""
+
+import csv
+import json
+import os
+import sys
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable, List, Optional
+from portfolio_simulations.cache import PriceCache
+from portfolio_simulations.panel import PricePanel
+from portfolio_simulations.parallel import map_chunks
+from portfolio_simulations.portfolio import Portfolio
+
+SPEC_FORMATS = (".json", ".jsonl", ".csv", ".yaml", ".yml")
+OUTPUT_FORMATS = (".jsonl", ".csv", ".parquet")
+
+# Defaults of the optional fields of a specification
+SPEC_DEFAULTS = {
+    "start_date": None,
+    "end_date": None,
+    "rolling_window": 5,
+    "simulations": 1000,
+    "seed": None,
+    "exhaustive": False,
+}
+
+
+def read_specs(path: str) -> List[Dict]:
+    """
+    Read portfolio specifications from a JSON, JSON Lines, CSV or YAML file.
+
+    Each specification has "assets" and "weights" (lists, or strings separated by
+    ";" in CSV files), an optional "name" and the optional fields of SPEC_DEFAULTS.
+    JSON and YAML files hold a list of specifications, or a mapping with a
+    "portfolios" list. YAML needs PyYAML to be installed.
+
+    Returns:
+        List of normalized specifications
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in SPEC_FORMATS:
+        raise ValueError(f"Unknown specification format {extension!r}. Use one of {SPEC_FORMATS}.")
+    with open(path, newline="") as f:
+        if extension == ".jsonl":
+            specs = [json.loads(line) for line in f if line.strip()]
+        elif extension == ".csv":
+            specs = list(csv.DictReader(f))
+        elif extension == ".json":
+            specs = json.load(f)
+        else:
+            try:
+                import yaml
+            except ImportError:
+                raise ImportError("Reading YAML specifications needs PyYAML: pip install pyyaml") from None
+            specs = yaml.safe_load(f)
+    if isinstance(specs, dict):
+        specs = specs.get("portfolios", [])
+    return [normalize_spec(spec, index) for index, spec in enumerate(specs)]
+
+
+def normalize_spec(spec: Dict, index: int = 0) -> Dict:
+    """
+    Specification with parsed assets, weights and numbers, and defaults for the missing fields.
+    """
+    def as_list(value):
+        if isinstance(value, str):
+            return [item for item in value.replace(",", ";").split(";") if item.strip()]
+        return list(value)
+
+    assets = [str(asset).strip() for asset in as_list(spec.get("assets", []))]
+    weights = [float(weight) for weight in as_list(spec.get("weights", []))]
+    if not assets or len(assets) != len(weights):
+        raise ValueError(f"Specification {spec.get('name', index)!r} needs as many weights as assets.")
+
+    normalized = {"name": str(spec.get("name") or index), "assets": assets, "weights": weights}
+    for field, default in SPEC_DEFAULTS.items():
+        value = spec.get(field)
+        normalized[field] = default if value in (None, "") else value
+    normalized["rolling_window"] = int(float(normalized["rolling_window"]))
+    normalized["simulations"] = int(float(normalized["simulations"]))
+    normalized["seed"] = None if normalized["seed"] is None else int(float(normalized["seed"]))
+    if isinstance(normalized["exhaustive"], str):
+        normalized["exhaustive"] = normalized["exhaustive"].strip().lower() in ("1", "true", "yes")
+    return normalized
+
+
+def run_batch(
+    specs: List[Dict],
+    cache: Optional[PriceCache] = None,
+    n_jobs: int = 1,
+    max_workers: int = 8
+) -> List[Dict]:
+    """
+    Evaluate every specification against one load of the union of their tickers.
+
+    The tickers are fetched once, concurrently, and aligned in a single PricePanel.
+    The portfolios are then evaluated with map_chunks: with n_jobs above 1 they are
+    spread over worker processes that read the panel from shared memory.
+
+    Returns:
+        One result row per specification, in order, with the specification, the summary of
+        its return distribution and an "error" field, None unless the evaluation failed
+    """
+    tickers = list(dict.fromkeys(asset for spec in specs for asset in spec["assets"]))
+    loader = Portfolio()
+    load_errors = loader.add_assets({ticker: 1.0 for ticker in tickers}, cache=cache, max_workers=max_workers)
+    panel = PricePanel.from_assets(loader.assets)
+
+    rows, tasks = [None] * len(specs), []
+    for index, spec in enumerate(specs):
+        missing = [asset for asset in spec["assets"] if asset in load_errors]
+        if missing:
+            rows[index] = _result_row(spec, error=f"Could not load {', '.join(missing)}: {load_errors[missing[0]]}")
+        else:
+            tasks.append((index, spec, panel.names))
+
+    arrays = {"dates": panel.dates, "prices": panel.prices}
+    for index, row in zip((task[0] for task in tasks), map_chunks(_evaluate_spec, tasks, n_jobs=n_jobs, arrays=arrays)):
+        rows[index] = row
+    return rows
+
+
+def write_results(rows: Iterable[Dict], path: str = "-"):
+    """
+    Write result rows as JSON Lines, CSV or Parquet, chosen by the extension of path.
+
+    "-" writes JSON Lines to the standard output. Parquet needs pyarrow or fastparquet.
+    """
+    rows = list(rows)
+    extension = output_format(path)
+    if extension == ".jsonl":
+        lines = "".join(json.dumps(row) + "\n" for row in rows)
+        if path == "-":
+            sys.stdout.write(lines)
+        else:
+            with open(path, "w") as f:
+                f.write(lines)
+        return
+
+    # Lists of assets and weights become ";" separated strings, as read back by read_specs
+    frame = pd.DataFrame([
+        {key: ";".join(map(str, value)) if isinstance(value, list) else value for key, value in row.items()}
+        for row in rows
+    ])
+    if extension == ".csv":
+        frame.to_csv(path, index=False)
+    else:
+        frame.to_parquet(path, index=False)
+
+
+def output_format(path: str) -> str:
+    """
+    Format of the results written to path, checked before any portfolio is evaluated.
+
+    Returns:
+        Extension among OUTPUT_FORMATS, ".jsonl" for "-"
+    """
+    extension = ".jsonl" if path == "-" else os.path.splitext(path)[1].lower()
+    if extension not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output format {extension!r}. Use one of {OUTPUT_FORMATS}.")
+    if extension == ".parquet":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            try:
+                import fastparquet  # noqa: F401
+            except ImportError:
+                raise ImportError("Writing Parquet results needs pyarrow or fastparquet: pip install pyarrow") from None
+    return extension
+
+
+def _evaluate_spec(arrays: Dict[str, np.ndarray], task: tuple) -> Dict:
+    _, spec, names = task
+    try:
+        panel = PricePanel(arrays["dates"], arrays["prices"], names)
+        portfolio = Portfolio(seed=spec["seed"])
+        for asset, weight in zip(spec["assets"], spec["weights"]):
+            portfolio.attach_asset(panel.asset(asset, weight))
+        if spec["start_date"] is not None:
+            portfolio.add_start_date(pd.Timestamp(spec["start_date"]))
+        if spec["end_date"] is not None:
+            portfolio.add_end_date(pd.Timestamp(spec["end_date"]))
+        portfolio.compute_return_distribution(
+            rolling_window=spec["rolling_window"],
+            num_simulations=spec["simulations"],
+            exhaustive=spec["exhaustive"],
+            keep_samples=False
+        )
+    except Exception as e:
+        return _result_row(spec, error=str(e))
+    return _result_row(spec, portfolio.results.summary())
+
+
+def _result_row(spec: Dict, summary: Optional[Dict] = None, error: Optional[str] = None) -> Dict:
+    row = {key: str(value) if key.endswith("_date") and value is not None else value for key, value in spec.items()}
+    row.update({key: value if key == "count" else float(value) for key, value in (summary or {}).items()})
+    row["error"] = error
+    return row
@@ -0,0 +1,186 @@
+"""
+Local on-disk cache of daily close prices, keyed by ticker
+"""
+
+import json
+import os
+import re
+import warnings
+import numpy as np
+import pandas as pd
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional, Tuple
+from portfolio_simulations import profiling
+
+PriceSeries = Tuple[np.ndarray, np.ndarray]
+Fetcher = Callable[[str, Optional[datetime]], PriceSeries]
+
+
+def fetch_yfinance(ticker: str, start: Optional[datetime] = None) -> PriceSeries:
+    """
+    Fetch the daily close prices of a ticker from yfinance.
+
+    Args:
+        ticker: Yahoo Finance ticker
+        start: First date to fetch. The full history is fetched when None
+
+    Returns:
+        Tuple of sorted datetime64[ns] dates and float64 close prices
+    """
+    # Imported on first use: yfinance is slow to import and not needed for custom or cached prices
+    import yfinance as yf
+
+    history = yf.Ticker(ticker)
+    if start is None:
+        history = history.history(period="max")
+    else:
+        history = history.history(start=pd.Timestamp(start).strftime("%Y-%m-%d"))
+    if history.empty:
+        return np.array([], dtype="datetime64[ns]"), np.array([], dtype=float)
+
+    index = pd.DatetimeIndex(history.index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    return index.normalize().to_numpy(dtype="datetime64[ns]"), history["Close"].to_numpy(dtype=float)
+
+
+def default_cache_dir() -> str:
+    """
+    Cache directory from PORTFOLIO_SIMULATIONS_CACHE, or ~/.cache/portfolio_simulations.
+    """
+    return os.environ.get(
+        "PORTFOLIO_SIMULATIONS_CACHE",
+        os.path.join(os.path.expanduser("~"), ".cache", "portfolio_simulations")
+    )
+
+
+class PriceCache:
+    """
+    Persistent cache of close prices stored as a pair of .npy files per ticker.
+
+    Each ticker has <key>.dates.npy, <key>.close.npy and a <key>.json metadata file
+    recording when the series was last fetched. Series older than max_age are
+    refreshed incrementally, fetching only the bars after the last cached date.
+    """
+
+    def __init__(self,
+        directory: Optional[str] = None,
+        fetcher: Fetcher = fetch_yfinance,
+        max_age: Optional[timedelta] = timedelta(days=1)
+    ):
+        self.directory = directory if directory is not None else default_cache_dir()
+        self.fetcher = fetcher
+        self.max_age = max_age
+        os.makedirs(self.directory, exist_ok=True)
+
+    def load(self, ticker: str) -> PriceSeries:
+        """
+        Get the close prices of a ticker, fetching or refreshing them if needed.
+
+        The arrays are memory-mapped from the cache files and are read-only. If refreshing a
+        stale series fails, e.g. offline, a warning is issued and the cached series is returned.
+        """
+        metadata = self.metadata(ticker)
+        if metadata is None:
+            dates, closes = self.fetcher(ticker, None)
+            if len(dates) == 0:
+                return dates, closes
+            self._write(ticker, dates, closes)
+        elif self.is_stale(ticker):
+            try:
+                self.refresh(ticker)
+            except Exception as e:
+                warnings.warn(f"Could not refresh the cached prices of {ticker}, using the prices fetched at {metadata['fetched_at']}: {e}")
+        return self._read(ticker)
+
+    def refresh(self, ticker: str) -> int:
+        """
+        Fetch the bars after the last cached date and append them to the cache.
+
+        Returns:
+            Number of new bars appended
+        """
+        metadata = self.metadata(ticker)
+        if metadata is None:
+            dates, closes = self.fetcher(ticker, None)
+            if len(dates) > 0:
+                self._write(ticker, dates, closes)
+            return len(dates)
+
+        last_date = np.datetime64(metadata["last_date"], "ns")
+        new_dates, new_closes = self.fetcher(ticker, pd.Timestamp(last_date) + timedelta(days=1))
+        new_dates = np.asarray(new_dates, dtype="datetime64[ns]")
+        keep = new_dates > last_date
+        cached_dates, cached_closes = self._read(ticker)
+        self._write(
+            ticker,
+            np.concatenate([cached_dates, new_dates[keep]]),
+            np.concatenate([cached_closes, np.asarray(new_closes, dtype=float)[keep]])
+        )
+        return int(keep.sum())
+
+    def is_stale(self, ticker: str) -> bool:
+        """
+        Whether the cached series is missing or older than max_age.
+        """
+        metadata = self.metadata(ticker)
+        if metadata is None:
+            return True
+        if self.max_age is None:
+            return False
+        return datetime.now() - datetime.fromisoformat(metadata["fetched_at"]) > self.max_age
+
+    def metadata(self, ticker: str) -> Optional[Dict]:
+        """
+        Metadata of the cached series, or None if the ticker is not cached.
+        """
+        try:
+            with open(self._path(ticker, "json")) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def invalidate(self, ticker: str):
+        """
+        Remove a ticker from the cache.
+        """
+        for suffix in ("json", "dates.npy", "close.npy"):
+            try:
+                os.remove(self._path(ticker, suffix))
+            except FileNotFoundError:
+                pass
+
+    def _path(self, ticker: str, suffix: str) -> str:
+        key = re.sub(r"[^A-Za-z0-9._-]", "_", ticker)
+        return os.path.join(self.directory, f"{key}.{suffix}")
+
+    def _read(self, ticker: str) -> PriceSeries:
+        dates = np.load(self._path(ticker, "dates.npy"), mmap_mode="r")
+        closes = np.load(self._path(ticker, "close.npy"), mmap_mode="r")
+        profiling.count("bytes_read", dates.nbytes + closes.nbytes)
+        return dates, closes
+
+    def _write(self, ticker: str, dates: np.ndarray, closes: np.ndarray):
+        dates = np.asarray(dates, dtype="datetime64[ns]")
+        closes = np.asarray(closes, dtype=float)
+        order = np.argsort(dates, kind="stable")
+        dates, closes = dates[order], closes[order]
+
+        # Write every file under a temporary name first so that readers never see a partial series
+        for suffix, array in (("dates.npy", dates), ("close.npy", closes)):
+            path = self._path(ticker, suffix)
+            with open(path + ".tmp", "wb") as f:
+                np.save(f, array)
+            os.replace(path + ".tmp", path)
+
+        metadata = {
+            "ticker": ticker,
+            "fetched_at": datetime.now().isoformat(),
+            "first_date": str(dates[0]),
+            "last_date": str(dates[-1]),
+            "rows": len(dates),
+        }
+        path = self._path(ticker, "json")
+        with open(path + ".tmp", "w") as f:
+            json.dump(metadata, f)
+        os.replace(path + ".tmp", path)
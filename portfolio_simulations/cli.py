@@ -3,9 +3,12 @@ Command Line Interface for Portfolio Simulations
 """
 
 import argparse
+import sys
 from datetime import datetime
 from .portfolio import Portfolio
 from .asset import Asset
+from .cache import PriceCache
+from . import profiling
 
 
 def main():
@@ -45,11 +48,92 @@ def main():
         default=5,
         help="Rolling window in years"
     )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=None,
+        help="Seed of the random numbers, for repeatable results"
+    )
+    parser.add_argument(
+        "--store",
+        type=str,
+        default=None,
+        help="Directory where the simulation results are persisted; an interrupted run with the same options resumes from it"
+    )
+    parser.add_argument(
+        "--batch",
+        type=str,
+        default=None,
+        metavar="FILE",
+        help="Evaluate every portfolio of a JSON, JSONL, CSV or YAML file of specifications instead of --assets"
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        default="-",
+        help="Results file of --batch: .jsonl, .csv or .parquet (default: JSON Lines on the standard output)"
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of worker processes evaluating the portfolios of --batch (-1 for every core)"
+    )
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="Run a resident simulation service keeping prices and window returns in memory"
+    )
+    parser.add_argument(
+        "--host",
+        type=str,
+        default="127.0.0.1",
+        help="Address the service listens on (default: 127.0.0.1)"
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=8765,
+        help="Port the service listens on (default: 8765)"
+    )
+    parser.add_argument(
+        "--service",
+        type=str,
+        default=None,
+        metavar="HOST:PORT",
+        help="Send the simulation to a running service (default: $PORTFOLIO_SIMULATIONS_SERVICE, when it answers)"
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="-",
+        default=None,
+        metavar="FILE",
+        help="Print the time spent in each stage of the run, or write it as JSON to FILE"
+    )
+    parser.add_argument(
+        "--profile-hooks",
+        nargs="+",
+        choices=profiling.PROFILE_HOOKS,
+        default=[],
+        help="Also profile every function call (cprofile) or the memory allocations (tracemalloc)"
+    )
     parser.add_argument(
         "--plot", 
         action="store_true",
         help="Display plot of return distributions"
     )
+    parser.add_argument(
+        "--cache-dir",
+        type=str,
+        default=None,
+        help="Directory of the local price cache (default: $PORTFOLIO_SIMULATIONS_CACHE or ~/.cache/portfolio_simulations)"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always download prices from yfinance instead of using the local cache"
+    )
     
     args = parser.parse_args()
     
@@ -62,14 +146,43 @@ def main():
         if abs(sum(args.weights) - 1.0) > 0.001:
             print("Error: Weights must sum to 1.0")
             return 1
-    
+
+    if args.serve:
+        from .service import run_service
+        run_service(args.host, args.port, cache=None if args.no_cache else PriceCache(args.cache_dir))
+        return 0
+
+    if args.profile is None:
+        return run(args)
+
+    with profiling.profile(args.profile_hooks) as profiler:
+        status = run(args)
+    if args.profile == "-":
+        print(f"\n{profiler.format()}")
+        if profiler.cprofile is not None:
+            print(profiler.cprofile_stats())
+    else:
+        profiler.write_json(args.profile)
+    return status
+
+
+def run(args: argparse.Namespace) -> int:
+    """Load the portfolio and run the simulation described by the parsed arguments."""
+    if args.batch:
+        return run_batch_file(args)
+
+    client = service_client(args)
+    if client is not None:
+        return run_on_service(args, client)
+
     # Create portfolio
-    portfolio = Portfolio()
+    portfolio = Portfolio(seed=args.seed)
     
     # Add assets
+    cache = None if args.no_cache else PriceCache(args.cache_dir)
     if args.assets and args.weights:
         for asset, weight in zip(args.assets, args.weights):
-            portfolio.add_asset(asset, weight)
+            portfolio.add_asset(asset, weight, cache=cache)
     
     # Set date range
     if args.start_date:
@@ -84,7 +197,8 @@ def main():
     try:
         portfolio.compute_return_distribution(
             rolling_window=args.rolling_window,
-            num_simulations=args.simulations
+            num_simulations=args.simulations,
+            store=args.store
         )
         
         # Print results
@@ -101,5 +215,73 @@ def main():
     return 0
 
 
+def service_client(args: argparse.Namespace):
+    """
+    Client of the service the simulation is sent to: --service, or $PORTFOLIO_SIMULATIONS_SERVICE
+    when it answers. None runs the simulation locally, as --plot and --store need.
+    """
+    import os
+    from .service import SERVICE_ENV, ServiceClient
+
+    if args.plot or args.store or not (args.assets and args.weights):
+        return None
+    if args.service:
+        return ServiceClient(args.service)
+    if os.environ.get(SERVICE_ENV):
+        client = ServiceClient(timeout=2.0)
+        if client.is_available():
+            client.timeout = 60.0
+            return client
+    return None
+
+
+def run_on_service(args: argparse.Namespace, client) -> int:
+    """Run the simulation described by the parsed arguments on a running service."""
+    try:
+        stats = client.simulate(
+            args.assets, args.weights,
+            rolling_window=args.rolling_window,
+            start_date=args.start_date,
+            end_date=args.end_date,
+            simulations=args.simulations,
+            seed=args.seed,
+        )
+    except (OSError, ValueError) as e:
+        print(f"Error during simulation: {e}")
+        return 1
+
+    print(f"Start date: {args.start_date}")
+    print(f"End date: {args.end_date}")
+    for asset, weight in zip(args.assets, args.weights):
+        print(f"{asset}: {weight}")
+    for name in ("mean", "std", "value_at_risk", "conditional_value_at_risk"):
+        print(f"{name}: {stats[name]:.4f}")
+    print(f"\nSimulation completed with {args.simulations} simulations on {client.address} in {stats['elapsed_ms']:.1f} ms")
+    return 0
+
+
+def run_batch_file(args: argparse.Namespace) -> int:
+    """Evaluate the portfolios of --batch and write one result row per portfolio to --output."""
+    from .batch import output_format, read_specs, run_batch, write_results
+
+    try:
+        specs = read_specs(args.batch)
+    except (OSError, ValueError, ImportError) as e:
+        print(f"Error reading {args.batch}: {e}", file=sys.stderr)
+        return 1
+    try:
+        output_format(args.output)
+    except (ValueError, ImportError) as e:
+        print(f"Error writing {args.output}: {e}", file=sys.stderr)
+        return 1
+    cache = None if args.no_cache else PriceCache(args.cache_dir)
+    rows = run_batch(specs, cache=cache, n_jobs=args.jobs)
+    write_results(rows, args.output)
+    failed = [row["name"] for row in rows if row["error"] is not None]
+    if failed:
+        print(f"{len(failed)} of {len(rows)} portfolios failed: {', '.join(failed)}", file=sys.stderr)
+    return 0
+
+
 if __name__ == "__main__":
     exit(main())
@@ -0,0 +1,128 @@
+"""
+Bulk loading of many custom price series from CSV, Parquet and .npy files
+"""
+
+import json
+import os
+from collections import Counter
+import numpy as np
+import pandas as pd
+from typing import Dict, Optional, Union
+from portfolio_simulations.panel import PricePanel
+
+PRICE_FORMATS = (".csv", ".parquet", ".npy")
+
+
+def read_prices(
+    path: str,
+    date_column: str = "Date",
+    ticker_column: Optional[str] = None,
+    value_column: str = "Close",
+    dtype: Union[str, np.dtype] = np.float64,
+    mmap: bool = True
+) -> PricePanel:
+    """
+    Read every series of one price file into a PricePanel.
+
+    CSV and Parquet files are either wide, with date_column and one column of prices per
+    series, or long, with one (date, ticker, value) row per price when ticker_column is
+    given. A .npy panel is a directory written by save_prices; with mmap its matrix is
+    memory-mapped read-only, so the series are only read from disk where they are used.
+    Parquet files are memory-mapped too when pyarrow reads them.
+
+    Returns:
+        PricePanel with one column per series. PricePanel.asset gives an Asset of each
+        series that shares the panel memory.
+    """
+    if os.path.isdir(path):
+        return _read_npy_panel(path, mmap)
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".csv":
+        frame = pd.read_csv(path)
+    elif extension == ".parquet":
+        frame = pd.read_parquet(path, **_parquet_options())
+    else:
+        raise ValueError(f"Unknown price format {extension!r}. Use one of {PRICE_FORMATS}.")
+    return _frame_panel(frame, date_column, ticker_column, value_column, dtype)
+
+
+def load_directory(directory: str, dtype: Union[str, np.dtype] = np.float64, mmap: bool = True, **kwargs) -> PricePanel:
+    """
+    Read every price file of a directory and align their series on one calendar.
+
+    The directory may hold CSV and Parquet files and .npy panel directories, each with
+    one or many series; keyword arguments are passed to read_prices. A directory that
+    is itself a .npy panel is returned memory-mapped, without copying.
+    """
+    if os.path.exists(os.path.join(directory, "prices.npy")):
+        return _read_npy_panel(directory, mmap)
+    panels = []
+    for name in sorted(os.listdir(directory)):
+        path = os.path.join(directory, name)
+        if os.path.isdir(path) and os.path.exists(os.path.join(path, "prices.npy")):
+            panels.append(_read_npy_panel(path, mmap))
+        elif os.path.splitext(name)[1].lower() in (".csv", ".parquet"):
+            panels.append(read_prices(path, dtype=dtype, mmap=mmap, **kwargs))
+    if len(panels) == 1:
+        return panels[0]
+
+    names = [name for panel in panels for name in panel.names]
+    duplicates = sorted(name for name, count in Counter(names).items() if count > 1)
+    if duplicates:
+        raise ValueError(f"Series {duplicates} appear in more than one file of {directory}.")
+    return PricePanel.from_series(
+        names,
+        [panel.dates for panel in panels for _ in panel.names],
+        [panel.prices[:, column] for panel in panels for column in range(len(panel.names))],
+        dtype=dtype
+    )
+
+
+def save_prices(panel: PricePanel, directory: str):
+    """
+    Write a panel as a .npy panel directory: dates.npy, the column-major prices.npy and names.json.
+
+    read_prices memory-maps it back without copying, one contiguous column per series.
+    """
+    os.makedirs(directory, exist_ok=True)
+    np.save(os.path.join(directory, "dates.npy"), np.asarray(panel.dates, dtype="datetime64[ns]"))
+    np.save(os.path.join(directory, "prices.npy"), np.asfortranarray(panel.prices))
+    with open(os.path.join(directory, "names.json"), "w") as f:
+        json.dump(panel.names, f)
+
+
+def _read_npy_panel(directory: str, mmap: bool) -> PricePanel:
+    mode = "r" if mmap else None
+    with open(os.path.join(directory, "names.json")) as f:
+        names = json.load(f)
+    dates = np.load(os.path.join(directory, "dates.npy"), mmap_mode=mode)
+    prices = np.load(os.path.join(directory, "prices.npy"), mmap_mode=mode)
+    return PricePanel(dates, prices, names)
+
+
+def _frame_panel(
+    frame: pd.DataFrame,
+    date_column: str,
+    ticker_column: Optional[str],
+    value_column: str,
+    dtype: Union[str, np.dtype]
+) -> PricePanel:
+    if ticker_column is not None:
+        frame = frame.pivot(index=date_column, columns=ticker_column, values=value_column)
+    else:
+        frame = frame.set_index(date_column)
+    frame.index = pd.to_datetime(frame.index)
+    if not frame.index.is_monotonic_increasing:
+        frame = frame.sort_index()
+    names = [str(name) for name in frame.columns]
+    # A single-dtype frame is one block whose transpose is already the column-major matrix
+    prices = frame.to_numpy(dtype=dtype)
+    return PricePanel(frame.index.to_numpy(dtype="datetime64[ns]"), prices, names)
+
+
+def _parquet_options() -> Dict:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return {}
+    return {"memory_map": True}
@@ -0,0 +1,244 @@
+"""
+Aligned multi-asset price panel
+"""
+
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from functools import cached_property
+from typing import List, Optional, Sequence, Union
+from portfolio_simulations.asset import Asset
+
+ALIGN_POLICIES = ("union", "intersection")
+FILL_POLICIES = (None, "ffill")
+
+
+def forward_fill(prices: np.ndarray) -> np.ndarray:
+    """
+    Prices with every gap inside the history of an asset filled with its previous price.
+
+    Rows before the first and after the last price of an asset stay NaN, so that an
+    asset that stopped trading is not given a constant price afterwards.
+    """
+    positions = np.arange(len(prices))[:, None]
+    rows = np.where(np.isnan(prices), 0, positions)
+    last_rows = rows.max(axis=0, initial=0)
+    np.maximum.accumulate(rows, axis=0, out=rows)
+    filled = prices[rows, np.arange(prices.shape[1])]
+    filled[positions > last_rows] = np.nan
+    return filled
+
+
+class PricePanel:
+    """
+    Close prices of many assets aligned on one calendar.
+
+    The prices are held in a single column-major float matrix of shape
+    (dates, assets), so that each asset is a contiguous column that can be
+    shared without copying. Rows where an asset has no price are NaN.
+    """
+
+    def __init__(self,
+        dates: np.ndarray,
+        prices: np.ndarray,
+        names: Sequence[str]
+    ):
+        dates = np.asarray(dates, dtype="datetime64[ns]").view()
+        prices = np.asfortranarray(prices).view()
+        if prices.ndim != 2 or prices.shape != (len(dates), len(names)):
+            raise ValueError(f"The prices must have shape (dates, assets) = {(len(dates), len(names))}, got {prices.shape}.")
+        if len(dates) > 1 and np.any(dates[1:] <= dates[:-1]):
+            raise ValueError("The dates of a price panel must be strictly increasing.")
+
+        self.dates = dates
+        self.prices = prices
+        self.names = list(names)
+        self.dates.flags.writeable = False
+        self.prices.flags.writeable = False
+        self._columns = {name: column for column, name in enumerate(self.names)}
+
+    @classmethod
+    def from_series(cls,
+        names: Sequence[str],
+        dates: Sequence[np.ndarray],
+        closes: Sequence[np.ndarray],
+        align: str = "union",
+        fill: Optional[str] = None,
+        dtype: Union[str, np.dtype] = np.float64,
+        calendar: Optional[np.ndarray] = None
+    ) -> "PricePanel":
+        """
+        Align one sorted (dates, closes) series per asset on a shared calendar.
+
+        Args:
+            names: Name of each asset
+            dates: Sorted datetime64 dates of each asset
+            closes: Close prices of each asset
+            align: "union" keeps every date of any asset, "intersection" only the dates of all assets
+            fill: None leaves missing prices as NaN, "ffill" carries the last price forward
+                over the gaps between the first and the last price of each asset
+            dtype: Float dtype of the price matrix, float64 or float32
+            calendar: Sorted dates the align policy gives for these series when they are
+                already known, e.g. from a SharedCalendar, instead of merging the dates again
+
+        Returns:
+            PricePanel with one column per asset
+        """
+        if align not in ALIGN_POLICIES:
+            raise ValueError(f"Unknown align policy {align!r}. Use one of {ALIGN_POLICIES}.")
+        if fill not in FILL_POLICIES:
+            raise ValueError(f"Unknown fill policy {fill!r}. Use one of {FILL_POLICIES}.")
+
+        dates = [np.asarray(d, dtype="datetime64[ns]") for d in dates]
+        if calendar is not None:
+            calendar = np.asarray(calendar, dtype="datetime64[ns]")
+        elif not dates:
+            calendar = np.array([], dtype="datetime64[ns]")
+        elif align == "union":
+            calendar = np.unique(np.concatenate(dates))
+        else:
+            calendar = dates[0]
+            for asset_dates in dates[1:]:
+                calendar = np.intersect1d(calendar, asset_dates)
+
+        prices = np.full((len(calendar), len(names)), np.nan, dtype=dtype, order="F")
+        for column, (asset_dates, asset_closes) in enumerate(zip(dates, closes)):
+            if len(calendar) == 0:
+                break
+            rows = np.searchsorted(calendar, asset_dates)
+            inside = (rows < len(calendar)) & (calendar[np.minimum(rows, len(calendar) - 1)] == asset_dates)
+            prices[rows[inside], column] = np.asarray(asset_closes)[inside]
+
+        if fill == "ffill":
+            prices = np.asfortranarray(forward_fill(prices))
+        return cls(calendar, prices, names)
+
+    @classmethod
+    def from_assets(cls,
+        assets: List,
+        align: str = "union",
+        fill: Optional[str] = None,
+        dtype: Union[str, np.dtype] = np.float64,
+        calendar: Optional[np.ndarray] = None
+    ) -> "PricePanel":
+        """
+        Align the Close series of the assets. See from_series for the policies and calendar.
+        """
+        return cls.from_series(
+            [asset.asset_name for asset in assets],
+            [asset.dates for asset in assets],
+            [asset.closes for asset in assets],
+            align=align, fill=fill, dtype=dtype, calendar=calendar
+        )
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    @property
+    def shape(self):
+        return self.prices.shape
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Memory used by the dates and the price matrix.
+        """
+        return self.dates.nbytes + self.prices.nbytes
+
+    def column_index(self, name: str) -> int:
+        try:
+            return self._columns[name]
+        except KeyError:
+            raise KeyError(f"The asset {name} is not in the price panel.") from None
+
+    def column(self, name: str) -> np.ndarray:
+        """
+        Prices of one asset as a contiguous view on the matrix.
+        """
+        return self.prices[:, self.column_index(name)]
+
+    def asset(self, name: str, weight: float) -> Asset:
+        """
+        Asset sharing the prices of a column. The arrays are views when the column has no gaps.
+        """
+        column = self.column_index(name)
+        first, last = self.first_valid_rows[column], self.last_valid_rows[column]
+        dates, closes = self.dates[first:last + 1], self.prices[first:last + 1, column]
+        valid = ~np.isnan(closes)
+        if not valid.all():
+            dates, closes = dates[valid], closes[valid]
+        return Asset.from_arrays(name, weight, dates, closes)
+
+    def append_rows(self, dates: np.ndarray, prices: np.ndarray) -> "PricePanel":
+        """
+        Panel with rows dated after the last date added at the end, e.g. the prices of a new day.
+
+        The price matrix is copied once. The next and previous valid rows already computed
+        on this panel are extended with the new rows instead of being recomputed.
+        """
+        dates = np.asarray(dates, dtype="datetime64[ns]")
+        if len(dates) and len(self.dates) and dates[0] <= self.dates[-1]:
+            raise ValueError(f"The appended dates must be after {pd.Timestamp(self.dates[-1])}.")
+        block = np.asarray(prices, dtype=self.prices.dtype).reshape(len(dates), len(self.names))
+        panel = PricePanel(np.concatenate([self.dates, dates]), np.concatenate([self.prices, block]), self.names)
+
+        size, total = len(self.dates), len(panel.dates)
+        rows = np.arange(size, total)[:, None]
+        if "previous_valid_rows" in self.__dict__ and size:
+            index = np.concatenate([self.previous_valid_rows[-1:], np.where(np.isnan(block), -1, rows)])
+            panel.__dict__["previous_valid_rows"] = np.concatenate([self.previous_valid_rows, np.maximum.accumulate(index, axis=0)[1:]])
+        if "next_valid_rows" in self.__dict__ and len(dates):
+            block_rows = np.minimum.accumulate(np.where(np.isnan(block), total, rows)[::-1], axis=0)[::-1]
+            # Rows with no later price in this panel now point to the first price of the new rows
+            previous = np.where(self.next_valid_rows == size, block_rows[0], self.next_valid_rows)
+            panel.__dict__["next_valid_rows"] = np.concatenate([previous, block_rows])
+        return panel
+
+    def slice(self, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None) -> "PricePanel":
+        """
+        Panel restricted to the rows between two dates, sharing the same memory.
+        """
+        start = 0 if start_date is None else np.searchsorted(self.dates, np.datetime64(pd.Timestamp(start_date), "ns"), side="left")
+        stop = len(self.dates) if end_date is None else np.searchsorted(self.dates, np.datetime64(pd.Timestamp(end_date), "ns"), side="right")
+        return PricePanel(self.dates[start:stop], self.prices[start:stop], self.names)
+
+    @cached_property
+    def first_valid_rows(self) -> np.ndarray:
+        """
+        Row of the first price of each asset.
+        """
+        return np.isfinite(self.prices).argmax(axis=0)
+
+    @cached_property
+    def last_valid_rows(self) -> np.ndarray:
+        """
+        Row of the last price of each asset.
+        """
+        return len(self.dates) - 1 - np.isfinite(self.prices[::-1]).argmax(axis=0)
+
+    @cached_property
+    def log_prices(self) -> np.ndarray:
+        """
+        Natural log of the prices, computed once. The log return between two rows is a difference of two entries.
+        """
+        log_prices = np.log(self.prices.astype(np.float64))
+        log_prices.flags.writeable = False
+        return log_prices
+
+    @cached_property
+    def next_valid_rows(self) -> np.ndarray:
+        """
+        For every row and asset, the first row at or after it holding a price.
+        """
+        rows = np.arange(len(self.dates))[:, None]
+        index = np.where(np.isnan(self.prices), len(self.dates), rows)
+        return np.minimum.accumulate(index[::-1], axis=0)[::-1]
+
+    @cached_property
+    def previous_valid_rows(self) -> np.ndarray:
+        """
+        For every row and asset, the last row at or before it holding a price.
+        """
+        rows = np.arange(len(self.dates))[:, None]
+        index = np.where(np.isnan(self.prices), -1, rows)
+        return np.maximum.accumulate(index, axis=0)
@@ -0,0 +1,144 @@
+"""
+Process-pool execution of simulation chunks with price data in shared memory
+"""
+
+import os
+import sys
+import numpy as np
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Callable, Dict, Iterator, List, Optional, Sequence
+
+# Arrays attached by each worker process, see _attach_worker_arrays
+_worker_arrays = {}
+_worker_segments = []
+
+
+def resolve_n_jobs(n_jobs: Optional[int]) -> int:
+    """
+    Number of worker processes for n_jobs. None means 1, negative values count back from the number of cores.
+    """
+    if n_jobs is None:
+        return 1
+    if n_jobs < 0:
+        return max(1, (os.cpu_count() or 1) + 1 + n_jobs)
+    if n_jobs == 0:
+        raise ValueError("n_jobs must not be 0.")
+    return n_jobs
+
+
+def chunk_sizes(total: int, chunk_size: int) -> List[int]:
+    """
+    Split total items into chunks of chunk_size, the last one possibly smaller.
+    """
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be positive.")
+    return [min(chunk_size, total - start) for start in range(0, total, chunk_size)]
+
+
+class SharedArrays:
+    """
+    Copy of numpy arrays in shared memory segments that worker processes attach to without pickling.
+
+    Use as a context manager; the segments are released on exit.
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        self.descriptors = {}
+        self._segments = []
+        for name, array in arrays.items():
+            array = np.asarray(array)
+            order = "F" if array.flags.f_contiguous and not array.flags.c_contiguous else "C"
+            segment = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            self._segments.append(segment)
+            np.ndarray(array.shape, dtype=array.dtype, buffer=segment.buf, order=order)[...] = array
+            self.descriptors[name] = (segment.name, array.shape, array.dtype.str, order)
+
+    def __enter__(self) -> "SharedArrays":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        for segment in self._segments:
+            segment.close()
+            segment.unlink()
+        self._segments = []
+
+
+def attach_shared_arrays(descriptors: Dict[str, tuple]):
+    """
+    Map the segments described by SharedArrays.descriptors as read-only numpy arrays.
+
+    Returns:
+        Tuple of the attached segments, which must be kept alive, and the arrays by name
+    """
+    segments, arrays = [], {}
+    for name, (segment_name, shape, dtype, order) in descriptors.items():
+        if sys.version_info >= (3, 13):
+            segment = shared_memory.SharedMemory(name=segment_name, track=False)
+        else:
+            # Workers share the resource tracker of the creating process, which unlinks the segment
+            segment = shared_memory.SharedMemory(name=segment_name)
+        array = np.ndarray(shape, dtype=np.dtype(dtype), buffer=segment.buf, order=order)
+        array.flags.writeable = False
+        segments.append(segment)
+        arrays[name] = array
+    return segments, arrays
+
+
+def _attach_worker_arrays(descriptors: Dict[str, tuple]):
+    global _worker_arrays, _worker_segments
+    _worker_segments, _worker_arrays = attach_shared_arrays(descriptors)
+
+
+def _run_task(function: Callable, task):
+    return function(_worker_arrays, task)
+
+
+def map_chunks(
+    function: Callable,
+    tasks: Sequence,
+    n_jobs: Optional[int] = 1,
+    arrays: Optional[Dict[str, np.ndarray]] = None
+) -> Iterator:
+    """
+    Apply function(arrays, task) to every task and yield the results in task order.
+
+    With n_jobs above 1 the tasks run in a ProcessPoolExecutor and the arrays are
+    shared with the workers through shared memory. function must be defined at
+    module level so that it can be sent to the workers. Because results are
+    yielded in task order, merging them does not depend on the number of workers.
+    Tasks are submitted as results are consumed, so closing the iterator early
+    leaves the remaining tasks unstarted.
+
+    Args:
+        function: Function of the shared arrays and one task
+        tasks: Picklable task descriptions
+        n_jobs: Number of worker processes, see resolve_n_jobs
+        arrays: Arrays made available to every task by name
+    """
+    arrays = arrays if arrays is not None else {}
+    n_jobs = min(resolve_n_jobs(n_jobs), len(tasks))
+    if n_jobs <= 1:
+        for task in tasks:
+            yield function(arrays, task)
+        return
+
+    with SharedArrays(arrays) as shared:
+        with ProcessPoolExecutor(
+            max_workers=n_jobs,
+            initializer=_attach_worker_arrays,
+            initargs=(shared.descriptors,)
+        ) as executor:
+            # At most two tasks per worker are queued ahead of the consumer, so that one that
+            # stops early, e.g. once a target precision is met, only waits for those
+            pending = deque()
+            for task in tasks:
+                pending.append(executor.submit(_run_task, function, task))
+                if len(pending) >= 2 * n_jobs:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
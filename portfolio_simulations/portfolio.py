@@ -1,28 +1,153 @@
 #TODO Add methods to remove assets and modify weights
-#TODO Make updating shared time window not destructive
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from typing import Dict, Iterable, Mapping, Optional, Tuple, Union
+from portfolio_simulations import profiling
 from portfolio_simulations.asset import Asset
-import matplotlib.pyplot as plt
+from portfolio_simulations.cache import PriceCache
+from portfolio_simulations.panel import PricePanel, forward_fill
+from portfolio_simulations.parallel import map_chunks, resolve_n_jobs
+from portfolio_simulations.results import StreamingResults
+from portfolio_simulations.return_cache import ReturnCache, default_return_cache
+from portfolio_simulations.rng import SeedLike, as_generator
+from portfolio_simulations.sampling import sample_windows, year_strata
+from portfolio_simulations.shared_calendar import SharedCalendar
+from portfolio_simulations.store import ResultStore
+from portfolio_simulations.sweep import dirichlet_weights, efficient_frontier, sweep_statistics, weight_grid
+from portfolio_simulations.windows import (
+    candidate_start_rows, exhaustive_window_returns, portfolio_window_returns_chunk, rolling_window_returns
+)
+import numpy as np
 import pandas as pd
-import random
+import time
 
 class Portfolio:
-    def __init__(self):
+    def __init__(self,
+        align: str = "union",
+        fill: Optional[str] = None,
+        dtype: Union[str, np.dtype] = np.float64,
+        seed: SeedLike = None,
+        return_cache: Optional[ReturnCache] = None
+    ):
+        """
+        Create an empty portfolio. align, fill and dtype configure the price panel, see PricePanel.from_series.
+        seed seeds the random stream used by the simulations that are not given their own seed.
+        return_cache memoizes the window returns of compute_portfolio_returns; by default it is
+        shared with every other portfolio, so assets common to many portfolios are computed once.
+        """
         self.assets = []
+        self.seed = seed
+        self.rng = as_generator(seed)
+        self.panel_options = {"align": align, "fill": fill, "dtype": dtype}
+        self._panel = None
+        self.calendar = SharedCalendar()
+        self.return_cache = return_cache if return_cache is not None else default_return_cache
+
+    @property
+    def panel(self) -> PricePanel:
+        """
+        Prices of all assets aligned in one matrix, built on first use after each change of the assets.
+
+        The rows are the dates of the shared calendar, all of them or, with the
+        "intersection" policy, those every asset trades on.
+        """
+        if self._panel is None:
+            if self.panel_options["align"] == "union":
+                calendar = self.calendar.dates
+            else:
+                calendar = self.calendar.common_dates(len(self.assets))
+            with profiling.stage("panel"):
+                self._panel = PricePanel.from_assets(self.assets, calendar=calendar, **self.panel_options)
+        return self._panel
 
     def add_asset(self, 
         asset_name: str,
         weight: float,
         values: list[float] = None,
-        dates: list[datetime] = None
+        dates: list[datetime] = None,
+        cache: PriceCache = None
     ) -> None:
         """
-        Add a new asset to the portfolio. If value and dates are not passed, the asset will be fetched from yfinance.
+        Add a new asset to the portfolio. If value and dates are not passed, the asset will be fetched from yfinance,
+        through the cache if one is passed.
         """
-        asset = Asset(asset_name, weight=weight, values=values, dates=dates)
-        self.assets.append(asset)
+        asset = Asset(asset_name, weight=weight, values=values, dates=dates, cache=cache)
+        self._append_asset(asset)
+        self._update_shared_time_window()
+
+    def attach_asset(self, asset: Asset) -> None:
+        """
+        Add an asset that is already loaded, e.g. a PricePanel.asset sharing its prices with other portfolios.
+        """
+        self._append_asset(asset)
         self._update_shared_time_window()
 
+    def add_assets(self,
+        spec: Union[Mapping[str, float], Iterable[Tuple[str, float]]],
+        cache: PriceCache = None,
+        max_workers: int = 8,
+        retries: int = 2,
+        retry_delay: float = 1.0
+    ) -> Dict[str, Exception]:
+        """
+        Add many tickers at once, fetching their prices concurrently.
+
+        Args:
+            spec: Mapping of ticker to weight, or iterable of (ticker, weight) pairs
+            cache: Optional PriceCache to load the prices through
+            max_workers: Maximum number of tickers fetched at the same time
+            retries: Number of retries for a ticker whose fetch fails with an unexpected error
+            retry_delay: Seconds to wait before the first retry, doubled at every retry
+
+        Returns:
+            Dictionary of the tickers that could not be loaded and their error.
+            The other tickers are added in the order of spec.
+        """
+        spec = list(spec.items()) if isinstance(spec, Mapping) else list(spec)
+
+        def load(asset_name: str, weight: float) -> Asset:
+            for attempt in range(retries + 1):
+                try:
+                    return Asset(asset_name, weight=weight, cache=cache)
+                except ValueError:
+                    raise
+                except Exception:
+                    if attempt == retries:
+                        raise
+                    time.sleep(retry_delay * 2 ** attempt)
+
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(spec)))) as executor:
+            futures = [(asset_name, executor.submit(load, asset_name, weight)) for asset_name, weight in spec]
+
+        errors = {}
+        for asset_name, future in futures:
+            try:
+                self._append_asset(future.result())
+            except Exception as e:
+                errors[asset_name] = e
+        self._update_shared_time_window()
+        return errors
+
+    @classmethod
+    def from_spec(cls,
+        spec: Union[Mapping[str, float], Iterable[Tuple[str, float]]],
+        start_date: datetime = None,
+        end_date: datetime = None,
+        **kwargs
+    ) -> "Portfolio":
+        """
+        Create a portfolio from a ticker to weight specification, loading every ticker concurrently.
+
+        Keyword arguments are passed to add_assets. Tickers that failed to load are kept in load_errors.
+        """
+        portfolio = cls()
+        portfolio.load_errors = portfolio.add_assets(spec, **kwargs)
+        if start_date is not None:
+            portfolio.add_start_date(start_date)
+        if end_date is not None:
+            portfolio.add_end_date(end_date)
+        return portfolio
+
     def add_start_date(self, start_date: datetime):
         """
         Add the start date to the portfolio.
@@ -37,50 +162,413 @@ class Portfolio:
         self.end_date = end_date
         self._update_shared_time_window()
 
+    def append_bars(self, bars: Mapping[str, Tuple[np.ndarray, np.ndarray]]) -> None:
+        """
+        Append new bars to assets of the portfolio, e.g. the closes of a new day.
+
+        Args:
+            bars: Mapping of asset name to the (dates, closes) appended to it, dated after its
+                last bar. A single bar can be passed as a (date, close) pair. Missing closes
+                carry the previous close forward.
+
+        The assets extend their arrays in place, in a buffer that doubles when full, and
+        only the new dates are added to the calendar. update_return_distribution then
+        evaluates the windows that became valid.
+        """
+        assets = {asset.asset_name: asset for asset in self.assets}
+        unknown = [name for name in bars if name not in assets]
+        if unknown:
+            raise ValueError(f"The portfolio has no asset {', '.join(unknown)}.")
+        last_date, known_dates = self.calendar.last_date, len(self.calendar)
+        appended = {}
+        for name, (dates, closes) in bars.items():
+            asset = assets[name]
+            added = asset._append(dates, closes)
+            if added:
+                appended[name] = (asset.dates[-added:], asset.closes[-added:])
+                with profiling.stage("calendar"):
+                    self.calendar.add(asset.dates[-added:])
+        if not appended:
+            return
+
+        # Bars after every known date only add rows at the end of the panel, unless forward
+        # filling would also reach back into the gap before an asset that resumes trading
+        extends = self._panel is not None and last_date is not None and min(dates[0] for dates, _ in appended.values()) > last_date
+        if extends and self.panel_options["fill"] == "ffill" and len(self._panel.dates):
+            columns = [self._panel.names.index(name) for name in appended]
+            extends = bool(np.isfinite(self._panel.prices[-1, columns]).all())
+        if extends:
+            with profiling.stage("panel"):
+                self._panel = self._panel.append_rows(*self._panel_rows(self.calendar.dates[known_dates:], appended))
+        else:
+            self._panel = None
+        self._update_shared_time_window()
+
+    def _panel_rows(self, dates: np.ndarray, appended: Dict[str, Tuple[np.ndarray, np.ndarray]]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Price rows that the appended bars add on the new calendar dates after the last row
+        of the panel, aligned and filled like PricePanel.from_series.
+        """
+        rows = np.full((len(dates), len(self.assets)), np.nan, dtype=self._panel.prices.dtype)
+        for column, asset in enumerate(self.assets):
+            if asset.asset_name in appended:
+                asset_dates, asset_closes = appended[asset.asset_name]
+                rows[np.searchsorted(dates, asset_dates), column] = asset_closes
+        if self.panel_options["align"] == "intersection":
+            complete = np.isfinite(rows).all(axis=1)
+            dates, rows = dates[complete], rows[complete]
+        if self.panel_options["fill"] == "ffill" and len(self._panel.dates):
+            rows = forward_fill(np.concatenate([self._panel.prices[-1:], rows]))[1:]
+        return dates, rows
+
     def compute_return_distribution(self,
         rolling_window: int = 5,
         num_simulations: int = 1000,
+        engine: str = "vectorized",
+        n_jobs: int = 1,
+        seed: SeedLike = None,
+        replace: bool = False,
+        sampling: str = "uniform",
+        block_size: int = 21,
+        exhaustive: bool = False,
+        keep_samples: bool = True,
+        dtype: Union[str, np.dtype] = np.float64,
+        chunk_size: int = 100000,
+        store: Optional[str] = None,
     ):
-        date_upper_limit = max(self.combined_window["Date"]-pd.DateOffset(years=rolling_window))
-        available_dates = self.combined_window[self.combined_window["Date"] <= date_upper_limit]
-        
-        for asset in self.assets:
-            asset.set_window(self.start_date, self.end_date)
+        """
+        Sample num_simulations rolling windows and store the annualized portfolio return of each.
+
+        All start dates are drawn in one call from seed, or from the portfolio random stream when
+        seed is None. sampling selects the method, see sample_windows: "uniform" windows are
+        distinct unless replace is True, "block" draws blocks of block_size consecutive start dates
+        and "stratified" spreads the start dates across years. With exhaustive=True every
+        window is evaluated once, in date order, and num_simulations is ignored.
+        In exhaustive mode the vectorized engine also keeps the (windows, assets) matrix of
+        asset returns in asset_window_returns.
+
+        Windows are evaluated in chunks of chunk_size and streamed into results, a
+        StreamingResults with the running moments, quantile sketch, histogram and tail risk.
+        With keep_samples the returns are also kept in portfolio_returns, an ndarray of dtype,
+        with their start dates in window_start_dates; otherwise memory does not grow with
+        num_simulations and portfolio_returns is None.
+
+        With store, the run is persisted chunk by chunk in a ResultStore directory with its
+        parameters. portfolio_returns is then a read-only memory map of the stored returns,
+        and calling again with the same store, parameters and prices resumes after the last
+        completed chunk of an interrupted run, or reads back a finished one. Prices that
+        changed since, e.g. after a cache refresh, make the call raise.
+
+        engine="vectorized" evaluates every window at once on the aligned price matrix,
+        engine="loop" evaluates them one by one through compute_portfolio_returns.
+        With the vectorized engine, n_jobs above 1 splits the windows across worker processes
+        that read the price matrix from shared memory, each chunk being split further when
+        there are fewer chunks than workers. The result does not depend on n_jobs.
+        """
+        if engine not in ("vectorized", "loop"):
+            raise ValueError(f"Unknown engine {engine!r}. Use 'vectorized' or 'loop'.")
+
+        panel = self.panel
+        weights = np.array([asset.weight for asset in self.assets])
+        result_store = None
+        if store is not None:
+            run_seed = self.seed if seed is None else seed
+            run = {
+                "assets": [asset.asset_name for asset in self.assets],
+                "weights": weights.tolist(),
+                "rolling_window": rolling_window,
+                "num_simulations": num_simulations,
+                "engine": engine,
+                "sampling": sampling,
+                "replace": replace,
+                "block_size": block_size,
+                "exhaustive": exhaustive,
+                "seed": int(run_seed) if isinstance(run_seed, (int, np.integer)) else None,
+                "start_date": str(getattr(self, "start_date", None)),
+                "end_date": str(getattr(self, "end_date", None)),
+                "dtype": np.dtype(dtype).str,
+                "chunk_size": chunk_size,
+                "content_keys": [asset.content_key for asset in self.assets],
+            }
+            if ResultStore.exists(store):
+                result_store = ResultStore(store)
+                if any(result_store.metadata.get(key) != value for key, value in run.items()):
+                    raise ValueError(f"The result store {store} holds a different run. Use another directory or delete it.")
 
-        self.portfolio_returns = []
-        for i in range(num_simulations):
-            if available_dates.empty:
+        if result_store is not None:
+            # Resume on the windows drawn by the interrupted run
+            start_rows = np.searchsorted(panel.dates, result_store.start_dates)
+        else:
+            with profiling.stage("sampling"):
+                start_rows = self._window_start_rows(rolling_window, num_simulations, seed, replace, sampling, block_size, exhaustive)
+            if store is not None:
+                result_store = ResultStore.create(store, panel.dates[start_rows], chunk_size, dtype, run)
+
+        self.results = StreamingResults(keep_samples=keep_samples and result_store is None, dtype=dtype)
+        self.window_start_dates = panel.dates[start_rows] if keep_samples else None
+        self.asset_window_returns = None
+        chunks = [start_rows[i:i + chunk_size] for i in range(0, len(start_rows), chunk_size)]
+        completed = 0
+        if result_store is not None:
+            completed = result_store.completed_chunks
+            for chunk_returns in result_store.iter_chunks():
+                self.results.update(chunk_returns)
+
+        if engine == "vectorized" and exhaustive and result_store is None:
+            with profiling.stage("windows"):
+                _, self.asset_window_returns = exhaustive_window_returns(
+                    panel, rolling_window, getattr(self, "start_date", None), getattr(self, "end_date", None)
+                )
+                evaluated = iter([self.asset_window_returns @ weights])
+        elif engine == "vectorized":
+            # Chunks are split into parts so that every worker gets a task, and joined back in order
+            pending = chunks[completed:]
+            parts = max(1, -(-resolve_n_jobs(n_jobs) // max(len(pending), 1)))
+            tasks = [(rows, rolling_window, weights) for chunk in pending for rows in np.array_split(chunk, parts)]
+            arrays = {
+                "dates": panel.dates,
+                "prices": panel.prices,
+                "next_valid_rows": panel.next_valid_rows,
+                "previous_valid_rows": panel.previous_valid_rows,
+            }
+            part_returns = map_chunks(portfolio_window_returns_chunk, tasks, n_jobs=n_jobs, arrays=arrays)
+            evaluated = (np.concatenate([next(part_returns) for _ in range(parts)]) for _ in pending)
+        else:
+            evaluated = (np.array([self._loop_window_return(panel.dates[row], rolling_window) for row in rows]) for rows in chunks[completed:])
+
+        for index, chunk_returns in enumerate(profiling.timed(evaluated, "windows"), start=completed):
+            profiling.count("windows_evaluated", len(chunk_returns))
+            with profiling.stage("results"):
+                if result_store is not None:
+                    chunk_returns = np.asarray(chunk_returns).astype(dtype)
+                    result_store.write_chunk(index, chunk_returns)
+                self.results.update(chunk_returns)
+
+        if result_store is not None:
+            self.result_store = result_store
+            self.portfolio_returns = result_store.returns if keep_samples else None
+            self.window_start_dates = result_store.start_dates if keep_samples else None
+        else:
+            self.portfolio_returns = self.results.samples
+
+        # Parameters needed to extend the distribution when new bars arrive
+        self._distribution_run = {
+            "assets": [asset.asset_name for asset in self.assets],
+            "weights": weights,
+            "rolling_window": rolling_window,
+            "engine": engine,
+            "exhaustive": exhaustive,
+            "keep_samples": keep_samples,
+            "dtype": dtype,
+            "store": result_store,
+            "last_start_date": panel.dates[start_rows[-1]] if len(start_rows) else None,
+        }
+
+    def update_return_distribution(self) -> np.ndarray:
+        """
+        Extend an exhaustive return distribution with the windows that became valid since it was computed.
+
+        After append_bars, the windows ending up to the new last common date (or the end
+        date of the portfolio, if it is earlier) are evaluated,
+        and only those: the earlier windows end before the appended bars and keep their
+        returns. results, portfolio_returns, window_start_dates, asset_window_returns and
+        the ResultStore of the run are extended with them.
+
+        Returns:
+            Portfolio returns of the new windows, in date order
+        """
+        run = getattr(self, "_distribution_run", None)
+        if run is None or not run["exhaustive"]:
+            raise ValueError("Only a distribution computed with exhaustive=True can be updated. Call compute_return_distribution first.")
+        weights = np.array([asset.weight for asset in self.assets])
+        if [asset.asset_name for asset in self.assets] != run["assets"] or not np.array_equal(weights, run["weights"]):
+            raise ValueError("The assets or weights changed since the distribution was computed. Call compute_return_distribution again.")
+
+        panel = self.panel
+        rolling_window = run["rolling_window"]
+        first_row = 0 if run["last_start_date"] is None else int(np.searchsorted(panel.dates, run["last_start_date"], side="right"))
+        start_rows = candidate_start_rows(
+            panel, rolling_window, getattr(self, "start_date", None), getattr(self, "end_date", None), first_row
+        )
+        if len(start_rows) == 0:
+            self._record_store_content(run)
+            return np.empty(0, dtype=run["dtype"])
+
+        with profiling.stage("windows"):
+            if run["engine"] == "vectorized":
+                asset_returns = rolling_window_returns(panel, start_rows, rolling_window)
+                new_returns = asset_returns @ weights
+                if self.asset_window_returns is not None:
+                    self.asset_window_returns = np.concatenate([self.asset_window_returns, asset_returns])
+            else:
+                new_returns = np.array([self._loop_window_return(panel.dates[row], rolling_window) for row in start_rows])
+        profiling.count("windows_evaluated", len(start_rows))
+
+        result_store = run["store"]
+        with profiling.stage("results"):
+            if result_store is not None:
+                new_returns = new_returns.astype(run["dtype"])
+                result_store.append(panel.dates[start_rows], new_returns)
+                self._record_store_content(run)
+            self.results.update(new_returns)
+
+        if result_store is not None:
+            self.portfolio_returns = result_store.returns if run["keep_samples"] else None
+            self.window_start_dates = result_store.start_dates if run["keep_samples"] else None
+        else:
+            self.portfolio_returns = self.results.samples
+            if run["keep_samples"]:
+                self.window_start_dates = np.concatenate([self.window_start_dates, panel.dates[start_rows]])
+        run["last_start_date"] = panel.dates[start_rows[-1]]
+        return np.asarray(new_returns, dtype=run["dtype"])
+
+    def _record_store_content(self, run: Dict):
+        """
+        Record in the store of the run the prices its windows were evaluated on, once they are extended.
+        """
+        if run["store"] is not None:
+            run["store"].update_metadata({"content_keys": [asset.content_key for asset in self.assets]})
+
+    def _window_start_rows(self,
+        rolling_window: int,
+        num_simulations: int,
+        seed: SeedLike,
+        replace: bool,
+        sampling: str,
+        block_size: int,
+        exhaustive: bool
+    ) -> np.ndarray:
+        """
+        Panel rows of the window start dates, every candidate in exhaustive mode or a sample of them.
+        """
+        panel = self.panel
+        available_rows = candidate_start_rows(
+            panel, rolling_window,
+            getattr(self, "start_date", None), getattr(self, "end_date", None)
+        )
+        if exhaustive:
+            if len(available_rows) == 0:
                 raise ValueError("Not enough data to generate return distribution, reduce rolling_window or num_simulations.")
-            simulation_start_date = random.choice(available_dates)
-            simulation_end_date = simulation_start_date + pd.DateOffset(years=rolling_window)
-        
-            available_dates = available_dates[available_dates != simulation_start_date]
+            return available_rows
+        return available_rows[sample_windows(
+            len(available_rows), num_simulations, method=sampling,
+            seed=self.rng if seed is None else seed, replace=replace, block_size=block_size,
+            strata=year_strata(panel.dates[available_rows]) if sampling == "stratified" else None
+        )]
 
-            self.portfolio_returns.append(self.compute_portfolio_returns(simulation_start_date, simulation_end_date))
+    def sweep_weights(self,
+        candidates: Union[str, np.ndarray] = "grid",
+        rolling_window: int = 5,
+        step: float = 0.1,
+        num_candidates: int = 1000,
+        alpha: float = 1.0,
+        quantiles: Iterable[float] = (0.05, 0.5, 0.95),
+        level: float = 0.95,
+        risk: str = "std",
+        exhaustive: bool = True,
+        num_simulations: int = 1000,
+        seed: SeedLike = None,
+        sampling: str = "uniform",
+        chunk_size: int = 1000,
+    ) -> pd.DataFrame:
+        """
+        Evaluate many allocations of the portfolio assets on the same rolling windows.
+
+        The return of every asset over every window is computed once into the
+        (windows, assets) matrix asset_window_returns, then the portfolio returns of
+        all the candidate weight vectors come from matrix products with it. The assets
+        are not reloaded and their weights in the portfolio are not changed.
+
+        Args:
+            candidates: "grid" for every allocation in multiples of step, "dirichlet" for
+                num_candidates random allocations with concentration alpha, or an array of
+                weight vectors of shape (candidates, assets) in the order of the assets
+            rolling_window: Number of years of each window
+            quantiles: Quantiles of the returns reported for each candidate
+            level: Confidence level of the value at risk and conditional value at risk
+            risk: Statistic used as the risk of the efficient frontier, e.g. "std" or "conditional_value_at_risk"
+            exhaustive: Whether every window is used, or num_simulations sampled windows (see compute_return_distribution)
+            seed: Seed or numpy Generator of the sampled windows and Dirichlet candidates
+            chunk_size: Number of candidates evaluated at once
+
+        Returns:
+            DataFrame with one row per candidate: its weights, named after the assets,
+            the statistics of sweep_statistics and an "efficient" column marking the
+            candidates on the efficient frontier of mean return against risk
+        """
+        names = [asset.asset_name for asset in self.assets]
+        if isinstance(candidates, str):
+            if candidates == "grid":
+                candidates = weight_grid(len(names), step)
+            elif candidates == "dirichlet":
+                candidates = dirichlet_weights(len(names), num_candidates, alpha, seed=self.rng if seed is None else seed)
+            else:
+                raise ValueError(f"Unknown candidates {candidates!r}. Use 'grid', 'dirichlet' or an array of weights.")
+
+        panel = self.panel
+        if exhaustive:
+            _, self.asset_window_returns = exhaustive_window_returns(
+                panel, rolling_window, getattr(self, "start_date", None), getattr(self, "end_date", None)
+            )
+        else:
+            start_rows = self._window_start_rows(rolling_window, num_simulations, seed, False, sampling, 21, False)
+            self.asset_window_returns = rolling_window_returns(panel, start_rows, rolling_window)
+
+        statistics = sweep_statistics(self.asset_window_returns, candidates, quantiles, level, chunk_size)
+        if risk not in statistics:
+            raise ValueError(f"Unknown risk {risk!r}. Use one of {list(statistics)}.")
+        sweep = pd.DataFrame(np.atleast_2d(candidates), columns=names)
+        for name, values in statistics.items():
+            sweep[name] = values
+        sweep["efficient"] = efficient_frontier(statistics[risk], statistics["mean"])
+        return sweep
+
+    def _loop_window_return(self, start_date: np.datetime64, rolling_window: int) -> float:
+        simulation_start_date = pd.Timestamp(start_date)
+        simulation_end_date = simulation_start_date + pd.DateOffset(years=rolling_window)
+        return self.compute_portfolio_returns(simulation_start_date, simulation_end_date)
+
+    def return_quantiles(self, quantiles: Iterable[float] = (0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99)) -> Dict[float, float]:
+        """
+        Empirical quantiles of the last computed return distribution. After an exhaustive run they are exact.
+        When the samples were not kept, they are estimated from the quantile sketch of results.
+        """
+        quantiles = list(quantiles)
+        if self.portfolio_returns is None:
+            values = self.results.quantile(np.array(quantiles))
+        else:
+            values = np.quantile(self.portfolio_returns, quantiles)
+        return dict(zip(quantiles, values.tolist()))
+
+    @property
+    def combined_window(self) -> pd.DataFrame:
+        """
+        Union of the dates of all assets, in a Date column.
+        """
+        return pd.DataFrame({"Date": self.calendar.dates})
+
+    def _append_asset(self, asset: Asset):
+        self.assets.append(asset)
+        with profiling.stage("calendar"):
+            self.calendar.add(asset.dates)
+        self._panel = None
 
     def _update_shared_time_window(self):
-        combined_dates = set()
-        earliest_date = 0
-        latest_date = 0
-        for asset in self.assets:
-            combined_dates.update(asset.historical_data['Date'])
-            earliest_date = min(earliest_date, asset.historical_data['Date'].min())
-            latest_date = max(latest_date, asset.historical_data['Date'].max())
-        combined_dates = sorted(combined_dates)
-        if self.start_date and self.start_date < earliest_date:
-            self.start_date = earliest_date
-        if self.end_date and self.end_date > latest_date:
-            self.end_date = latest_date
-        
-        self.combined_window = pd.DataFrame({"Date": combined_dates})
+        # The calendar is kept up to date by the asset changes, only the dates are clipped here
+        if len(self.calendar) == 0:
+            return
+        if getattr(self, "start_date", None) and self.start_date < pd.Timestamp(self.calendar.first_date):
+            self.start_date = pd.Timestamp(self.calendar.first_date)
+        if getattr(self, "end_date", None) and self.end_date > pd.Timestamp(self.calendar.last_date):
+            self.end_date = pd.Timestamp(self.calendar.last_date)
     
     def compute_portfolio_returns(self, start_date: datetime, end_date: datetime):
         """
         Compute the return distribution of the portfolio between two dates.
+        The return of each asset window is memoized in return_cache.
         """
         for asset in self.assets:
-            asset.set_window(start_date, end_date)
-            asset.returns = asset.get_returns()
+            asset.returns = self.return_cache.window_return(asset.window(start_date, end_date))
         
         portfolio_returns = sum([asset.weight * asset.returns for asset in self.assets])
         return portfolio_returns
@@ -89,7 +577,13 @@ class Portfolio:
         """
         Plot the return distributions of the portfolio.
         """
-        plt.hist(self.portfolio_returns)
+        import matplotlib.pyplot as plt
+
+        if self.portfolio_returns is not None:
+            plt.hist(self.portfolio_returns)
+        else:
+            counts, edges = self.results.histogram()
+            plt.stairs(counts, edges, fill=True)
         plt.title("Portfolio Return Distributions")
         plt.xlabel("Returns")
         plt.ylabel("Frequency")
@@ -108,7 +602,12 @@ class Portfolio:
         """
         Remove an asset from the portfolio.
         """
+        for asset in self.assets:
+            if asset.asset_name == asset_name:
+                with profiling.stage("calendar"):
+                    self.calendar.remove(asset.dates)
         self.assets = [asset for asset in self.assets if asset.asset_name != asset_name]
+        self._panel = None
         self._update_shared_time_window()
 
 if __name__ == "__main__":
@@ -0,0 +1,199 @@
+"""
+Lightweight instrumentation of the simulation pipeline
+
+The pipeline reports the time spent in each stage and counts the work done
+through stage and count. Both return immediately while no profiler is active,
+so the instrumentation costs one global lookup when profiling is disabled.
+
+    with profile() as profiler:
+        portfolio.compute_return_distribution(...)
+    print(profiler.format())
+"""
+
+import cProfile
+import io
+import json
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from typing import Dict, Iterable, Iterator, Optional, Sequence
+
+PROFILE_HOOKS = ("cprofile", "tracemalloc")
+
+# Counters divided by the time of a stage to report a throughput
+RATES = {
+    "windows_per_second": ("windows_evaluated", "windows"),
+    "simulations_per_second": ("simulations", "simulation"),
+}
+
+_active = None
+_disabled = nullcontext()
+
+
+class Profiler:
+    """
+    Timers per stage and counters of one profiled run.
+
+    Stages may be entered from several threads; their times are then summed.
+    hooks enables "cprofile" (function-level profile of the run) and
+    "tracemalloc" (peak traced memory and the largest allocation sites).
+    """
+
+    def __init__(self, hooks: Sequence[str] = ()):
+        unknown = set(hooks) - set(PROFILE_HOOKS)
+        if unknown:
+            raise ValueError(f"Unknown profile hooks {sorted(unknown)}. Use any of {PROFILE_HOOKS}.")
+        self.hooks = tuple(hooks)
+        self.stages = {}
+        self.counters = {}
+        self.seconds = 0.0
+        self.cprofile = None
+        self.memory = None
+        self._lock = threading.Lock()
+        self._started = None
+
+    def start(self):
+        self._started = time.perf_counter()
+        if "tracemalloc" in self.hooks:
+            tracemalloc.start()
+        if "cprofile" in self.hooks:
+            self.cprofile = cProfile.Profile()
+            self.cprofile.enable()
+
+    def stop(self):
+        if self.cprofile is not None:
+            self.cprofile.disable()
+        if "tracemalloc" in self.hooks:
+            snapshot = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            self.memory = {
+                "peak_bytes": peak,
+                "top_allocations": [
+                    {"location": str(stat.traceback), "bytes": stat.size, "count": stat.count}
+                    for stat in snapshot.statistics("lineno")[:10]
+                ],
+            }
+        self.seconds = time.perf_counter() - self._started
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                stage = self.stages.setdefault(name, {"seconds": 0.0, "calls": 0})
+                stage["seconds"] += elapsed
+                stage["calls"] += 1
+
+    def count(self, name: str, value: int = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def report(self) -> Dict:
+        """
+        Dictionary of the total time, the stages, the counters and the derived rates.
+        """
+        rates = {}
+        for rate, (counter, stage) in RATES.items():
+            seconds = self.stages.get(stage, {}).get("seconds", 0.0)
+            if counter in self.counters and seconds > 0:
+                rates[rate] = self.counters[counter] / seconds
+        report = {"seconds": self.seconds, "stages": self.stages, "counters": self.counters, "rates": rates}
+        if self.memory is not None:
+            report["memory"] = self.memory
+        if self.cprofile is not None:
+            report["cprofile"] = self.cprofile_stats()
+        return report
+
+    def cprofile_stats(self, limit: int = 20) -> str:
+        """
+        Functions with the highest cumulative time, as printed by pstats.
+        """
+        stream = io.StringIO()
+        pstats.Stats(self.cprofile, stream=stream).sort_stats("cumulative").print_stats(limit)
+        return stream.getvalue()
+
+    def format(self) -> str:
+        """
+        Human-readable breakdown of the stages and counters.
+        """
+        lines = [f"{'stage':<20} {'calls':>8} {'seconds':>10} {'share':>7}"]
+        for name, stage in sorted(self.stages.items(), key=lambda item: -item[1]["seconds"]):
+            share = stage["seconds"] / self.seconds if self.seconds > 0 else 0.0
+            lines.append(f"{name:<20} {stage['calls']:>8} {stage['seconds']:>10.4f} {share:>7.1%}")
+        lines.append(f"{'total':<20} {'':>8} {self.seconds:>10.4f}")
+        for name, value in sorted(self.counters.items()):
+            lines.append(f"{name:<29} {value:>10}")
+        for name, value in self.report()["rates"].items():
+            lines.append(f"{name:<29} {value:>10.0f}")
+        if self.memory is not None:
+            lines.append(f"{'peak_traced_bytes':<29} {self.memory['peak_bytes']:>10}")
+        return "\n".join(lines)
+
+    def write_json(self, path: str):
+        with open(path, "w") as f:
+            json.dump(self.report(), f, indent=2)
+
+
+@contextmanager
+def profile(hooks: Sequence[str] = ()) -> Iterator[Profiler]:
+    """
+    Profile the pipeline while the context is open. Profilers do not nest.
+    """
+    global _active
+    if _active is not None:
+        raise RuntimeError("A profiler is already active.")
+    profiler = Profiler(hooks)
+    _active = profiler
+    profiler.start()
+    try:
+        yield profiler
+    finally:
+        profiler.stop()
+        _active = None
+
+
+def active_profiler() -> Optional[Profiler]:
+    return _active
+
+
+def stage(name: str):
+    """
+    Context manager timing a stage of the active profiler, or doing nothing.
+    """
+    if _active is None:
+        return _disabled
+    return _active.stage(name)
+
+
+def timed(iterable: Iterable, name: str) -> Iterable:
+    """
+    Iterate over iterable, timing the production of every item as a stage of the active profiler.
+    """
+    if _active is None:
+        return iterable
+    return _timed(iterable, name)
+
+
+def _timed(iterable: Iterable, name: str) -> Iterator:
+    iterator = iter(iterable)
+    while True:
+        with stage(name):
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+        yield item
+
+
+def count(name: str, value: int = 1):
+    """
+    Add value to a counter of the active profiler, if any.
+    """
+    if _active is not None:
+        _active.count(name, value)
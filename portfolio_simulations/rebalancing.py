@@ -0,0 +1,128 @@
+"""
+Path-level portfolio accounting with rebalancing, transaction costs and contributions
+"""
+
+import numpy as np
+from typing import Dict
+
+REBALANCE_POLICIES = ("none", "monthly", "quarterly", "annual", "threshold")
+
+# Rebalances per year of the calendar policies
+CALENDAR_FREQUENCIES = {"monthly": 12, "quarterly": 4, "annual": 1}
+
+
+class Rebalancing:
+    """
+    Rules followed by a portfolio along its paths: when it is brought back to its target
+    weights, what trading costs and how much is contributed periodically.
+
+    Holdings are tracked through time for all paths at once: the time steps are walked
+    in order, and each step updates the (paths, assets) holdings with array operations.
+
+    Args:
+        policy: "none" (buy and hold), "monthly", "quarterly" or "annual" (calendar rebalancing)
+            or "threshold" (rebalance a path when a weight drifts more than threshold from its target)
+        threshold: Largest absolute drift of a weight allowed by the "threshold" policy
+        transaction_cost: Cost of trading, as a fraction of the amount bought or sold
+        contribution: Amount added every contribution_every steps, invested at the target weights,
+            in units of the initial wealth
+        contribution_every: Number of steps between contributions
+    """
+
+    def __init__(self,
+        policy: str = "none",
+        threshold: float = 0.05,
+        transaction_cost: float = 0.0,
+        contribution: float = 0.0,
+        contribution_every: int = 21
+    ):
+        if policy not in REBALANCE_POLICIES:
+            raise ValueError(f"Unknown rebalancing policy {policy!r}. Use one of {REBALANCE_POLICIES}.")
+        if threshold <= 0:
+            raise ValueError("threshold must be positive.")
+        if not 0 <= transaction_cost < 1:
+            raise ValueError("transaction_cost must be between 0 and 1.")
+        if contribution_every < 1:
+            raise ValueError("contribution_every must be at least 1.")
+        self.policy = policy
+        self.threshold = threshold
+        self.transaction_cost = transaction_cost
+        self.contribution = contribution
+        self.contribution_every = contribution_every
+
+    def rebalance_steps(self, num_steps: int, steps_per_year: int = 252) -> np.ndarray:
+        """
+        Mask of the steps at the end of which a calendar policy rebalances every path.
+        """
+        steps = np.arange(1, num_steps + 1)
+        if self.policy not in CALENDAR_FREQUENCIES:
+            return np.zeros(num_steps, dtype=bool)
+        period = max(1, steps_per_year // CALENDAR_FREQUENCIES[self.policy])
+        return steps % period == 0
+
+    def contribution_steps(self, num_steps: int) -> np.ndarray:
+        """
+        Amount contributed at the end of each step.
+        """
+        steps = np.arange(1, num_steps + 1)
+        return np.where(steps % self.contribution_every == 0, self.contribution, 0.0)
+
+    def path_statistics(self, log_returns: np.ndarray, weights: np.ndarray, steps_per_year: int = 252) -> Dict[str, np.ndarray]:
+        """
+        Account for the portfolio along every path and summarize each one.
+
+        Args:
+            log_returns: Per-step log returns of shape (paths, steps, assets)
+            weights: Target weights of the assets, the initial allocation of a wealth of 1
+            steps_per_year: Steps in a year, used to place the calendar rebalances and annualize the volatility
+
+        Returns:
+            Dictionary of arrays with one entry per path: "terminal_wealth" (including the
+            contributions), "max_drawdown" and "volatility" of the time-weighted returns,
+            which exclude the contributions, and the "turnover" and "costs" of the trades,
+            in units of the initial wealth
+        """
+        num_paths, num_steps, _ = log_returns.shape
+        # Step-major, asset-major layout so that every step works on contiguous rows of paths
+        growth = np.exp(np.ascontiguousarray(log_returns.transpose(1, 2, 0)))
+        calendar = self.rebalance_steps(num_steps, steps_per_year)
+        contributions = self.contribution_steps(num_steps)
+        targets = np.asarray(weights, dtype=float)[:, None]
+
+        holdings = np.repeat(targets, num_paths, axis=1)
+        wealth = np.ones(num_paths)
+        index = np.ones((num_steps + 1, num_paths))
+        turnover = np.zeros(num_paths)
+        costs = np.zeros(num_paths)
+        for step in range(num_steps):
+            holdings *= growth[step]
+
+            if contributions[step]:
+                holdings += contributions[step] * (1 - self.transaction_cost) * targets
+                turnover += contributions[step]
+                costs += contributions[step] * self.transaction_cost
+            total = holdings.sum(axis=0)
+
+            if calendar[step] or self.policy == "threshold":
+                deviation = np.abs(holdings - total * targets)
+                traded = deviation.sum(axis=0)
+                if self.policy == "threshold":
+                    traded *= deviation.max(axis=0) > self.threshold * total
+                cost = traded * self.transaction_cost
+                total = total - cost
+                holdings = np.where(traded > 0, total * targets, holdings)
+                turnover += traded
+                costs += cost
+            # Time-weighted return of the step: costs are a loss, contributions are not a gain
+            index[step + 1] = index[step] * (total - contributions[step]) / wealth
+            wealth = total
+
+        index = index.T
+        peaks = np.maximum.accumulate(index, axis=1)
+        return {
+            "terminal_wealth": wealth,
+            "max_drawdown": (1 - index / peaks).max(axis=1),
+            "volatility": np.diff(np.log(index), axis=1).std(axis=1, ddof=1) * np.sqrt(steps_per_year),
+            "turnover": turnover,
+            "costs": costs,
+        }
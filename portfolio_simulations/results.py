@@ -0,0 +1,180 @@
+"""
+Streaming, constant-memory accumulation of simulation results
+"""
+
+import numpy as np
+from typing import Dict, Optional, Tuple, Union
+
+
+class StreamingResults:
+    """
+    Summary of a stream of simulated returns in O(1) memory.
+
+    Values are added in chunks with update. The accumulator keeps the count, an
+    online mean and variance (Welford / Chan), the minimum and maximum, a fixed-bin
+    histogram and a quantile sketch (t-digest), from which the value at risk and
+    the conditional value at risk are estimated. Two accumulators built on
+    different chunks of a run can be combined with merge. Keeping the raw samples
+    is optional; they are then available as an ndarray of the requested dtype.
+    """
+
+    def __init__(self,
+        keep_samples: bool = False,
+        dtype: Union[str, np.dtype] = np.float64,
+        histogram_range: Tuple[float, float] = (-1.0, 1.0),
+        bins: int = 200,
+        compression: int = 200
+    ):
+        self.keep_samples = keep_samples
+        self.dtype = np.dtype(dtype)
+        self.compression = compression
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+        self.bin_edges = np.linspace(histogram_range[0], histogram_range[1], bins + 1)
+        self.bin_counts = np.zeros(bins, dtype=np.int64)
+        self.underflow = 0
+        self.overflow = 0
+        self._centroid_means = np.empty(0)
+        self._centroid_weights = np.empty(0)
+        self._sample_chunks = []
+
+    def update(self, values: np.ndarray) -> "StreamingResults":
+        """
+        Add a chunk of values.
+        """
+        values = np.asarray(values, dtype=np.float64).ravel()
+        if len(values) == 0:
+            return self
+        self._combine_moments(len(values), values.mean(), ((values - values.mean()) ** 2).sum())
+        self.min = min(self.min, values.min())
+        self.max = max(self.max, values.max())
+
+        self.bin_counts += np.histogram(values, self.bin_edges)[0]
+        self.underflow += int((values < self.bin_edges[0]).sum())
+        self.overflow += int((values > self.bin_edges[-1]).sum())
+
+        self._compress(np.concatenate([self._centroid_means, values]),
+                       np.concatenate([self._centroid_weights, np.ones(len(values))]))
+        if self.keep_samples:
+            self._sample_chunks.append(values.astype(self.dtype))
+        return self
+
+    def merge(self, other: "StreamingResults") -> "StreamingResults":
+        """
+        Add the state of another accumulator with the same histogram bins.
+        """
+        if not np.array_equal(self.bin_edges, other.bin_edges):
+            raise ValueError("Only results with the same histogram bins can be merged.")
+        if other.count == 0:
+            return self
+        self._combine_moments(other.count, other.mean, other._m2)
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.bin_counts += other.bin_counts
+        self.underflow += other.underflow
+        self.overflow += other.overflow
+        self._compress(np.concatenate([self._centroid_means, other._centroid_means]),
+                       np.concatenate([self._centroid_weights, other._centroid_weights]))
+        if self.keep_samples and other.keep_samples:
+            self._sample_chunks.extend(chunk.astype(self.dtype) for chunk in other._sample_chunks)
+        return self
+
+    @property
+    def variance(self) -> float:
+        return self._m2 / self.count if self.count > 0 else float("nan")
+
+    @property
+    def std(self) -> float:
+        return float(np.sqrt(self.variance))
+
+    @property
+    def samples(self) -> Optional[np.ndarray]:
+        """
+        All values in the order they were added, or None if samples are not kept.
+        """
+        if not self.keep_samples:
+            return None
+        if len(self._sample_chunks) != 1:
+            self._sample_chunks = [np.concatenate(self._sample_chunks) if self._sample_chunks else np.empty(0, dtype=self.dtype)]
+        return self._sample_chunks[0]
+
+    def histogram(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Counts and edges of the fixed-bin histogram. Values outside the range are counted in underflow and overflow.
+        """
+        return self.bin_counts, self.bin_edges
+
+    def quantile(self, q: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
+        """
+        Estimated quantiles, interpolated between the centroids of the sketch.
+        """
+        if self.count == 0:
+            raise ValueError("No values have been added.")
+        cumulative = np.cumsum(self._centroid_weights)
+        centers = (cumulative - self._centroid_weights / 2) / self.count
+        positions = np.concatenate([[0.0], centers, [1.0]])
+        values = np.concatenate([[self.min], self._centroid_means, [self.max]])
+        result = np.interp(q, positions, values)
+        return float(result) if np.ndim(result) == 0 else result
+
+    def value_at_risk(self, level: float = 0.95) -> float:
+        """
+        Loss not exceeded with probability level, as a positive number for losses.
+        """
+        return -self.quantile(1 - level)
+
+    def conditional_value_at_risk(self, level: float = 0.95) -> float:
+        """
+        Average loss in the worst 1 - level of the outcomes, as a positive number for losses.
+        """
+        if self.count == 0:
+            raise ValueError("No values have been added.")
+        # Weight of each centroid that falls inside the tail, the last one only partially
+        cutoff = (1 - level) * self.count
+        before = np.cumsum(self._centroid_weights) - self._centroid_weights
+        inside = np.clip(cutoff - before, 0, self._centroid_weights)
+        return -float((inside * self._centroid_means).sum() / inside.sum())
+
+    def summary(self, level: float = 0.95) -> Dict[str, float]:
+        """
+        Dictionary of the count, moments, extremes, quartiles and tail-risk estimates.
+        """
+        q25, q50, q75 = self.quantile(np.array([0.25, 0.5, 0.75]))
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "std": self.std,
+            "min": self.min,
+            "q25": q25,
+            "median": q50,
+            "q75": q75,
+            "max": self.max,
+            "value_at_risk": self.value_at_risk(level),
+            "conditional_value_at_risk": self.conditional_value_at_risk(level),
+        }
+
+    def _combine_moments(self, count: int, mean: float, m2: float):
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self._m2 += m2 + delta ** 2 * self.count * count / total
+        self.count = total
+
+    def _compress(self, means: np.ndarray, weights: np.ndarray):
+        """
+        Merge points into at most about compression centroids, finer in the tails.
+
+        Each point is assigned to the integer bucket of the arcsine scale function at
+        its cumulative weight, and the points of a bucket are averaged into one centroid.
+        """
+        order = np.argsort(means, kind="stable")
+        means, weights = means[order], weights[order]
+        total = weights.sum()
+        q = (np.cumsum(weights) - weights / 2) / total
+        buckets = np.floor(self.compression * (np.arcsin(2 * q - 1) / np.pi + 0.5)).astype(np.int64)
+        _, inverse = np.unique(buckets, return_inverse=True)
+        self._centroid_weights = np.bincount(inverse, weights=weights)
+        self._centroid_means = np.bincount(inverse, weights=weights * means) / self._centroid_weights
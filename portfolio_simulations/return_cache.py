@@ -0,0 +1,104 @@
+"""
+Shared, bounded memo of the annualized return of asset windows
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Tuple
+from portfolio_simulations import profiling
+
+WindowKey = Tuple[str, int, int]
+
+
+class ReturnCache:
+    """
+    Least-recently-used memo of window returns keyed on asset content and window bounds.
+
+    A window is identified by the content key of its asset (a hash of its dates and
+    prices, see Asset.content_key) and its start and stop offsets, so portfolios that
+    load the same series separately share their entries, and an asset whose data is
+    refreshed gets a new key. At most maxsize windows are kept; the least recently used
+    one is evicted first. The cache can be shared between threads.
+    """
+
+    def __init__(self, maxsize: int = 100000):
+        if maxsize <= 0:
+            raise ValueError("maxsize must be positive.")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._keys_by_asset = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def window_return(self, window) -> float:
+        """
+        Annualized return of an AssetWindow, computed once per distinct window.
+        """
+        return self.get((window.asset.content_key, window.start, window.stop), window.get_returns)
+
+    def get(self, key: WindowKey, compute: Callable[[], float]) -> float:
+        """
+        Value of key, calling compute and storing its result on a miss.
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                profiling.count("return_cache_hits")
+                return self._entries[key]
+            self.misses += 1
+        profiling.count("return_cache_misses")
+        value = compute()
+        with self._lock:
+            self._entries[key] = value
+            self._keys_by_asset.setdefault(key[0], set()).add(key)
+            while len(self._entries) > self.maxsize:
+                evicted, _ = self._entries.popitem(last=False)
+                self._discard_asset_key(evicted)
+                self.evictions += 1
+        return value
+
+    def invalidate(self, content_key: Hashable):
+        """
+        Drop every window of the asset with this content key, e.g. after its data is refreshed.
+        """
+        with self._lock:
+            for key in self._keys_by_asset.pop(content_key, ()):
+                self._entries.pop(key, None)
+
+    def clear(self):
+        """
+        Drop every entry and reset the counters.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_asset.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def info(self) -> Dict[str, int]:
+        """
+        Hit, miss and eviction counts with the current and maximum size.
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+        }
+
+    def _discard_asset_key(self, key: WindowKey):
+        keys = self._keys_by_asset.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_asset[key[0]]
+
+
+# Cache shared by every portfolio that is not given its own
+default_return_cache = ReturnCache()
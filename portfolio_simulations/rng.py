@@ -0,0 +1,37 @@
+"""
+Seedable random number generation shared by the samplers and simulation engines
+"""
+
+import numpy as np
+from typing import List, Union
+
+SeedLike = Union[int, np.random.SeedSequence, np.random.Generator, None]
+
+
+def as_generator(seed: SeedLike) -> np.random.Generator:
+    """
+    numpy Generator of a seed. A Generator is returned as is, so that callers can share one stream.
+    """
+    if isinstance(seed, np.random.Generator):
+        return seed
+    return np.random.default_rng(seed)
+
+
+def seed_sequence(seed: SeedLike) -> np.random.SeedSequence:
+    """
+    SeedSequence of a seed, a SeedSequence or a numpy Generator.
+
+    A Generator is advanced to derive the sequence, so repeated calls give different sequences.
+    """
+    if isinstance(seed, np.random.SeedSequence):
+        return seed
+    if isinstance(seed, np.random.Generator):
+        return np.random.SeedSequence(seed.integers(2 ** 63, size=4))
+    return np.random.SeedSequence(seed)
+
+
+def spawn_generators(seed: SeedLike, n: int) -> List[np.random.Generator]:
+    """
+    n independent Generators spawned from a seed, one per chunk or worker.
+    """
+    return [np.random.default_rng(child) for child in seed_sequence(seed).spawn(n)]
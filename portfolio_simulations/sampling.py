@@ -0,0 +1,93 @@
+"""
+Sampling of rolling-window start dates
+"""
+
+import numpy as np
+from typing import Optional
+from portfolio_simulations.rng import SeedLike, as_generator
+
+SAMPLING_METHODS = ("uniform", "block", "stratified")
+
+
+def year_strata(dates: np.ndarray) -> np.ndarray:
+    """
+    Calendar year of each datetime64 date, to stratify samples by year.
+    """
+    return np.asarray(dates, dtype="datetime64[Y]").astype(np.int64) + 1970
+
+
+def sample_windows(
+    num_candidates: int,
+    num_samples: int,
+    method: str = "uniform",
+    seed: SeedLike = None,
+    replace: bool = False,
+    block_size: int = 21,
+    strata: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    Draw num_samples indices among num_candidates windows in one vectorized pass.
+
+    Methods:
+        "uniform": uniform draws, without replacement through a single permutation unless replace is True
+        "block": circular block bootstrap, blocks of block_size consecutive windows from uniform starts
+        "stratified": without replacement, with every stratum represented in proportion to its size
+
+    Args:
+        num_candidates: Number of distinct windows to sample from
+        num_samples: Number of indices to draw
+        method: One of SAMPLING_METHODS
+        seed: Seed or numpy Generator of the random numbers
+        replace: Whether uniform draws are made with replacement
+        block_size: Number of consecutive windows in each block of the block bootstrap
+        strata: Stratum label of each candidate, e.g. year_strata of the start dates
+
+    Returns:
+        Array of num_samples indices into the candidates
+    """
+    if method not in SAMPLING_METHODS:
+        raise ValueError(f"Unknown sampling method {method!r}. Use one of {SAMPLING_METHODS}.")
+    if num_candidates == 0:
+        raise ValueError("Not enough data to generate return distribution, reduce rolling_window or num_simulations.")
+    without_replacement = (method == "uniform" and not replace) or method == "stratified"
+    if without_replacement and num_samples > num_candidates:
+        raise ValueError(
+            f"num_simulations ({num_samples}) exceeds the {num_candidates} distinct windows available. "
+            "Reduce num_simulations, sample with replacement, or use exhaustive=True to evaluate every window."
+        )
+    rng = as_generator(seed)
+
+    if method == "uniform":
+        if replace:
+            return rng.integers(0, num_candidates, size=num_samples)
+        return rng.permutation(num_candidates)[:num_samples]
+
+    if method == "block":
+        if block_size <= 0:
+            raise ValueError("block_size must be positive.")
+        num_blocks = -(-num_samples // block_size)
+        starts = rng.integers(0, num_candidates, size=num_blocks)
+        return ((starts[:, None] + np.arange(block_size)) % num_candidates).ravel()[:num_samples]
+
+    if strata is None or len(strata) != num_candidates:
+        raise ValueError("Stratified sampling needs one stratum label per candidate window.")
+    labels, group_sizes = np.unique(strata, return_counts=True)
+    quotas = _proportional_allocation(group_sizes, num_samples)
+
+    # Shuffle once, then group by stratum keeping the shuffled order inside each stratum
+    permutation = rng.permutation(num_candidates)
+    ordered = permutation[np.argsort(np.searchsorted(labels, strata[permutation]), kind="stable")]
+    group_starts = np.repeat(np.cumsum(group_sizes) - group_sizes, group_sizes)
+    rank_in_group = np.arange(num_candidates) - group_starts
+    return ordered[rank_in_group < np.repeat(quotas, group_sizes)]
+
+
+def _proportional_allocation(group_sizes: np.ndarray, total: int) -> np.ndarray:
+    """
+    Split total across groups in proportion to their size with the largest remainder method.
+    """
+    exact = total * group_sizes / group_sizes.sum()
+    quotas = np.floor(exact).astype(np.int64)
+    remainders = np.argsort(quotas - exact, kind="stable")[:total - quotas.sum()]
+    quotas[remainders] += 1
+    return quotas
@@ -0,0 +1,389 @@
+"""
+Resident simulation service keeping price data and window returns in memory
+
+The service loads every ticker once, keeps the (windows, assets) matrix of asset
+returns of each asset set, window and date range it was asked for, and answers
+portfolio requests over a minimal local HTTP interface:
+
+    GET  /status      loaded tickers, cached matrices and request counters
+    POST /simulate    JSON specification, answered with the return statistics
+
+    python -m portfolio_simulations.cli --serve --port 8765
+    ServiceClient("127.0.0.1:8765").simulate(["SPY", "AGG"], [0.6, 0.4], rolling_window=5)
+"""
+
+import asyncio
+import http.client
+import json
+import logging
+import os
+import time
+import numpy as np
+import pandas as pd
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+from portfolio_simulations.asset import Asset
+from portfolio_simulations.cache import PriceCache
+from portfolio_simulations.panel import PricePanel
+from portfolio_simulations.sampling import sample_windows
+from portfolio_simulations.sweep import sweep_statistics
+from portfolio_simulations.windows import exhaustive_window_returns
+
+DEFAULT_ADDRESS = "127.0.0.1:8765"
+
+# Address of a running service used by the command line, when set
+SERVICE_ENV = "PORTFOLIO_SIMULATIONS_SERVICE"
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 500: "Internal Server Error", 504: "Gateway Timeout"}
+
+logger = logging.getLogger(__name__)
+
+
+class SimulationService:
+    """
+    Answers portfolio simulation requests from prices and window returns kept in memory.
+
+    Tickers are loaded once, through cache if given, and requests for the same ticker
+    share the load. The asset returns over every window of an asset set, rolling window
+    and date range are computed once and kept in a least-recently-used memo of
+    max_matrices entries, so a request for new weights on known assets is one matrix
+    product. Requests for the same assets and options that arrive within batch_delay
+    seconds of each other are evaluated together by sweep_statistics, as candidates of
+    one sweep. Loading and evaluation run on a thread pool, so the event loop keeps
+    accepting requests.
+
+    A request that is not answered within timeout seconds (or its own shorter
+    "timeout") fails with a timeout; it is cancelled and left out of its batch if the
+    batch has not started. Stopping the service cancels the pending requests.
+
+    Args:
+        cache: PriceCache the tickers are loaded through, or None to download them
+        batch_delay: Seconds a request waits for others to be batched with it
+        max_batch: Number of requests evaluated at once, a batch starts as soon as it is full
+        timeout: Longest time in seconds a request may take
+        max_matrices: Number of asset return matrices kept in memory
+        max_workers: Threads loading tickers and evaluating batches
+    """
+
+    def __init__(self,
+        cache: Optional[PriceCache] = None,
+        batch_delay: float = 0.002,
+        max_batch: int = 256,
+        timeout: float = 30.0,
+        max_matrices: int = 64,
+        max_workers: int = 8
+    ):
+        self.cache = cache
+        self.batch_delay = batch_delay
+        self.max_batch = max_batch
+        self.timeout = timeout
+        self.max_matrices = max_matrices
+        self.address = None
+        self.counters = {"requests": 0, "batches": 0, "timeouts": 0, "errors": 0}
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._assets = {}
+        self._matrices = OrderedDict()
+        self._pending = {}
+        self._server = None
+
+    async def simulate(self, spec: Dict) -> Dict:
+        """
+        Statistics of the returns of one portfolio over its rolling windows.
+
+        The specification has "assets" and "weights", and optionally "rolling_window"
+        (years, 5 by default), "start_date", "end_date", "simulations" and "seed" (to
+        sample that many windows, as compute_return_distribution does, instead of using
+        every window), "quantiles", "level" and "timeout".
+
+        Returns:
+            Dictionary of the statistics of sweep_statistics, with the number of windows
+            evaluated and the time taken in milliseconds
+        """
+        started = time.perf_counter()
+        self.counters["requests"] += 1
+        key, weights = _request_key(spec)
+        timeout = min(float(spec.get("timeout") or self.timeout), self.timeout)
+
+        future = asyncio.get_running_loop().create_future()
+        batch = self._pending.setdefault(key, [])
+        batch.append((weights, future))
+        if len(batch) == 1:
+            asyncio.get_running_loop().call_later(self.batch_delay, self._flush, key)
+        elif len(batch) >= self.max_batch:
+            self._flush(key)
+
+        try:
+            result = await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            self.counters["timeouts"] += 1
+            raise TimeoutError(f"The simulation did not complete within {timeout:g} seconds.") from None
+        except Exception:
+            self.counters["errors"] += 1
+            raise
+        result["elapsed_ms"] = (time.perf_counter() - started) * 1000
+        return result
+
+    def status(self) -> Dict:
+        """
+        Loaded tickers, cached matrices and request counters.
+        """
+        return {
+            "address": self.address,
+            "tickers": sorted(name for name, task in self._assets.items() if task.done() and not task.exception()),
+            "matrices": len(self._matrices),
+            **self.counters,
+        }
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8765) -> asyncio.AbstractServer:
+        """
+        Listen for HTTP requests. Port 0 picks a free port, see address.
+        """
+        self._server = await asyncio.start_server(self._handle, host, port)
+        host, port = self._server.sockets[0].getsockname()[:2]
+        self.address = f"{host}:{port}"
+        return self._server
+
+    async def stop(self):
+        """
+        Stop listening and cancel the requests that are still pending.
+        """
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        for batch in self._pending.values():
+            for _, future in batch:
+                future.cancel()
+        self._pending.clear()
+        self._executor.shutdown(wait=False)
+
+    def _flush(self, key: Tuple):
+        batch = self._pending.pop(key, None)
+        if batch:
+            self.counters["batches"] += 1
+            asyncio.ensure_future(self._evaluate(key, batch))
+
+    async def _evaluate(self, key: Tuple, batch: List):
+        assets, rolling_window, start_date, end_date, simulations, seed, quantiles, level = key
+        try:
+            asset_returns = await self._asset_returns(assets, rolling_window, start_date, end_date)
+            # Requests that timed out or were cancelled while waiting are left out
+            batch = [(weights, future) for weights, future in batch if not future.done()]
+            if not batch:
+                return
+            if simulations is not None:
+                asset_returns = asset_returns[sample_windows(len(asset_returns), simulations, seed=seed)]
+            candidates = np.array([weights for weights, _ in batch])
+            statistics = await asyncio.get_running_loop().run_in_executor(
+                self._executor, sweep_statistics, asset_returns, candidates, quantiles, level
+            )
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for index, (_, future) in enumerate(batch):
+            if not future.done():
+                result = {name: float(values[index]) for name, values in statistics.items()}
+                result["windows"] = len(asset_returns)
+                future.set_result(result)
+
+    async def _asset_returns(self, assets: Tuple[str, ...], rolling_window: int, start_date, end_date) -> np.ndarray:
+        key = (assets, rolling_window, start_date, end_date)
+        if key not in self._matrices:
+            loaded = await asyncio.gather(*(self._asset(name) for name in assets))
+            if key not in self._matrices:
+                self._matrices[key] = asyncio.get_running_loop().run_in_executor(
+                    self._executor, _window_matrix, loaded, rolling_window, start_date, end_date
+                )
+                while len(self._matrices) > self.max_matrices:
+                    self._matrices.popitem(last=False)
+        self._matrices.move_to_end(key)
+        try:
+            return await asyncio.shield(self._matrices[key])
+        except Exception:
+            self._matrices.pop(key, None)
+            raise
+
+    async def _asset(self, name: str) -> Asset:
+        if name not in self._assets:
+            self._assets[name] = asyncio.get_running_loop().run_in_executor(
+                self._executor, lambda: Asset(name, weight=1.0, cache=self.cache)
+            )
+        try:
+            return await asyncio.shield(self._assets[name])
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # A failed load is retried by the next request
+            self._assets.pop(name, None)
+            raise ValueError(f"Could not load {name}: {e}") from None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            method, path, _ = (await reader.readline()).decode("latin-1").split(" ", 2)
+            length = 0
+            while True:
+                line = (await reader.readline()).decode("latin-1").strip()
+                if not line:
+                    break
+                name, _, value = line.partition(":")
+                if name.strip().lower() == "content-length":
+                    length = int(value)
+            body = await reader.readexactly(length) if length else b""
+
+            try:
+                if method == "GET" and path == "/status":
+                    status, payload = 200, self.status()
+                elif method == "POST" and path == "/simulate":
+                    status, payload = 200, await self.simulate(json.loads(body or b"{}"))
+                else:
+                    status, payload = 404, {"error": f"No route {method} {path}."}
+            except TimeoutError as e:
+                status, payload = 504, {"error": str(e)}
+            except (ValueError, KeyError, TypeError) as e:
+                status, payload = 400, {"error": str(e)}
+            except Exception as e:
+                # The connection is still answered, so a client does not wait for its timeout
+                logger.exception("Request %s %s failed", method, path)
+                status, payload = 500, {"error": f"Internal error: {e}"}
+
+            data = json.dumps(payload).encode()
+            writer.write(
+                f"HTTP/1.1 {status} {REASONS[status]}\r\nContent-Type: application/json\r\n"
+                f"Content-Length: {len(data)}\r\nConnection: close\r\n\r\n".encode() + data
+            )
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+
+def run_service(host: str = "127.0.0.1", port: int = 8765, **kwargs):
+    """
+    Run a SimulationService until interrupted. Keyword arguments are passed to SimulationService.
+    """
+    async def main():
+        service = SimulationService(**kwargs)
+        server = await service.start(host, port)
+        print(f"Serving portfolio simulations on http://{service.address}", flush=True)
+        try:
+            await server.serve_forever()
+        finally:
+            await service.stop()
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
+
+
+class ServiceClient:
+    """
+    Blocking client of a running SimulationService.
+
+    Args:
+        address: "host:port" of the service, by default $PORTFOLIO_SIMULATIONS_SERVICE or DEFAULT_ADDRESS
+        timeout: Seconds to wait for an answer
+    """
+
+    def __init__(self, address: Optional[str] = None, timeout: float = 60.0):
+        self.address = address or os.environ.get(SERVICE_ENV) or DEFAULT_ADDRESS
+        self.timeout = timeout
+
+    def simulate(self, assets: Sequence[str], weights: Sequence[float], **options) -> Dict:
+        """
+        Statistics of one portfolio, see SimulationService.simulate for the options.
+
+        Raises:
+            ValueError: The request is invalid or its tickers could not be loaded
+            TimeoutError: The service did not answer in time
+            RuntimeError: The service failed to evaluate the request
+        """
+        spec = {"assets": list(assets), "weights": [float(weight) for weight in weights], **options}
+        status, payload = self._request("POST", "/simulate", spec)
+        if status == 504:
+            raise TimeoutError(payload["error"])
+        if status == 500:
+            raise RuntimeError(payload["error"])
+        if status != 200:
+            raise ValueError(payload["error"])
+        return payload
+
+    def status(self) -> Dict:
+        return self._request("GET", "/status")[1]
+
+    def is_available(self) -> bool:
+        """
+        Whether a service answers at the address.
+        """
+        try:
+            self.status()
+        except OSError:
+            return False
+        return True
+
+    def _request(self, method: str, path: str, body: Optional[Dict] = None) -> Tuple[int, Dict]:
+        host, _, port = self.address.rpartition(":")
+        connection = http.client.HTTPConnection(host, int(port), timeout=self.timeout)
+        try:
+            data = None if body is None else json.dumps(body)
+            connection.request(method, path, body=data, headers={"Content-Type": "application/json"})
+            response = connection.getresponse()
+            return response.status, json.loads(response.read() or b"{}")
+        finally:
+            connection.close()
+
+
+def _request_key(spec: Dict) -> Tuple[Tuple, List[float]]:
+    """
+    Key of the requests that can be batched together, with the weights in the order of the key's assets.
+
+    Raises:
+        ValueError: A field of the request is missing its expected type or range
+    """
+    if not isinstance(spec, dict):
+        raise ValueError("A request must be a JSON object.")
+    assets, weights = list(spec["assets"]), [float(weight) for weight in spec["weights"]]
+    if not assets or len(assets) != len(weights):
+        raise ValueError("A request needs as many weights as assets.")
+    if not all(isinstance(name, str) for name in assets):
+        raise ValueError("assets must be ticker strings.")
+    if not np.all(np.isfinite(weights)):
+        raise ValueError("weights must be finite numbers.")
+    order = sorted(range(len(assets)), key=lambda i: assets[i])
+    simulations = spec.get("simulations")
+    seed = spec.get("seed")
+    if simulations is not None and seed is None:
+        # Unseeded samples are drawn for each request alone
+        seed = int(np.random.SeedSequence().entropy % 2 ** 63)
+    key = (
+        tuple(assets[i] for i in order),
+        int(spec.get("rolling_window", 5)),
+        spec.get("start_date"),
+        spec.get("end_date"),
+        None if simulations is None else int(simulations),
+        None if seed is None else int(seed),
+        tuple(float(q) for q in spec.get("quantiles", (0.05, 0.5, 0.95))),
+        float(spec.get("level", 0.95)),
+    )
+    _, rolling_window, _, _, simulations, _, quantiles, level = key
+    if rolling_window < 1:
+        raise ValueError("rolling_window must be at least 1.")
+    if simulations is not None and simulations < 1:
+        raise ValueError("simulations must be at least 1.")
+    if not all(0 <= q <= 1 for q in quantiles):
+        raise ValueError("quantiles must lie between 0 and 1.")
+    if not 0 < level < 1:
+        raise ValueError("level must lie strictly between 0 and 1.")
+    return key, [weights[i] for i in order]
+
+
+def _window_matrix(assets: List[Asset], rolling_window: int, start_date, end_date) -> np.ndarray:
+    panel = PricePanel.from_assets(assets)
+    start_date = None if start_date is None else pd.Timestamp(start_date)
+    end_date = None if end_date is None else pd.Timestamp(end_date)
+    _, asset_returns = exhaustive_window_returns(panel, rolling_window, start_date, end_date)
+    return asset_returns
@@ -0,0 +1,99 @@
+"""
+Incrementally maintained union calendar of the portfolio assets
+"""
+
+import numpy as np
+from typing import Optional
+
+
+class SharedCalendar:
+    """
+    Sorted union of the dates of many assets, with the number of assets trading on each date.
+
+    Adding or removing an asset only locates its own dates in the calendar with a
+    binary search and updates their reference counts, instead of rescanning and
+    re-sorting every asset. Dates are copied only when the calendar gains dates
+    before its last one, or loses dates no asset trades on anymore. Portfolio builds
+    its price panel on these dates instead of merging the dates of every asset again.
+    """
+
+    def __init__(self):
+        self.dates = np.array([], dtype="datetime64[ns]")
+        self.counts = np.array([], dtype=np.int64)
+        self._buffers = None
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    @property
+    def first_date(self) -> Optional[np.datetime64]:
+        return self.dates[0] if len(self.dates) else None
+
+    @property
+    def last_date(self) -> Optional[np.datetime64]:
+        return self.dates[-1] if len(self.dates) else None
+
+    def common_dates(self, num_assets: int) -> np.ndarray:
+        """
+        Dates on which all num_assets assets of the calendar trade, their intersection.
+        """
+        return self.dates[self.counts == num_assets]
+
+    def add(self, dates: np.ndarray):
+        """
+        Add the sorted dates of one asset.
+
+        Dates after every known date, e.g. the bars of a new day, are written to a
+        buffer that doubles when full, so adding a day at a time costs amortized O(1)
+        copies. Dates before the last known date are inserted with one copy per call.
+        """
+        dates = _distinct_sorted(dates)
+        rows = np.searchsorted(self.dates, dates)
+        present = rows < len(self.dates)
+        present[present] = self.dates[rows[present]] == dates[present]
+        self.counts[rows[present]] += 1
+        if present.all():
+            return
+        new_rows, new_dates = rows[~present], dates[~present]
+        if new_rows[0] == len(self.dates):
+            self._extend(new_dates)
+        else:
+            self.dates = np.insert(self.dates, new_rows, new_dates)
+            self.counts = np.insert(self.counts, new_rows, 1)
+            self._buffers = None
+
+    def remove(self, dates: np.ndarray):
+        """
+        Remove the sorted dates of one asset previously added.
+        """
+        dates = _distinct_sorted(dates)
+        rows = np.searchsorted(self.dates, dates)
+        if np.any(rows >= len(self.dates)) or np.any(self.dates[np.minimum(rows, len(self.dates) - 1)] != dates):
+            raise ValueError("Only dates that were added to the calendar can be removed.")
+        self.counts[rows] -= 1
+        unused = rows[self.counts[rows] == 0]
+        if len(unused):
+            self.dates = np.delete(self.dates, unused)
+            self.counts = np.delete(self.counts, unused)
+            self._buffers = None
+
+    def _extend(self, dates: np.ndarray):
+        # Views of the dates taken before keep their data, only rows after them are written
+        size, added = len(self.dates), len(dates)
+        if self._buffers is None or len(self._buffers[0]) < size + added:
+            capacity = max(2 * (size + added), 64)
+            buffers = (np.empty(capacity, dtype="datetime64[ns]"), np.empty(capacity, dtype=np.int64))
+            buffers[0][:size] = self.dates
+            buffers[1][:size] = self.counts
+            self._buffers = buffers
+        self._buffers[0][size:size + added] = dates
+        self._buffers[1][size:size + added] = 1
+        self.dates = self._buffers[0][:size + added]
+        self.counts = self._buffers[1][:size + added]
+
+
+def _distinct_sorted(dates: np.ndarray) -> np.ndarray:
+    dates = np.asarray(dates, dtype="datetime64[ns]")
+    if len(dates) > 1 and np.any(dates[1:] == dates[:-1]):
+        dates = dates[np.concatenate([[True], dates[1:] != dates[:-1]])]
+    return dates
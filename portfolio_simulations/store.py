@@ -0,0 +1,205 @@
+"""
+Memory-mapped columnar store of simulation results
+"""
+
+import json
+import os
+import numpy as np
+from datetime import datetime
+from typing import Dict, Iterator, Optional, Union
+from portfolio_simulations.results import StreamingResults
+
+
+class ResultStore:
+    """
+    Scenario results of one run persisted in a directory of columnar .npy files.
+
+    The directory holds one file per column, returns.npy (the annualized portfolio
+    return of each window) and start_dates.npy (the datetime64 start of each window),
+    next to metadata.json with the run parameters (assets, weights, window, seed,
+    engine, content keys of the prices, ...) and the number of chunks already written. The columns are
+    allocated at their full size when the store is created and written chunk by
+    chunk through a memory map, so a run that is interrupted can resume after its
+    last completed chunk, and readers can slice the columns without loading them.
+    """
+
+    COLUMNS = ("returns", "start_dates")
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        with open(self._path("metadata.json")) as f:
+            self.metadata = json.load(f)
+
+    @classmethod
+    def create(cls,
+        directory: str,
+        start_dates: np.ndarray,
+        chunk_size: int,
+        dtype: Union[str, np.dtype] = np.float64,
+        metadata: Optional[Dict] = None
+    ) -> "ResultStore":
+        """
+        Allocate a store for one result per start date, written in chunks of chunk_size.
+
+        Args:
+            directory: Directory of the store, created if needed
+            start_dates: Start date of every window of the run, in evaluation order
+            chunk_size: Number of results written at once
+            dtype: Float dtype of the returns column
+            metadata: Run parameters recorded with the results
+        """
+        if chunk_size <= 0:
+            raise ValueError("chunk_size must be positive.")
+        os.makedirs(directory, exist_ok=True)
+        start_dates = np.asarray(start_dates, dtype="datetime64[ns]")
+
+        path = os.path.join(directory, "start_dates.npy")
+        with open(path + ".tmp", "wb") as f:
+            np.save(f, start_dates)
+        os.replace(path + ".tmp", path)
+        returns = np.lib.format.open_memmap(os.path.join(directory, "returns.npy"), mode="w+", dtype=dtype, shape=(len(start_dates),))
+        returns.flush()
+        del returns
+
+        store_metadata = dict(metadata or {})
+        store_metadata.update({
+            "created_at": datetime.now().isoformat(),
+            "rows": len(start_dates),
+            "dtype": np.dtype(dtype).str,
+            "chunk_size": chunk_size,
+            "completed_chunks": 0,
+        })
+        cls._write_metadata(directory, store_metadata)
+        return cls(directory)
+
+    @classmethod
+    def exists(cls, directory: str) -> bool:
+        return os.path.exists(os.path.join(directory, "metadata.json"))
+
+    def __len__(self) -> int:
+        return self.metadata["rows"]
+
+    @property
+    def num_chunks(self) -> int:
+        return -(-len(self) // self.metadata["chunk_size"])
+
+    @property
+    def completed_chunks(self) -> int:
+        return self.metadata["completed_chunks"]
+
+    @property
+    def completed_rows(self) -> int:
+        return min(self.completed_chunks * self.metadata["chunk_size"], len(self))
+
+    @property
+    def is_complete(self) -> bool:
+        return self.completed_chunks == self.num_chunks
+
+    def column(self, name: str) -> np.ndarray:
+        """
+        Read-only memory map of a whole column, read from disk only where it is sliced.
+        """
+        if name not in self.COLUMNS:
+            raise KeyError(f"Unknown column {name!r}. Use one of {self.COLUMNS}.")
+        return np.load(self._path(f"{name}.npy"), mmap_mode="r")
+
+    @property
+    def returns(self) -> np.ndarray:
+        return self.column("returns")
+
+    @property
+    def start_dates(self) -> np.ndarray:
+        return self.column("start_dates")
+
+    def read(self, start: int = 0, stop: Optional[int] = None, column: str = "returns") -> np.ndarray:
+        """
+        Copy of the rows start to stop of a column, limited to the completed chunks.
+        """
+        stop = self.completed_rows if stop is None else min(stop, self.completed_rows)
+        return np.array(self.column(column)[start:stop])
+
+    def iter_chunks(self, column: str = "returns") -> Iterator[np.ndarray]:
+        """
+        Yield the completed chunks of a column one at a time.
+        """
+        chunk_size = self.metadata["chunk_size"]
+        for start in range(0, self.completed_rows, chunk_size):
+            yield self.read(start, start + chunk_size, column)
+
+    def write_chunk(self, index: int, returns: np.ndarray):
+        """
+        Write the returns of the next chunk and record it as completed.
+
+        Chunks are written in order; the metadata is only updated once the data is flushed.
+        """
+        if index != self.completed_chunks:
+            raise ValueError(f"Chunk {index} cannot be written after {self.completed_chunks} completed chunks.")
+        chunk_size = self.metadata["chunk_size"]
+        start = index * chunk_size
+        stop = min(start + chunk_size, len(self))
+        if len(returns) != stop - start:
+            raise ValueError(f"Chunk {index} must hold {stop - start} results, got {len(returns)}.")
+
+        column = np.load(self._path("returns.npy"), mmap_mode="r+")
+        column[start:stop] = returns
+        column.flush()
+        del column
+        self.metadata["completed_chunks"] = index + 1
+        self._write_metadata(self.directory, self.metadata)
+
+    def append(self, start_dates: np.ndarray, returns: np.ndarray):
+        """
+        Add rows after those of a complete store, e.g. the windows that became valid with new prices.
+
+        The columns are rewritten at their new size and swapped in atomically, then every
+        chunk, including the new rows, is recorded as completed.
+        """
+        if not self.is_complete:
+            raise ValueError("Rows can only be appended to a complete store.")
+        start_dates = np.asarray(start_dates, dtype="datetime64[ns]")
+        if len(start_dates) != len(returns):
+            raise ValueError("start_dates and returns must have the same length.")
+        if len(start_dates) == 0:
+            return
+        rows = len(self) + len(start_dates)
+
+        dates_path, returns_path = self._path("start_dates.npy"), self._path("returns.npy")
+        with open(dates_path + ".tmp", "wb") as f:
+            np.save(f, np.concatenate([self.start_dates, start_dates]))
+        column = np.lib.format.open_memmap(returns_path + ".tmp", mode="w+", dtype=self.metadata["dtype"], shape=(rows,))
+        column[:len(self)] = self.returns
+        column[len(self):] = returns
+        column.flush()
+        del column
+        os.replace(dates_path + ".tmp", dates_path)
+        os.replace(returns_path + ".tmp", returns_path)
+
+        self.metadata["rows"] = rows
+        self.metadata["completed_chunks"] = self.num_chunks
+        self._write_metadata(self.directory, self.metadata)
+
+    def update_metadata(self, values: Dict):
+        """
+        Update run parameters recorded with the results, e.g. after appending rows.
+        """
+        self.metadata.update(values)
+        self._write_metadata(self.directory, self.metadata)
+
+    def to_results(self, keep_samples: bool = False, **kwargs) -> StreamingResults:
+        """
+        StreamingResults of the completed chunks, accumulated one chunk at a time.
+        """
+        results = StreamingResults(keep_samples=keep_samples, dtype=self.metadata["dtype"], **kwargs)
+        for chunk in self.iter_chunks():
+            results.update(chunk)
+        return results
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    @staticmethod
+    def _write_metadata(directory: str, metadata: Dict):
+        path = os.path.join(directory, "metadata.json")
+        with open(path + ".tmp", "w") as f:
+            json.dump(metadata, f)
+        os.replace(path + ".tmp", path)
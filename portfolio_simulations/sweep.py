@@ -0,0 +1,111 @@
+"""
+Evaluation of many candidate weight vectors on the same rolling windows
+"""
+
+import itertools
+import numpy as np
+from typing import Dict, Sequence
+from portfolio_simulations.rng import SeedLike, as_generator
+
+
+def weight_grid(num_assets: int, step: float = 0.1) -> np.ndarray:
+    """
+    Every weight vector of num_assets non-negative multiples of step summing to 1.
+
+    Returns:
+        Array of shape (candidates, num_assets)
+    """
+    units = int(round(1 / step))
+    if units <= 0 or not np.isclose(units * step, 1):
+        raise ValueError("step must divide 1, e.g. 0.1, 0.05 or 0.25.")
+    if num_assets <= 0:
+        raise ValueError("The grid needs at least one asset.")
+    # Stars and bars: the positions of num_assets - 1 bars among units + num_assets - 1 slots
+    combinations = list(itertools.combinations(range(units + num_assets - 1), num_assets - 1))
+    bars = np.array(combinations, dtype=np.int64).reshape(len(combinations), num_assets - 1)
+    edges = np.hstack([np.full((len(bars), 1), -1), bars, np.full((len(bars), 1), units + num_assets - 1)])
+    return (np.diff(edges, axis=1) - 1) / units
+
+
+def dirichlet_weights(num_assets: int, num_candidates: int, alpha: float = 1.0, seed: SeedLike = None) -> np.ndarray:
+    """
+    num_candidates random weight vectors drawn from a symmetric Dirichlet distribution.
+
+    alpha=1 draws uniformly on the simplex, smaller values favour concentrated portfolios.
+    """
+    return as_generator(seed).dirichlet(np.full(num_assets, alpha), size=num_candidates)
+
+
+def sweep_statistics(
+    asset_returns: np.ndarray,
+    candidates: np.ndarray,
+    quantiles: Sequence[float] = (0.05, 0.5, 0.95),
+    level: float = 0.95,
+    chunk_size: int = 1000
+) -> Dict[str, np.ndarray]:
+    """
+    Distribution statistics of the portfolio returns of every candidate weight vector.
+
+    The portfolio returns of a chunk of candidates are one matrix product of the
+    (windows, assets) matrix of asset returns with the (assets, candidates) weights.
+
+    Args:
+        asset_returns: Annualized return of every asset over every window, shape (windows, assets)
+        candidates: Weight vectors, shape (candidates, assets)
+        quantiles: Quantiles of the returns reported for each candidate
+        level: Confidence level of the value at risk and conditional value at risk
+        chunk_size: Number of candidates evaluated at once, to bound memory to windows x chunk_size
+
+    Returns:
+        Dictionary of arrays with one entry per candidate: "mean", "std", "min", "max",
+        "quantile_<q>", "value_at_risk" and "conditional_value_at_risk" (losses as positive numbers)
+    """
+    quantiles = tuple(quantiles)
+    if not all(0 <= q <= 1 for q in quantiles):
+        raise ValueError("quantiles must lie between 0 and 1.")
+    if not 0 < level < 1:
+        raise ValueError("level must lie strictly between 0 and 1.")
+    asset_returns = np.asarray(asset_returns, dtype=np.float64)
+    candidates = np.atleast_2d(np.asarray(candidates, dtype=np.float64))
+    if candidates.shape[1] != asset_returns.shape[1]:
+        raise ValueError(f"Each candidate needs {asset_returns.shape[1]} weights, got {candidates.shape[1]}.")
+    num_windows = len(asset_returns)
+    if num_windows == 0:
+        raise ValueError("Not enough data to generate return distribution, reduce rolling_window or num_simulations.")
+    tail_size = max(1, int(np.ceil(round((1 - level) * num_windows, 9))))
+
+    columns = {name: [] for name in ("mean", "std", "min", "max", "value_at_risk", "conditional_value_at_risk")}
+    columns.update({f"quantile_{q:g}": [] for q in quantiles})
+    for start in range(0, len(candidates), chunk_size):
+        returns = np.sort(asset_returns @ candidates[start:start + chunk_size].T, axis=0)
+        columns["mean"].append(returns.mean(axis=0))
+        columns["std"].append(returns.std(axis=0))
+        columns["min"].append(returns[0].copy())
+        columns["max"].append(returns[-1].copy())
+        for q in quantiles:
+            columns[f"quantile_{q:g}"].append(_sorted_quantile(returns, q))
+        columns["value_at_risk"].append(-_sorted_quantile(returns, 1 - level))
+        columns["conditional_value_at_risk"].append(-returns[:tail_size].mean(axis=0))
+    return {name: np.concatenate(values) for name, values in columns.items()}
+
+
+def efficient_frontier(risk: np.ndarray, reward: np.ndarray) -> np.ndarray:
+    """
+    Mask of the candidates that no other candidate beats with lower or equal risk and higher reward.
+    """
+    risk, reward = np.asarray(risk), np.asarray(reward)
+    order = np.lexsort((-reward, risk))
+    best_before = np.concatenate([[-np.inf], np.maximum.accumulate(reward[order])[:-1]])
+    efficient = np.zeros(len(risk), dtype=bool)
+    efficient[order] = reward[order] > best_before
+    return efficient
+
+
+def _sorted_quantile(sorted_values: np.ndarray, q: float) -> np.ndarray:
+    # Linear interpolation between order statistics, as np.quantile, on columns already sorted
+    if not 0 <= q <= 1:
+        raise ValueError("quantiles must lie between 0 and 1.")
+    position = q * (len(sorted_values) - 1)
+    lower = int(np.floor(position))
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (position - lower) * (sorted_values[upper] - sorted_values[lower])
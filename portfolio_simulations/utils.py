@@ -1,12 +1,33 @@
+import warnings
 import numpy as np
 from datetime import datetime
-from typing import Dict, List
+from statistics import NormalDist
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+from portfolio_simulations import profiling
+from portfolio_simulations.panel import PricePanel
+from portfolio_simulations.parallel import chunk_sizes, map_chunks
+from portfolio_simulations.rebalancing import Rebalancing
+from portfolio_simulations.results import StreamingResults
+from portfolio_simulations.return_cache import default_return_cache
+from portfolio_simulations.rng import SeedLike, as_generator, seed_sequence
+
+PATH_STATISTICS = ("terminal_wealth", "max_drawdown", "volatility")
+BOOTSTRAP_METHODS = ("stationary", "circular")
+VARIANCE_REDUCTION = ("antithetic", "control", "sobol")
+PRECISION_STATISTICS = ("mean_return", "variance", "value_at_risk")
 
 def calculate_portfolio_statistics(assets: List, 
     start_date: datetime,
     end_date: datetime,
-    num_simulations: int = 1000
-) -> Dict[str, float]:
+    num_simulations: int = 1000,
+    seed: SeedLike = None,
+    n_jobs: int = 1,
+    chunk_size: int = 100000,
+    variance_reduction: Union[str, Sequence[str]] = (),
+    target_precision: Union[float, Dict[str, float], None] = None,
+    level: float = 0.95,
+    confidence: float = 0.95
+) -> Dict:
     """
     Calculate portfolio statistics using Monte Carlo simulation.
     
@@ -14,34 +35,493 @@ def calculate_portfolio_statistics(assets: List,
         assets: List of Asset objects
         start_date: Start date for analysis
         end_date: End date for analysis
-        num_simulations: Number of Monte Carlo simulations
+        num_simulations: Number of Monte Carlo simulations, the most that are drawn with target_precision
+        seed: Seed or numpy Generator of the random numbers
+        n_jobs: Number of worker processes the chunks of simulations are split across
+        chunk_size: Number of simulations drawn from each independent random stream
+        variance_reduction: Any of "antithetic" (every shock is paired with its opposite,
+            rounding the chunks up to an even size), "control" (the mean is corrected with
+            the shocks, whose mean of 0 is known) and "sobol" (scrambled Sobol shocks, needs
+            scipy, whose error is measured across chunks). The simulated returns are affine
+            in the shocks, so "antithetic" and "control" give the exact mean of this model
+            with a standard error of 0. simulate_portfolio_paths and
+            bootstrap_portfolio_paths do not apply them.
+        target_precision: Standard error at which to stop drawing, for "mean_return" if a
+            float, or per statistic as a dictionary with keys among PRECISION_STATISTICS.
+            Chunks are then drawn until every target is met, checking after each chunk,
+            and summarized in running sums and a quantile sketch of the value at risk.
+        level: Confidence level of the value at risk
+        confidence: Confidence level of the reported intervals
         
     Returns:
-        Dictionary containing mean return, variance, and Sharpe ratio
+        Dictionary containing mean return, variance, Sharpe ratio and value at risk, the
+        number of simulations drawn, and the "standard_errors" and "confidence_intervals"
+        of PRECISION_STATISTICS. With target_precision, "converged" tells whether every target was met.
     """
+    if num_simulations < 1:
+        raise ValueError("num_simulations must be at least 1.")
+    methods = _variance_reduction_methods(variance_reduction)
+    targets = _precision_targets(target_precision)
+
     # Get the time series data for each asset
     returns_list = []
     weights = []
     
     for asset in assets:
-        asset.set_window(start_date, end_date)
-        returns_list.append(asset.get_returns())
+        returns_list.append(default_return_cache.window_return(asset.window(start_date, end_date)))
         weights.append(asset.weight)
 
     # Calculate the weighted average returns
     weighted_returns = np.average(returns_list, weights=weights)
+    scale = np.std(returns_list)
+
+    # Run the Monte Carlo simulation, one independent random stream per chunk
+    sizes = chunk_sizes(num_simulations, chunk_size)
+    if "antithetic" in methods:
+        sizes = [size + size % 2 for size in sizes]
+    if "sobol" in methods and len(sizes) < 2:
+        warnings.warn("The error of Sobol shocks is measured across chunks: with a single chunk its standard error is unknown. Lower chunk_size to draw several chunks.")
+    seeds = seed_sequence(seed).spawn(len(sizes))
+    tasks = [(child, size, methods) for child, size in zip(seeds, sizes)]
+
+    # The precision is checked after every chunk, in task order, so the stopping point does not depend on n_jobs
+    accumulator = _ShockAccumulator(methods, sketch=targets is not None)
+    with profiling.stage("simulation"):
+        chunks = map_chunks(_shock_chunk, tasks, n_jobs=n_jobs)
+        for shocks in chunks:
+            accumulator.update(shocks)
+            if targets is not None and _meets_targets(accumulator.statistics(weighted_returns, scale, level, confidence), targets):
+                chunks.close()
+                break
+    stats = accumulator.statistics(weighted_returns, scale, level, confidence)
+    profiling.count("simulations", stats["num_simulations"])
+
+    if targets is not None:
+        stats["converged"] = _meets_targets(stats, targets)
+    return stats
+
+
+def _variance_reduction_methods(variance_reduction: Union[str, Sequence[str]]) -> Tuple[str, ...]:
+    methods = (variance_reduction,) if isinstance(variance_reduction, str) else tuple(variance_reduction)
+    unknown = set(methods) - set(VARIANCE_REDUCTION)
+    if unknown:
+        raise ValueError(f"Unknown variance reduction {sorted(unknown)}. Use any of {VARIANCE_REDUCTION}.")
+    if "sobol" in methods:
+        try:
+            from scipy.stats import qmc  # noqa: F401
+        except ImportError:
+            raise ImportError("Sobol sequences need scipy: pip install scipy") from None
+    return tuple(sorted(set(methods)))
+
+
+def _precision_targets(target_precision: Union[float, Dict[str, float], None]) -> Optional[Dict[str, float]]:
+    if target_precision is None:
+        return None
+    targets = target_precision if isinstance(target_precision, dict) else {"mean_return": target_precision}
+    unknown = set(targets) - set(PRECISION_STATISTICS)
+    if unknown:
+        raise ValueError(f"Unknown statistics {sorted(unknown)} in target_precision. Use any of {PRECISION_STATISTICS}.")
+    if any(value <= 0 for value in targets.values()):
+        raise ValueError("target_precision must be positive.")
+    return dict(targets)
+
+
+def _meets_targets(stats: Dict, targets: Dict[str, float]) -> bool:
+    return all(stats["standard_errors"][name] <= target for name, target in targets.items())
+
+
+def _shock_chunk(arrays: Dict[str, np.ndarray], task: tuple) -> np.ndarray:
+    seed, size, methods = task
+    draws = size // 2 if "antithetic" in methods else size
+    if "sobol" in methods:
+        from scipy.special import ndtri
+        from scipy.stats import qmc
+        sampler = qmc.Sobol(d=1, scramble=True, seed=np.random.default_rng(seed))
+        with warnings.catch_warnings():
+            # Sizes that are not powers of two lose some balance but remain valid
+            warnings.simplefilter("ignore", UserWarning)
+            shocks = ndtri(sampler.random(draws)[:, 0])
+    else:
+        shocks = np.random.default_rng(seed).standard_normal(draws)
+    if "antithetic" in methods:
+        # Pairs are kept next to each other so that they can be averaged
+        shocks = np.stack([shocks, -shocks], axis=1).ravel()
+    return shocks
+
+
+class _ShockAccumulator:
+    """
+    Summary of the shocks of a Monte Carlo run, updated one chunk at a time.
+
+    The simulated returns are loc + scale * shocks, so their statistics follow from the
+    power sums of the shocks, the sums of the units of the error of the mean (antithetic
+    pair averages or single shocks) and the mean of every chunk for the Sobol replicates.
+    The value at risk is read from the shocks themselves, kept until the end, or with
+    sketch from a quantile sketch, so that checking the precision after every chunk
+    does not revisit earlier draws.
+    """
+
+    def __init__(self, methods: Tuple[str, ...], sketch: bool = False):
+        self.methods = methods
+        self.count = 0
+        self.power_sums = np.zeros(4)
+        self.unit_count = 0
+        self.unit_sums = np.zeros(2)
+        self.chunk_means = []
+        self.chunks = []
+        self.sketch = StreamingResults(histogram_range=(-10.0, 10.0), bins=1, compression=1000) if sketch else None
+
+    def update(self, shocks: np.ndarray):
+        squares = shocks * shocks
+        sums = [shocks.sum(), squares.sum(), squares @ shocks, squares @ squares]
+        del squares
+        self.count += len(shocks)
+        self.power_sums += sums
+        if "antithetic" in self.methods:
+            units = shocks.reshape(-1, 2).mean(axis=1)
+            unit_sums = [units.sum(), units @ units]
+        else:
+            units, unit_sums = shocks, sums[:2]
+        self.unit_count += len(units)
+        self.unit_sums += unit_sums
+        self.chunk_means.append((len(units), unit_sums[0] / len(units)))
+        if self.sketch is not None:
+            self.sketch.update(shocks)
+        else:
+            self.chunks.append(shocks)
+
+    def quantiles(self, q: np.ndarray) -> np.ndarray:
+        """
+        Quantiles of the shocks, exact with linear interpolation unless a sketch is kept.
+        """
+        if self.sketch is not None:
+            return self.sketch.quantile(q)
+        if len(self.chunks) > 1:
+            self.chunks = [np.concatenate(self.chunks)]
+        shocks = self.chunks[0]
+        positions = q * (len(shocks) - 1)
+        below = np.floor(positions).astype(np.intp)
+        above = np.minimum(below + 1, len(shocks) - 1)
+        # The order of the kept shocks does not matter any more: partition them in place
+        shocks.partition(np.unique(np.concatenate([below, above])))
+        return shocks[below] + (positions - below) * (shocks[above] - shocks[below])
+
+    def statistics(self, loc: float, scale: float, level: float, confidence: float) -> Dict:
+        """
+        Statistics of the simulated returns with their standard errors.
+
+        The returns are affine in the shocks, so antithetic pairs average exactly to loc
+        and the control variate, the shock itself, explains all of their variation: both
+        give the exact mean of this model with a standard error of 0, rather than reducing
+        a variance. Sobol shocks measure the error of the mean across the independently
+        scrambled chunks. The errors of the variance and of the value at risk assume
+        independent draws.
+        """
+        n = self.count
+        z = NormalDist().inv_cdf((1 + confidence) / 2)
+        mean, second, third, fourth = self.power_sums / n
+        shock_variance = max(second - mean ** 2, 0.0)
+        shock_fourth = fourth - 4 * mean * third + 6 * mean ** 2 * second - 3 * mean ** 4
+
+        if "control" in self.methods:
+            mean_return, mean_error = loc, 0.0
+        else:
+            mean_return = loc + scale * mean
+            if "sobol" in self.methods and len(self.chunk_means) < 2:
+                mean_error = np.inf
+            elif "sobol" in self.methods:
+                # Every chunk is an independent randomization of the sequence: its mean is one replicate
+                counts, means = np.array(self.chunk_means).T
+                shares = counts / counts.sum()
+                spread = np.sum(shares ** 2 * (means - means @ shares) ** 2) * len(means) / (len(means) - 1)
+                mean_error = scale * np.sqrt(spread)
+            elif self.unit_count > 1:
+                unit_mean = self.unit_sums[0] / self.unit_count
+                unit_variance = max(self.unit_sums[1] - self.unit_count * unit_mean ** 2, 0.0) / (self.unit_count - 1)
+                mean_error = scale * np.sqrt(unit_variance / self.unit_count)
+            else:
+                mean_error = np.inf
+
+        variance = scale ** 2 * shock_variance
+        variance_error = scale ** 2 * np.sqrt(max(shock_fourth - shock_variance ** 2, 0.0) / n)
+
+        # Value at risk with a distribution-free interval from the ranks around its quantile
+        tail = 1 - level
+        spread = z * np.sqrt(tail * (1 - tail) / n)
+        quantiles = loc + scale * self.quantiles(np.clip([tail - spread, tail, tail + spread], 0.0, 1.0))
+        low, value_at_risk, high = quantiles[0], -quantiles[1], quantiles[2]
+        value_at_risk_error = (high - low) / (2 * z)
+
+        return {
+            "mean_return": mean_return,
+            "variance": variance,
+            "sharpe_ratio": mean_return / np.sqrt(variance) if variance > 0 else 0.0,
+            "value_at_risk": value_at_risk,
+            "num_simulations": n,
+            "standard_errors": {
+                "mean_return": mean_error,
+                "variance": variance_error,
+                "value_at_risk": value_at_risk_error,
+            },
+            "confidence_intervals": {
+                "mean_return": (mean_return - z * mean_error, mean_return + z * mean_error),
+                "variance": (max(variance - z * variance_error, 0.0), variance + z * variance_error),
+                "value_at_risk": (-high, -low),
+            },
+        }
+
+
+def daily_log_returns(panel: PricePanel) -> np.ndarray:
+    """
+    Daily log returns of the assets of a panel, aligned on the dates on which every asset has a price.
+
+    Returns:
+        Array of shape (dates - 1, assets), one row per day for all the assets together
+    """
+    prices = panel.prices[np.isfinite(panel.prices).all(axis=1)]
+    return np.diff(np.log(prices.astype(float)), axis=0)
+
+
+def estimate_daily_moments(panel: PricePanel) -> Dict[str, np.ndarray]:
+    """
+    Estimate the mean and covariance of the daily log returns of the assets of a panel.
+
+    Only the dates on which every asset has a price are used.
+
+    Args:
+        panel: Aligned prices of the assets
 
-    # Run the Monte Carlo simulation
-    simulations = np.random.normal(loc=weighted_returns, scale=np.std(returns_list), size=num_simulations)
+    Returns:
+        Dictionary containing the "mean" vector and the "cov" matrix of the log returns
+    """
+    log_returns = daily_log_returns(panel)
+    if len(log_returns) < 2:
+        raise ValueError("At least three dates with a price for every asset are needed to estimate the return moments.")
+    return {
+        "mean": log_returns.mean(axis=0),
+        "cov": np.atleast_2d(np.cov(log_returns, rowvar=False))
+    }
+
+
+def simulate_portfolio_paths(mean: np.ndarray,
+    cov: np.ndarray,
+    weights: np.ndarray,
+    num_simulations: int = 10000,
+    num_steps: int = 252,
+    distribution: str = "normal",
+    df: float = 5.0,
+    steps_per_year: int = 252,
+    chunk_size: int = 10000,
+    seed: SeedLike = None,
+    reducer: Optional[Callable[[Dict[str, np.ndarray]], None]] = None,
+    n_jobs: int = 1,
+    rebalancing: Optional[Rebalancing] = None
+) -> Optional[Dict[str, np.ndarray]]:
+    """
+    Simulate correlated multi-asset price paths and summarize each buy-and-hold portfolio path.
+
+    Per-step log returns of the assets follow a geometric Brownian motion, correlated
+    through the Cholesky factor of cov. With distribution="t" the shocks follow a
+    multivariate Student-t with df degrees of freedom, scaled to the same covariance.
+    Paths are generated in chunks of chunk_size, so at most a (chunk_size, num_steps,
+    assets) block is held in memory at once by each process. Every chunk draws from
+    its own stream spawned from seed, so the paths do not depend on n_jobs.
+
+    Args:
+        mean: Mean of the per-step log returns of each asset
+        cov: Covariance matrix of the per-step log returns
+        weights: Initial weight of each asset
+        num_simulations: Number of paths
+        num_steps: Number of steps in each path
+        distribution: "normal" or "t"
+        df: Degrees of freedom of the Student-t distribution, must be above 2
+        steps_per_year: Steps in a year, used to annualize the volatility
+        chunk_size: Number of paths simulated at once
+        seed: Seed or numpy Generator of the random numbers
+        reducer: Optional callable receiving the statistics of each chunk of paths, in order
+        n_jobs: Number of worker processes the chunks are split across
+        rebalancing: Rebalancing policy, costs and contributions of the portfolio; buy and hold if None
+
+    Returns:
+        Dictionary containing the terminal wealth, maximum drawdown and annualized
+        volatility of each path, starting from a wealth of 1, with the turnover and costs
+        when rebalancing is passed (see Rebalancing.path_statistics). None if a reducer is passed.
+    """
+    mean = np.asarray(mean, dtype=float)
+    weights = np.asarray(weights, dtype=float)
+    if distribution not in ("normal", "t"):
+        raise ValueError(f"Unknown distribution {distribution!r}. Use 'normal' or 't'.")
+    if distribution == "t" and df <= 2:
+        raise ValueError("The Student-t distribution needs df above 2 to have a finite covariance.")
+    try:
+        cholesky = np.linalg.cholesky(np.atleast_2d(np.asarray(cov, dtype=float)))
+    except np.linalg.LinAlgError:
+        raise ValueError("The covariance matrix must be symmetric positive definite.") from None
+
+    weights = weights / weights.sum()
+    sizes = chunk_sizes(num_simulations, chunk_size)
+    seeds = seed_sequence(seed).spawn(len(sizes))
+    tasks = [
+        (child, size, num_steps, mean, cholesky, distribution, df, weights, steps_per_year, rebalancing)
+        for child, size in zip(seeds, sizes)
+    ]
+    with profiling.stage("simulation"):
+        statistics = _collect_path_statistics(map_chunks(_simulate_paths_chunk, tasks, n_jobs=n_jobs), num_simulations, reducer)
+    profiling.count("simulations", num_simulations)
+    return statistics
+
+
+def bootstrap_portfolio_paths(returns: np.ndarray,
+    weights: np.ndarray,
+    num_simulations: int = 10000,
+    num_steps: int = 252,
+    method: str = "stationary",
+    block_size: int = 21,
+    steps_per_year: int = 252,
+    chunk_size: int = 10000,
+    seed: SeedLike = None,
+    reducer: Optional[Callable[[Dict[str, np.ndarray]], None]] = None,
+    n_jobs: int = 1,
+    rebalancing: Optional[Rebalancing] = None
+) -> Optional[Dict[str, np.ndarray]]:
+    """
+    Build portfolio paths by resampling blocks of historical daily returns and summarize each path.
+
+    Each path is a sequence of blocks of consecutive days of returns, wrapping around
+    the end of the history. A block always takes the returns of every asset on the same
+    days, so the cross-asset correlation and the short-term autocorrelation within a
+    block are preserved, and any number of paths of any horizon can be drawn. With
+    method="circular" the blocks have block_size days; with method="stationary"
+    (Politis and Romano) their length is geometric with mean block_size. The block
+    indices of a whole chunk of paths are drawn at once, and the paths are summarized
+    as in simulate_portfolio_paths.
 
-    # Calculate the portfolio statistics
-    mean_return = np.mean(simulations)
-    variance = np.var(simulations)
-    sharpe_ratio = mean_return / np.sqrt(variance) if variance > 0 else 0
+    Args:
+        returns: Daily log returns of shape (days, assets), e.g. daily_log_returns(portfolio.panel)
+        weights: Initial weight of each asset
+        num_simulations: Number of paths
+        num_steps: Number of days in each path
+        method: "stationary" or "circular"
+        block_size: Length of the blocks, or their mean length for the stationary bootstrap
+        steps_per_year: Steps in a year, used to annualize the volatility
+        chunk_size: Number of paths built at once
+        seed: Seed or numpy Generator of the random numbers
+        reducer: Optional callable receiving the statistics of each chunk of paths, in order
+        n_jobs: Number of worker processes the chunks are split across; the returns are shared with them
+        rebalancing: Rebalancing policy, costs and contributions of the portfolio; buy and hold if None
+
+    Returns:
+        Dictionary containing the terminal wealth, maximum drawdown and annualized
+        volatility of each path, starting from a wealth of 1, with the turnover and costs
+        when rebalancing is passed. None if a reducer is passed.
+    """
+    returns = np.atleast_2d(np.asarray(returns, dtype=float))
+    weights = np.asarray(weights, dtype=float)
+    if method not in BOOTSTRAP_METHODS:
+        raise ValueError(f"Unknown bootstrap method {method!r}. Use one of {BOOTSTRAP_METHODS}.")
+    if block_size < 1:
+        raise ValueError("block_size must be at least 1.")
+    if len(returns) == 0:
+        raise ValueError("At least one day of returns for every asset is needed to bootstrap paths.")
+
+    weights = weights / weights.sum()
+    sizes = chunk_sizes(num_simulations, chunk_size)
+    seeds = seed_sequence(seed).spawn(len(sizes))
+    tasks = [
+        (child, size, num_steps, method, block_size, weights, steps_per_year, rebalancing)
+        for child, size in zip(seeds, sizes)
+    ]
+    with profiling.stage("simulation"):
+        chunks = map_chunks(_bootstrap_paths_chunk, tasks, n_jobs=n_jobs, arrays={"returns": returns})
+        statistics = _collect_path_statistics(chunks, num_simulations, reducer)
+    profiling.count("simulations", num_simulations)
+    return statistics
+
+
+def bootstrap_indices(
+    num_days: int,
+    num_paths: int,
+    num_steps: int,
+    method: str = "stationary",
+    block_size: int = 21,
+    seed: SeedLike = None
+) -> np.ndarray:
+    """
+    Day of the history used at every step of every path, of shape (num_paths, num_steps).
+    """
+    rng = as_generator(seed)
+    steps = np.arange(num_steps)
+    if method == "circular":
+        num_blocks = -(-num_steps // block_size)
+        starts = rng.integers(0, num_days, size=(num_paths, num_blocks))
+        return (np.repeat(starts, block_size, axis=1)[:, :num_steps] + steps % block_size) % num_days
+
+    # A new block starts at each step with probability 1 / block_size, always at the first step
+    new_block = rng.random((num_paths, num_steps)) < 1 / block_size
+    new_block[:, 0] = True
+    starts = rng.integers(0, num_days, size=(num_paths, num_steps))
+    block_steps = np.maximum.accumulate(np.where(new_block, steps, 0), axis=1)
+    return (np.take_along_axis(starts, block_steps, axis=1) + steps - block_steps) % num_days
+
+
+def _bootstrap_paths_chunk(arrays: Dict[str, np.ndarray], task: tuple) -> Dict[str, np.ndarray]:
+    seed, size, num_steps, method, block_size, weights, steps_per_year, rebalancing = task
+    returns = arrays["returns"]
+    days = bootstrap_indices(len(returns), size, num_steps, method, block_size, seed=np.random.default_rng(seed))
+    if rebalancing is not None:
+        return rebalancing.path_statistics(returns[days], weights, steps_per_year)
+    return _path_statistics(returns[days], weights, steps_per_year)
+
+
+def _simulate_paths_chunk(arrays: Dict[str, np.ndarray], task: tuple) -> Dict[str, np.ndarray]:
+    seed, size, num_steps, mean, cholesky, distribution, df, weights, steps_per_year, rebalancing = task
+    rng = np.random.default_rng(seed)
+    log_returns = rng.standard_normal((size, num_steps, len(mean))) @ cholesky.T
+    if distribution == "t":
+        log_returns *= np.sqrt((df - 2) / rng.chisquare(df, size=(size, num_steps, 1)))
+    log_returns += mean
+    if rebalancing is not None:
+        return rebalancing.path_statistics(log_returns, weights, steps_per_year)
+    return _path_statistics(log_returns, weights, steps_per_year)
+
+
+def _collect_path_statistics(
+    chunks: Iterable[Dict[str, np.ndarray]],
+    num_simulations: int,
+    reducer: Optional[Callable[[Dict[str, np.ndarray]], None]]
+) -> Optional[Dict[str, np.ndarray]]:
+    """
+    Pass the statistics of each chunk to reducer, or gather them into arrays of num_simulations paths.
+    """
+    statistics = None
+    start = 0
+    for chunk_statistics in chunks:
+        if reducer is not None:
+            reducer(chunk_statistics)
+            continue
+        if statistics is None:
+            statistics = {name: np.empty(num_simulations) for name in chunk_statistics}
+        size = len(chunk_statistics["terminal_wealth"])
+        for name, values in chunk_statistics.items():
+            statistics[name][start:start + size] = values
+        start += size
+    if statistics is None and reducer is None:
+        statistics = {name: np.empty(0) for name in PATH_STATISTICS}
+    return statistics
+
+
+def _path_statistics(log_returns: np.ndarray, weights: np.ndarray, steps_per_year: int) -> Dict[str, np.ndarray]:
+    """
+    Terminal wealth, maximum drawdown and annualized volatility of buy-and-hold portfolio paths.
+    """
+    growth = np.exp(np.cumsum(log_returns, axis=1, out=log_returns), out=log_returns)
+    wealth = np.ones((len(growth), growth.shape[1] + 1))
+    np.matmul(growth, weights, out=wealth[:, 1:])
 
-    # Return the statistics
+    peaks = np.maximum.accumulate(wealth, axis=1)
+    portfolio_log_returns = np.diff(np.log(wealth), axis=1)
     return {
-        "mean_return": mean_return,
-        "variance": variance,
-        "sharpe_ratio": sharpe_ratio
-    }
\ No newline at end of file
+        "terminal_wealth": wealth[:, -1].copy(),
+        "max_drawdown": (1 - wealth / peaks).max(axis=1),
+        "volatility": portfolio_log_returns.std(axis=1, ddof=1) * np.sqrt(steps_per_year)
+    }
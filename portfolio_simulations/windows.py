@@ -0,0 +1,149 @@
+"""
+Vectorized rolling-window computations on a PricePanel
+"""
+
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+from portfolio_simulations.panel import PricePanel
+
+
+def window_end_dates(start_dates: np.ndarray, rolling_window: int) -> np.ndarray:
+    """
+    Shift every start date forward by the rolling window, in calendar years.
+    """
+    # Same month and day rolling_window years later, 28 February for 29 February when the
+    # end year is not a leap year, like pd.DateOffset(years=rolling_window) but without pandas
+    start_dates = np.asarray(start_dates, dtype="datetime64[ns]")
+    end_months = start_dates.astype("datetime64[M]")
+    offsets = start_dates - end_months
+    end_months += np.timedelta64(12 * rolling_window, "M")
+    ends = end_months + offsets
+    ends[ends.astype("datetime64[M]") != end_months] -= np.timedelta64(1, "D")
+    return ends
+
+
+def candidate_start_rows(
+    panel: PricePanel,
+    rolling_window: int,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    first_row: int = 0
+) -> np.ndarray:
+    """
+    Rows of the calendar that can start a full window covered by every asset.
+
+    A row qualifies when its window lies within [start_date, end_date] and
+    within the first and last price of each asset. Only the rows from first_row
+    on are considered.
+    """
+    dates = panel.dates
+    if len(dates) == 0 or len(panel.names) == 0:
+        return np.array([], dtype=np.intp)
+
+    lower = dates[panel.first_valid_rows].max()
+    upper = dates[panel.last_valid_rows].min()
+    if start_date is not None:
+        lower = max(lower, np.datetime64(pd.Timestamp(start_date), "ns"))
+    if end_date is not None:
+        upper = min(upper, np.datetime64(pd.Timestamp(end_date), "ns"))
+
+    dates = dates[first_row:]
+    ends = window_end_dates(dates, rolling_window)
+    return first_row + np.flatnonzero((dates >= lower) & (ends <= upper))
+
+
+def rolling_window_returns(
+    panel: PricePanel,
+    start_rows: np.ndarray,
+    rolling_window: int
+) -> np.ndarray:
+    """
+    Annualized return of every asset over every window, in one batched gather.
+
+    Each window starts at panel.dates[start_rows] and ends rolling_window calendar
+    years later. Like Asset.get_returns, the first and last price of each asset
+    inside the window are compared and annualized on a 365.25-day year.
+
+    Args:
+        panel: Aligned prices of the assets
+        start_rows: Row index of the first date of each window, shape (K,)
+        rolling_window: Window length in years
+
+    Returns:
+        Matrix of annualized returns of shape (K, N)
+    """
+    return gather_window_returns(
+        panel.dates, panel.prices, panel.next_valid_rows, panel.previous_valid_rows,
+        start_rows, rolling_window
+    )
+
+
+def exhaustive_window_returns(
+    panel: PricePanel,
+    rolling_window: int,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Annualized return of every asset over every possible window, in one O(T·N) pass.
+
+    The annualized return is exp(log return / years) - 1, where the log return is the
+    difference of the panel log prices at the last and first price of each window.
+
+    Returns:
+        Tuple of the start rows of the windows, in date order, and the matrix of
+        annualized returns of shape (windows, assets)
+    """
+    start_rows = candidate_start_rows(panel, rolling_window, start_date, end_date)
+    dates = panel.dates
+    end_rows = np.searchsorted(dates, window_end_dates(dates[start_rows], rolling_window), side="right") - 1
+
+    first_rows = panel.next_valid_rows[start_rows]
+    last_rows = panel.previous_valid_rows[end_rows]
+    columns = np.arange(panel.prices.shape[1])
+
+    log_returns = panel.log_prices[last_rows, columns] - panel.log_prices[first_rows, columns]
+    years = ((dates[last_rows] - dates[first_rows]) // np.timedelta64(1, "D")) / 365.25
+    return start_rows, np.expm1(log_returns / years)
+
+
+def gather_window_returns(
+    dates: np.ndarray,
+    prices: np.ndarray,
+    next_valid_rows: np.ndarray,
+    previous_valid_rows: np.ndarray,
+    start_rows: np.ndarray,
+    rolling_window: int
+) -> np.ndarray:
+    """
+    rolling_window_returns on the raw arrays of a panel, so that it can run on shared memory.
+    """
+    start_rows = np.asarray(start_rows, dtype=np.intp)
+    end_rows = np.searchsorted(dates, window_end_dates(dates[start_rows], rolling_window), side="right") - 1
+
+    first_rows = next_valid_rows[start_rows]
+    last_rows = previous_valid_rows[end_rows]
+    columns = np.arange(prices.shape[1])
+
+    initial_prices = prices[first_rows, columns]
+    final_prices = prices[last_rows, columns]
+    days = (dates[last_rows] - dates[first_rows]) // np.timedelta64(1, "D")
+    years = days / 365.25
+
+    return (final_prices / initial_prices) ** (1 / years) - 1
+
+
+def portfolio_window_returns_chunk(arrays: Dict[str, np.ndarray], task: Tuple) -> np.ndarray:
+    """
+    Portfolio return of a chunk of windows, run by map_chunks on the arrays of a panel.
+
+    The task is a tuple of the start rows, the rolling window and the asset weights.
+    """
+    start_rows, rolling_window, weights = task
+    asset_returns = gather_window_returns(
+        arrays["dates"], arrays["prices"], arrays["next_valid_rows"], arrays["previous_valid_rows"],
+        start_rows, rolling_window
+    )
+    return asset_returns @ weights
@@ -17,7 +17,7 @@ setup(
         'Programming Language :: Python :: 3.12',
     ],
     keywords='portfolio simulations',
-    packages=find_packages(exclude=['contrib', 'docs', 'tests']),
+    packages=find_packages(exclude=['contrib', 'docs', 'tests', 'benchmarks']),
     install_requires=[
         'numpy>=1.21.0',
         'matplotlib>=3.5.0',
@@ -31,6 +31,9 @@ setup(
         'test': [
             'coverage',
         ],
+        'qmc': [
+            'scipy>=1.7',
+        ],
     },
     package_data={
         '': ['README.MD', 'LICENSE'],
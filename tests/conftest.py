@@ -2,6 +2,8 @@
 Pytest configuration and fixtures
 """
 
+import numpy as np
+import pandas as pd
 import pytest
 from datetime import datetime
 from portfolio_simulations.asset import Asset
@@ -45,3 +47,16 @@ def sample_portfolio(sample_dates, sample_values):
     portfolio.add_end_date(datetime(2022, 1, 1))
     
     return portfolio
+
+
+@pytest.fixture
+def daily_portfolio():
+    """Portfolio of three synthetic assets with ten years of business-day prices"""
+    rng = np.random.default_rng(42)
+    dates = list(pd.bdate_range("2010-01-01", "2019-12-31"))
+    portfolio = Portfolio()
+    for name, weight in [("ASSET1", 0.5), ("ASSET2", 0.3), ("ASSET3", 0.2)]:
+        daily_returns = rng.normal(0.0003, 0.01, size=len(dates))
+        values = list(100 * np.exp(np.cumsum(daily_returns)))
+        portfolio.add_asset(name, weight=weight, values=values, dates=dates)
+    return portfolio
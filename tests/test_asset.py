@@ -2,6 +2,7 @@
 Tests for the Asset class
 """
 
+import numpy as np
 import pytest
 from datetime import datetime, timedelta
 from portfolio_simulations.asset import Asset
@@ -68,3 +69,51 @@ class TestAsset:
         expected_return = 0.10  # 10% annual return
         
         assert abs(returns - expected_return) < 0.01  # Allow small floating point differences
+
+    def test_window_is_a_view(self):
+        """Test that a window slices the asset arrays without copying"""
+        dates = [datetime(2020, 1, 1), datetime(2020, 6, 1), datetime(2021, 1, 1)]
+        values = [100.0, 105.0, 110.0]
+
+        asset = Asset("TEST", weight=0.5, values=values, dates=dates)
+        window = asset.window(datetime(2020, 6, 1), datetime(2021, 1, 1))
+
+        assert (window.start, window.stop) == (1, 3)
+        assert np.shares_memory(window.closes, asset.closes)
+        assert len(asset.historical_data) == 3
+
+    def test_set_window_is_not_destructive(self):
+        """Test that a narrow window does not hide data from a later wider one"""
+        dates = [datetime(2020, 1, 1), datetime(2020, 6, 1), datetime(2021, 1, 1), datetime(2021, 6, 1)]
+        values = [100.0, 105.0, 110.0, 115.0]
+
+        asset = Asset("TEST", weight=0.5, values=values, dates=dates)
+        asset.set_window(datetime(2021, 1, 1), datetime(2021, 6, 1))
+        asset.set_window(datetime(2020, 1, 1), datetime(2021, 6, 1))
+
+        assert len(asset.historical_data) == 4
+        asset.reset_window()
+        assert asset.get_returns() == Asset("TEST", weight=0.5, values=values, dates=dates).get_returns()
+
+    def test_window_outside_history(self):
+        """Test that a window starting before the first date raises ValueError"""
+        asset = Asset("TEST", weight=0.5, values=[100.0, 110.0], dates=[datetime(2020, 1, 1), datetime(2021, 1, 1)])
+
+        with pytest.raises(ValueError, match="The earliest date of the asset TEST"):
+            asset.window(datetime(2019, 1, 1), datetime(2020, 6, 1))
+
+    def test_append_extends_in_place(self):
+        """Test that appended bars extend the arrays while earlier views keep their data"""
+        asset = Asset("TEST", weight=0.5, values=[100.0, 110.0], dates=[datetime(2020, 1, 1), datetime(2021, 1, 1)])
+        asset._append([np.datetime64("2021-01-04")], [111.0])
+        before = asset.closes
+
+        asset._append(np.array(["2021-01-05", "2021-01-06"], dtype="datetime64[ns]"), [np.nan, 113.0])
+
+        assert np.shares_memory(before, asset.closes)
+        np.testing.assert_array_equal(before, [100.0, 110.0, 111.0])
+        np.testing.assert_array_equal(asset.closes, [100.0, 110.0, 111.0, 111.0, 113.0])
+        assert not asset.closes.flags.writeable
+        with pytest.raises(ValueError, match="after"):
+            asset._append([np.datetime64("2021-01-06")], [114.0])
+
@@ -0,0 +1,117 @@
+"""
+Tests for the batch evaluation of portfolio specifications
+"""
+
+import json
+import numpy as np
+import pandas as pd
+import pytest
+from portfolio_simulations.batch import read_specs, run_batch, write_results
+from portfolio_simulations.cache import PriceCache
+
+
+class MultiFetcher:
+    """Stand-in for yfinance serving several tickers from memory and recording calls"""
+
+    def __init__(self, series):
+        self.series = series
+        self.calls = []
+
+    def __call__(self, ticker, start=None):
+        self.calls.append(ticker)
+        if ticker not in self.series:
+            return np.array([], dtype="datetime64[ns]"), np.array([])
+        dates, values = self.series[ticker]
+        return np.array(dates, dtype="datetime64[ns]"), np.array(values, dtype=float)
+
+
+@pytest.fixture
+def batch_cache(tmp_path):
+    dates = pd.bdate_range("2020-01-01", periods=800)
+    steps = np.linspace(0, 1, len(dates))
+    fetcher = MultiFetcher({
+        "AAA": (dates, 100 * np.exp(0.10 * steps)),
+        "BBB": (dates, 50 * np.exp(0.05 * steps + 0.01 * np.sin(np.arange(len(dates))))),
+    })
+    return PriceCache(str(tmp_path / "cache"), fetcher=fetcher), fetcher
+
+
+SPECS = [
+    {"name": "growth", "assets": ["AAA", "BBB"], "weights": [0.8, 0.2], "rolling_window": 1, "simulations": 50, "seed": 1},
+    {"name": "income", "assets": ["BBB"], "weights": [1.0], "rolling_window": 1, "simulations": 50, "seed": 2},
+    {"name": "broken", "assets": ["AAA", "MISSING"], "weights": [0.5, 0.5]},
+]
+
+
+class TestBatch:
+    """Test cases for the batch mode"""
+
+    def test_read_specs_formats(self, tmp_path):
+        """Test that JSON, JSON Lines and CSV files give the same specifications"""
+        (tmp_path / "specs.json").write_text(json.dumps({"portfolios": SPECS}))
+        (tmp_path / "specs.jsonl").write_text("".join(json.dumps(spec) + "\n" for spec in SPECS))
+        pd.DataFrame([
+            {**spec, "assets": ";".join(spec["assets"]), "weights": ";".join(map(str, spec["weights"]))}
+            for spec in SPECS
+        ]).to_csv(tmp_path / "specs.csv", index=False)
+
+        specs = read_specs(str(tmp_path / "specs.json"))
+        assert read_specs(str(tmp_path / "specs.jsonl")) == specs
+        assert read_specs(str(tmp_path / "specs.csv")) == specs
+        assert specs[0]["assets"] == ["AAA", "BBB"]
+        assert specs[2]["rolling_window"] == 5
+        assert specs[2]["seed"] is None
+
+    def test_invalid_spec(self, tmp_path):
+        """Test that a specification with mismatched weights is rejected"""
+        path = tmp_path / "specs.json"
+        path.write_text(json.dumps([{"assets": ["AAA", "BBB"], "weights": [1.0]}]))
+        with pytest.raises(ValueError, match="as many weights"):
+            read_specs(str(path))
+
+    def test_run_batch_loads_each_ticker_once(self, batch_cache):
+        """Test that shared tickers are fetched once and failures are reported per portfolio"""
+        cache, fetcher = batch_cache
+        specs = read_specs_from(SPECS)
+        rows = run_batch(specs, cache=cache)
+
+        assert sorted(fetcher.calls) == ["AAA", "BBB", "MISSING"]
+        assert [row["name"] for row in rows] == ["growth", "income", "broken"]
+        assert rows[0]["error"] is None and rows[0]["count"] == 50
+        assert rows[1]["error"] is None and np.isfinite(rows[1]["mean"])
+        assert "MISSING" in rows[2]["error"]
+
+    def test_parallel_matches_serial(self, batch_cache):
+        """Test that evaluating in worker processes gives the serial results"""
+        cache, _ = batch_cache
+        specs = read_specs_from(SPECS[:2])
+        assert run_batch(specs, cache=cache, n_jobs=2) == run_batch(specs, cache=cache, n_jobs=1)
+
+    def test_write_results_roundtrip(self, batch_cache, tmp_path):
+        """Test that results written as CSV and JSON Lines read back with one row per portfolio"""
+        cache, _ = batch_cache
+        rows = run_batch(read_specs_from(SPECS), cache=cache)
+        write_results(rows, str(tmp_path / "results.csv"))
+        write_results(rows, str(tmp_path / "results.jsonl"))
+
+        frame = pd.read_csv(tmp_path / "results.csv")
+        lines = [json.loads(line) for line in (tmp_path / "results.jsonl").read_text().splitlines()]
+        assert list(frame["name"]) == ["growth", "income", "broken"]
+        assert frame["assets"][0] == "AAA;BBB"
+        assert lines == rows
+
+    def test_unknown_output_format_checked_first(self, tmp_path, capsys, monkeypatch):
+        """Test that the command line rejects an unknown output format before loading any price"""
+        import argparse
+        from portfolio_simulations import batch, cli
+        (tmp_path / "specs.json").write_text(json.dumps(SPECS))
+        monkeypatch.setattr(batch, "run_batch", lambda *args, **kwargs: pytest.fail("run_batch was called"))
+        args = argparse.Namespace(batch=str(tmp_path / "specs.json"), output=str(tmp_path / "results.txt"), no_cache=True, cache_dir=None, jobs=1)
+
+        assert cli.run_batch_file(args) == 1
+        assert "Unknown output format '.txt'" in capsys.readouterr().err
+
+
+def read_specs_from(specs):
+    from portfolio_simulations.batch import normalize_spec
+    return [normalize_spec(spec, index) for index, spec in enumerate(specs)]
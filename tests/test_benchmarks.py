@@ -0,0 +1,32 @@
+"""
+Smoke tests for the benchmark suite
+"""
+
+from benchmarks.run import compare, run_suite
+from benchmarks.synthetic import synthetic_prices
+
+
+class TestBenchmarks:
+    """Test cases for the benchmark runner"""
+
+    def test_synthetic_prices(self):
+        """Test the shape of the synthetic price generator"""
+        dates, prices = synthetic_prices(num_assets=3, num_years=2, seed=1)
+
+        assert prices.shape == (len(dates), 3)
+        assert (prices > 0).all()
+
+    def test_run_suite_quick(self):
+        """Test that the smallest benchmarks run and record time and memory"""
+        results = run_suite("Calendar.time_update", quick=True, repeat=1)
+
+        (result,) = results.values()
+        assert result["seconds"] > 0
+        assert result["peak_bytes"] > 0
+
+    def test_compare_flags_regressions(self):
+        """Test that results above the threshold are reported"""
+        baselines = {"a": {"seconds": 1.0, "peak_bytes": 100}}
+
+        assert compare({"a": {"seconds": 1.2, "peak_bytes": 100}}, baselines, 1.5) == []
+        assert len(compare({"a": {"seconds": 2.0, "peak_bytes": 200}}, baselines, 1.5)) == 2
@@ -0,0 +1,84 @@
+"""
+Tests for the local price cache
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from datetime import datetime, timedelta
+from portfolio_simulations.asset import Asset
+from portfolio_simulations.cache import PriceCache
+
+
+class LocalFetcher:
+    """Stand-in for yfinance that serves prices from memory and records calls"""
+
+    def __init__(self, dates, values):
+        self.dates = np.array(dates, dtype="datetime64[ns]")
+        self.values = np.array(values, dtype=float)
+        self.calls = []
+
+    def __call__(self, ticker, start=None):
+        self.calls.append((ticker, start))
+        if ticker != "TEST":
+            return np.array([], dtype="datetime64[ns]"), np.array([])
+        keep = self.dates >= np.datetime64(start, "ns") if start is not None else slice(None)
+        return self.dates[keep], self.values[keep]
+
+
+class TestPriceCache:
+    """Test cases for PriceCache"""
+
+    def test_load_fetches_once(self, tmp_path):
+        """Test that a cached ticker is served from disk"""
+        fetcher = LocalFetcher(pd.bdate_range("2020-01-01", periods=10), np.arange(10.0) + 100)
+        cache = PriceCache(str(tmp_path), fetcher=fetcher)
+
+        cache.load("TEST")
+        dates, closes = cache.load("TEST")
+
+        assert len(fetcher.calls) == 1
+        assert len(dates) == 10
+        assert closes[-1] == 109.0
+        assert cache.metadata("TEST")["rows"] == 10
+
+    def test_stale_series_refreshes_incrementally(self, tmp_path):
+        """Test that a stale ticker only fetches bars after the last cached date"""
+        all_dates = pd.bdate_range("2020-01-01", periods=10)
+        fetcher = LocalFetcher(all_dates[:6], np.arange(6.0))
+        cache = PriceCache(str(tmp_path), fetcher=fetcher, max_age=timedelta(0))
+        cache.load("TEST")
+
+        fetcher.dates = np.array(all_dates, dtype="datetime64[ns]")
+        fetcher.values = np.arange(10.0)
+        dates, closes = cache.load("TEST")
+
+        assert fetcher.calls[-1][1] == all_dates[5] + timedelta(days=1)
+        assert len(dates) == 10
+        np.testing.assert_array_equal(closes, np.arange(10.0))
+
+    def test_failed_refresh_serves_cached_series(self, tmp_path):
+        """Test that a stale series is still served with a warning when the fetcher fails"""
+        fetcher = LocalFetcher(pd.bdate_range("2020-01-01", periods=10), np.arange(10.0) + 100)
+        cache = PriceCache(str(tmp_path), fetcher=fetcher, max_age=timedelta(0))
+        cache.load("TEST")
+
+        def offline(ticker, start=None):
+            raise ConnectionError("network unreachable")
+
+        cache.fetcher = offline
+        with pytest.warns(UserWarning, match="network unreachable"):
+            asset = Asset("TEST", 1.0, cache=cache)
+
+        np.testing.assert_array_equal(asset.closes, np.arange(10.0) + 100)
+
+    def test_asset_from_cache(self, tmp_path):
+        """Test creating an asset through the cache and rejecting unknown tickers"""
+        fetcher = LocalFetcher([datetime(2020, 1, 1), datetime(2021, 1, 1)], [100.0, 110.0])
+        cache = PriceCache(str(tmp_path), fetcher=fetcher)
+
+        asset = Asset("TEST", weight=1.0, cache=cache)
+
+        assert asset.get_returns() == pytest.approx(0.10, abs=0.01)
+        with pytest.raises(ValueError, match="The ticker passed is not valid"):
+            Asset("UNKNOWN", weight=1.0, cache=cache)
@@ -0,0 +1,47 @@
+"""
+Tests that heavy dependencies are only imported when used
+"""
+
+import subprocess
+import sys
+import pytest
+
+
+def imported_modules(statement):
+    """Top-level modules loaded by a statement in a fresh interpreter"""
+    script = f"import sys\n{statement}\nprint(' '.join(sorted({{name.split('.')[0] for name in sys.modules}})))"
+    result = subprocess.run([sys.executable, "-c", script], check=True, capture_output=True, text=True)
+    return set(result.stdout.split())
+
+
+class TestImports:
+    """Test cases for the lazy imports of the package"""
+
+    @pytest.mark.parametrize("statement", [
+        "import portfolio_simulations",
+        "from portfolio_simulations import Portfolio, Asset, PriceCache",
+        "import portfolio_simulations.cli",
+    ])
+    def test_no_plotting_or_network_on_import(self, statement):
+        """Test that matplotlib and yfinance are not imported with the package"""
+        modules = imported_modules(statement)
+
+        assert "matplotlib" not in modules
+        assert "yfinance" not in modules
+
+    def test_lean_compute_core(self):
+        """Test that the numpy-only modules import without pandas"""
+        modules = imported_modules(
+            "import portfolio_simulations.rebalancing, portfolio_simulations.results, portfolio_simulations.sampling"
+        )
+
+        assert "pandas" not in modules
+
+    def test_lazy_attributes(self):
+        """Test that public names resolve on access"""
+        import portfolio_simulations
+
+        assert portfolio_simulations.Rebalancing.__name__ == "Rebalancing"
+        assert set(portfolio_simulations.__all__) <= set(dir(portfolio_simulations))
+        with pytest.raises(AttributeError):
+            portfolio_simulations.missing_name
@@ -0,0 +1,97 @@
+"""
+Tests for the bulk price loaders and zero-copy assets
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from portfolio_simulations.asset import Asset
+from portfolio_simulations.loaders import load_directory, read_prices, save_prices
+from portfolio_simulations.panel import PricePanel
+
+
+@pytest.fixture
+def wide_prices():
+    """Wide frame of three series on business days, one with a gap"""
+    dates = pd.bdate_range("2020-01-01", periods=50)
+    frame = pd.DataFrame({"Date": dates})
+    for column, name in enumerate(["AAA", "BBB", "CCC"]):
+        frame[name] = 100.0 + column + np.arange(50)
+    frame.loc[10, "CCC"] = np.nan
+    return frame
+
+
+class TestZeroCopyAsset:
+    """Test cases for assets built on arrays and Series"""
+
+    def test_arrays_are_not_copied(self):
+        """Test that sorted complete arrays and Series are used as they are"""
+        dates = np.arange("2020-01-01", "2020-03-01", dtype="datetime64[D]").astype("datetime64[ns]")
+        closes = np.linspace(100, 110, len(dates))
+
+        from_arrays = Asset("A", 0.5, values=closes, dates=dates)
+        from_series = Asset("S", 0.5, values=pd.Series(closes, copy=False), dates=pd.Series(dates, copy=False))
+
+        assert np.shares_memory(from_arrays.closes, closes)
+        assert np.shares_memory(from_arrays.dates, dates)
+        assert np.shares_memory(from_series.closes, closes)
+        assert not from_arrays.closes.flags.writeable
+
+    def test_unsorted_and_missing_values(self):
+        """Test that unsorted dates are sorted and missing closes take the mean, as for lists"""
+        dates = np.array(["2020-01-03", "2020-01-01", "2020-01-02"], dtype="datetime64[ns]")
+        closes = np.array([103.0, 101.0, np.nan])
+
+        asset = Asset("A", 0.5, values=closes, dates=dates)
+        listed = Asset("L", 0.5, values=list(closes), dates=list(pd.DatetimeIndex(dates)))
+
+        np.testing.assert_array_equal(asset.closes, [101.0, 102.0, 103.0])
+        np.testing.assert_array_equal(asset.closes, listed.closes)
+        np.testing.assert_array_equal(asset.dates, np.sort(dates))
+
+
+class TestLoaders:
+    """Test cases for read_prices, save_prices and load_directory"""
+
+    def test_wide_and_long_csv(self, tmp_path, wide_prices):
+        """Test that wide and long CSV files give the same panel"""
+        wide_prices.to_csv(tmp_path / "wide.csv", index=False)
+        wide_prices.melt(id_vars="Date", var_name="Ticker", value_name="Close").dropna().to_csv(tmp_path / "long.csv", index=False)
+
+        wide = read_prices(str(tmp_path / "wide.csv"))
+        long = read_prices(str(tmp_path / "long.csv"), ticker_column="Ticker")
+
+        assert wide.names == long.names == ["AAA", "BBB", "CCC"]
+        np.testing.assert_array_equal(wide.prices, long.prices)
+        assert wide.prices.flags.f_contiguous
+        assert np.isnan(wide.prices[10, 2])
+
+    def test_npy_panel_is_memory_mapped(self, tmp_path, wide_prices):
+        """Test that a saved panel is read back memory-mapped and its assets share the map"""
+        panel = PricePanel(wide_prices["Date"].to_numpy(), wide_prices[["AAA", "BBB", "CCC"]].to_numpy(), ["AAA", "BBB", "CCC"])
+        save_prices(panel, str(tmp_path / "panel"))
+
+        loaded = read_prices(str(tmp_path / "panel"))
+        asset = loaded.asset("BBB", 0.5)
+
+        base = loaded.prices
+        while base is not None and not isinstance(base, np.memmap):
+            base = base.base
+        assert isinstance(base, np.memmap)
+        assert np.shares_memory(asset.closes, loaded.prices)
+        np.testing.assert_array_equal(loaded.prices, panel.prices)
+
+    def test_load_directory(self, tmp_path, wide_prices):
+        """Test that the series of several files are aligned on one calendar"""
+        wide_prices[["Date", "AAA"]].to_csv(tmp_path / "a.csv", index=False)
+        later = wide_prices[["Date", "BBB", "CCC"]].iloc[5:]
+        save_prices(PricePanel(later["Date"].to_numpy(), later[["BBB", "CCC"]].to_numpy(), ["BBB", "CCC"]), str(tmp_path / "bc"))
+
+        panel = load_directory(str(tmp_path))
+
+        assert panel.names == ["AAA", "BBB", "CCC"]
+        assert len(panel.dates) == 50
+        assert np.isnan(panel.prices[:5, 1]).all()
+        (tmp_path / "dup.csv").write_text((tmp_path / "a.csv").read_text())
+        with pytest.raises(ValueError, match="more than one file"):
+            load_directory(str(tmp_path))
@@ -0,0 +1,78 @@
+"""
+Tests for the PricePanel class
+"""
+
+import numpy as np
+import pytest
+from datetime import datetime
+from portfolio_simulations.asset import Asset
+from portfolio_simulations.panel import PricePanel
+
+
+@pytest.fixture
+def staggered_assets():
+    """Two assets whose calendars only partly overlap"""
+    asset1 = Asset("A", weight=0.5, values=[1.0, 2.0, 3.0], dates=[datetime(2020, 1, 1), datetime(2020, 1, 2), datetime(2020, 1, 4)])
+    asset2 = Asset("B", weight=0.5, values=[10.0, 30.0], dates=[datetime(2020, 1, 2), datetime(2020, 1, 3)])
+    return [asset1, asset2]
+
+
+class TestPricePanel:
+    """Test cases for PricePanel"""
+
+    def test_union_alignment(self, staggered_assets):
+        """Test that the union calendar keeps every date with NaN gaps"""
+        panel = PricePanel.from_assets(staggered_assets)
+
+        assert panel.shape == (4, 2)
+        assert np.isnan(panel.column("A")[2])
+        assert np.isnan(panel.column("B")[0])
+        assert panel.column("B")[2] == 30.0
+        assert panel.nbytes == 4 * 8 + 4 * 2 * 8
+
+    def test_intersection_alignment(self, staggered_assets):
+        """Test that the intersection calendar only keeps shared dates"""
+        panel = PricePanel.from_assets(staggered_assets, align="intersection")
+
+        assert list(panel.dates) == [np.datetime64("2020-01-02")]
+        np.testing.assert_array_equal(panel.prices, [[2.0, 10.0]])
+
+    def test_forward_fill(self, staggered_assets):
+        """Test that ffill carries prices forward inside the history of each asset only"""
+        panel = PricePanel.from_assets(staggered_assets, fill="ffill", dtype=np.float32)
+
+        assert panel.prices.dtype == np.float32
+        assert panel.column("A")[2] == 2.0
+        assert np.isnan(panel.column("B")[3])
+        assert np.isnan(panel.column("B")[0])
+
+    def test_column_views_are_shared(self, staggered_assets):
+        """Test that columns and assets built from the panel share its memory"""
+        panel = PricePanel.from_assets(staggered_assets, fill="ffill")
+
+        column = panel.column("A")
+        asset = panel.asset("A", weight=1.0)
+
+        assert column.flags.c_contiguous
+        assert np.shares_memory(column, panel.prices)
+        assert np.shares_memory(asset.closes, panel.prices)
+        assert asset.get_returns() == staggered_assets[0].get_returns()
+
+    def test_unknown_policy(self, staggered_assets):
+        """Test that an unknown alignment policy raises ValueError"""
+        with pytest.raises(ValueError, match="Unknown align policy"):
+            PricePanel.from_assets(staggered_assets, align="outer")
+
+    def test_append_rows_extends_cached_rows(self, staggered_assets):
+        """Test that appended rows extend the valid row indexes like a rebuilt panel"""
+        panel = PricePanel.from_assets(staggered_assets)
+        panel.next_valid_rows, panel.previous_valid_rows
+        dates = np.array(["2020-01-06", "2020-01-07"], dtype="datetime64[ns]")
+
+        appended = panel.append_rows(dates, [[np.nan, 5.0], [6.0, np.nan]])
+        rebuilt = PricePanel(appended.dates, np.array(appended.prices), appended.names)
+
+        np.testing.assert_array_equal(appended.next_valid_rows, rebuilt.next_valid_rows)
+        np.testing.assert_array_equal(appended.previous_valid_rows, rebuilt.previous_valid_rows)
+        with pytest.raises(ValueError, match="after"):
+            appended.append_rows(dates[:1], [[1.0, 1.0]])
@@ -2,10 +2,14 @@
 Tests for the Portfolio class
 """
 
+import numpy as np
+import pandas as pd
 import pytest
 from datetime import datetime
 from portfolio_simulations.portfolio import Portfolio
 from portfolio_simulations.asset import Asset
+from portfolio_simulations.cache import PriceCache
+from portfolio_simulations.panel import PricePanel
 
 
 class TestPortfolio:
@@ -72,3 +76,221 @@ class TestPortfolio:
         assert "End date: 2020-01-02" in captured.out
         assert "TEST1: 0.6" in captured.out
         assert "TEST2: 0.4" in captured.out
+
+    def test_compute_return_distribution_engines_agree(self, daily_portfolio):
+        """Test that the vectorized engine reproduces the loop engine"""
+        daily_portfolio.compute_return_distribution(rolling_window=3, num_simulations=50, engine="loop", seed=0)
+        loop_returns = daily_portfolio.portfolio_returns
+
+        daily_portfolio.compute_return_distribution(rolling_window=3, num_simulations=50, seed=0)
+
+        assert daily_portfolio.portfolio_returns == pytest.approx(loop_returns, rel=1e-12)
+
+    def test_compute_return_distribution_too_many_simulations(self, sample_portfolio):
+        """Test that requesting more windows than available raises ValueError"""
+        with pytest.raises(ValueError, match="exceeds the 3 distinct windows available"):
+            sample_portfolio.compute_return_distribution(rolling_window=1, num_simulations=100)
+        with pytest.raises(ValueError, match="Not enough data"):
+            sample_portfolio.compute_return_distribution(rolling_window=3, num_simulations=1)
+
+    def test_compute_return_distribution_exhaustive(self, sample_portfolio):
+        """Test that exhaustive mode evaluates every window once in date order"""
+        sample_portfolio.compute_return_distribution(rolling_window=1, exhaustive=True)
+
+        assert len(sample_portfolio.portfolio_returns) == 3
+
+    def test_add_assets_collects_errors(self, tmp_path):
+        """Test bulk loading with a failing ticker and a flaky ticker"""
+        dates = np.array(pd.bdate_range("2020-01-01", periods=300), dtype="datetime64[ns]")
+        attempts = {"FLAKY": 0}
+
+        def fetcher(ticker, start=None):
+            if ticker == "MISSING":
+                return np.array([], dtype="datetime64[ns]"), np.array([])
+            if ticker == "FLAKY":
+                attempts["FLAKY"] += 1
+                if attempts["FLAKY"] == 1:
+                    raise ConnectionError("temporary failure")
+            return dates, np.linspace(100, 120, len(dates))
+
+        cache = PriceCache(str(tmp_path), fetcher=fetcher)
+        portfolio = Portfolio.from_spec(
+            {"AAA": 0.5, "MISSING": 0.2, "FLAKY": 0.3}, cache=cache, retry_delay=0
+        )
+
+        assert [asset.asset_name for asset in portfolio.assets] == ["AAA", "FLAKY"]
+        assert list(portfolio.load_errors) == ["MISSING"]
+        assert isinstance(portfolio.load_errors["MISSING"], ValueError)
+        assert len(portfolio.combined_window) == 300
+
+    def test_compute_return_distribution_parallel(self, daily_portfolio):
+        """Test that worker processes reproduce the single-process result"""
+        daily_portfolio.compute_return_distribution(rolling_window=3, num_simulations=200, seed=1)
+        serial_returns = daily_portfolio.portfolio_returns
+
+        daily_portfolio.compute_return_distribution(rolling_window=3, num_simulations=200, seed=1, n_jobs=2, chunk_size=50)
+
+        np.testing.assert_array_equal(daily_portfolio.portfolio_returns, serial_returns)
+
+    def test_parallel_run_splits_small_chunks(self, daily_portfolio, monkeypatch):
+        """Test that a run smaller than one chunk is still split across every worker"""
+        from portfolio_simulations import portfolio as portfolio_module
+        task_counts = []
+        original = portfolio_module.map_chunks
+
+        def recording_map_chunks(function, tasks, n_jobs=1, arrays=None):
+            task_counts.append(len(tasks))
+            return original(function, tasks, n_jobs=n_jobs, arrays=arrays)
+
+        monkeypatch.setattr(portfolio_module, "map_chunks", recording_map_chunks)
+        daily_portfolio.compute_return_distribution(rolling_window=3, num_simulations=200, seed=1)
+        serial_returns = daily_portfolio.portfolio_returns
+        daily_portfolio.compute_return_distribution(rolling_window=3, num_simulations=200, seed=1, n_jobs=2)
+
+        assert task_counts == [1, 2]
+        np.testing.assert_array_equal(daily_portfolio.portfolio_returns, serial_returns)
+
+    def test_portfolio_seed_is_repeatable(self, sample_dates, sample_values):
+        """Test that two portfolios with the same seed draw the same windows"""
+        results = []
+        for _ in range(2):
+            portfolio = Portfolio(seed=123)
+            portfolio.add_asset("ASSET1", weight=1.0, values=sample_values, dates=sample_dates)
+            portfolio.compute_return_distribution(rolling_window=1, num_simulations=20, replace=True)
+            results.append(portfolio.portfolio_returns)
+
+        np.testing.assert_array_equal(results[0], results[1])
+        assert len(results[0]) == 20
+
+    def test_exhaustive_matches_sampled_windows(self, daily_portfolio):
+        """Test that the log-price exhaustive pass matches the batched gather on every window"""
+        daily_portfolio.compute_return_distribution(rolling_window=5, exhaustive=True)
+        exhaustive_returns = daily_portfolio.portfolio_returns
+        quantiles = daily_portfolio.return_quantiles([0.0, 0.5, 1.0])
+
+        count = len(exhaustive_returns)
+        assert daily_portfolio.asset_window_returns.shape == (count, 3)
+        daily_portfolio.compute_return_distribution(rolling_window=5, num_simulations=count, seed=0)
+
+        assert sorted(daily_portfolio.portfolio_returns) == pytest.approx(sorted(exhaustive_returns), rel=1e-9)
+        assert quantiles[0.0] == min(exhaustive_returns)
+        assert quantiles[1.0] == max(exhaustive_returns)
+
+    def test_compute_return_distribution_streaming(self, daily_portfolio):
+        """Test that results are summarized without keeping the samples"""
+        daily_portfolio.compute_return_distribution(rolling_window=3, num_simulations=500, seed=2, dtype="float32")
+        samples = daily_portfolio.portfolio_returns
+
+        daily_portfolio.compute_return_distribution(
+            rolling_window=3, num_simulations=500, seed=2, keep_samples=False, chunk_size=64
+        )
+
+        assert samples.dtype == np.float32
+        assert daily_portfolio.portfolio_returns is None
+        assert daily_portfolio.results.count == 500
+        assert daily_portfolio.results.mean == pytest.approx(samples.mean(), rel=1e-5)
+        assert daily_portfolio.return_quantiles([0.5])[0.5] == pytest.approx(np.median(samples), abs=1e-3)
+
+    def test_remove_asset_updates_calendar(self, daily_portfolio):
+        """Test that the shared calendar follows the assets that are added and removed"""
+        dates = daily_portfolio.assets[0].dates
+        daily_portfolio.add_asset("SHORT", weight=0.1, values=list(range(1, 101)), dates=list(pd.date_range("2030-01-01", periods=100)))
+        assert len(daily_portfolio.combined_window) == len(dates) + 100
+
+        daily_portfolio.remove_asset("SHORT")
+
+        np.testing.assert_array_equal(daily_portfolio.combined_window["Date"].to_numpy(), dates)
+
+
+class TestIncrementalUpdate:
+    """Test cases for appending bars and updating the return distribution"""
+
+    @staticmethod
+    def split(portfolio, last_date):
+        """Portfolio holding the bars of portfolio up to last_date, and the later bars of each asset"""
+        head, bars = Portfolio(), {}
+        for asset in portfolio.assets:
+            keep = asset.dates <= np.datetime64(last_date)
+            head.add_asset(asset.asset_name, weight=asset.weight, values=list(asset.closes[keep]), dates=list(asset.dates[keep]))
+            bars[asset.asset_name] = (asset.dates[~keep], asset.closes[~keep])
+        return head, bars
+
+    def test_update_matches_full_recompute(self, daily_portfolio):
+        """Test that appending days one at a time and updating gives the distribution of the whole history"""
+        portfolio, bars = self.split(daily_portfolio, "2019-11-29")
+        portfolio.compute_return_distribution(rolling_window=5, exhaustive=True)
+        count = portfolio.results.count
+
+        for day in range(len(bars["ASSET1"][0])):
+            portfolio.append_bars({name: (dates[day], closes[day]) for name, (dates, closes) in bars.items()})
+            portfolio.update_return_distribution()
+        daily_portfolio.compute_return_distribution(rolling_window=5, exhaustive=True)
+
+        assert portfolio.results.count == daily_portfolio.results.count > count
+        np.testing.assert_allclose(portfolio.portfolio_returns, daily_portfolio.portfolio_returns)
+        np.testing.assert_array_equal(portfolio.window_start_dates, daily_portfolio.window_start_dates)
+        np.testing.assert_allclose(portfolio.asset_window_returns, daily_portfolio.asset_window_returns)
+        assert portfolio.results.std == pytest.approx(daily_portfolio.results.std)
+
+    def test_update_extends_store(self, daily_portfolio, tmp_path):
+        """Test that the new windows are appended to the ResultStore of the run"""
+        portfolio, bars = self.split(daily_portfolio, "2019-06-28")
+        portfolio.compute_return_distribution(rolling_window=5, exhaustive=True, store=str(tmp_path / "run"), chunk_size=500)
+        portfolio.append_bars(bars)
+        new_returns = portfolio.update_return_distribution()
+
+        daily_portfolio.compute_return_distribution(rolling_window=5, exhaustive=True)
+        np.testing.assert_allclose(new_returns, daily_portfolio.portfolio_returns[-len(new_returns):])
+        np.testing.assert_allclose(portfolio.result_store.read(), daily_portfolio.portfolio_returns)
+        assert len(portfolio.update_return_distribution()) == 0
+        portfolio.compute_return_distribution(rolling_window=5, exhaustive=True, store=str(tmp_path / "run"), chunk_size=500)
+        np.testing.assert_allclose(portfolio.portfolio_returns, daily_portfolio.portfolio_returns)
+
+    def test_update_needs_exhaustive_run(self, daily_portfolio):
+        """Test that sampled distributions and changed weights cannot be updated"""
+        with pytest.raises(ValueError, match="exhaustive"):
+            daily_portfolio.update_return_distribution()
+        daily_portfolio.compute_return_distribution(rolling_window=5, num_simulations=100, seed=0)
+        with pytest.raises(ValueError, match="exhaustive"):
+            daily_portfolio.update_return_distribution()
+
+        daily_portfolio.compute_return_distribution(rolling_window=5, exhaustive=True)
+        daily_portfolio.assets[0].weight = 0.4
+        with pytest.raises(ValueError, match="weights changed"):
+            daily_portfolio.update_return_distribution()
+
+
+    @pytest.mark.parametrize("options", [{"align": "union"}, {"align": "intersection"}, {"fill": "ffill"}])
+    def test_appended_panel_matches_rebuild(self, daily_portfolio, options):
+        """Test that the panel extended by append_bars is the panel rebuilt from the assets"""
+        portfolio = Portfolio(**options)
+        for asset in daily_portfolio.assets:
+            portfolio.add_asset(asset.asset_name, asset.weight, values=asset.closes, dates=asset.dates)
+        portfolio.panel
+        portfolio.append_bars({
+            "ASSET1": (["2020-01-01", "2020-01-02"], [120.0, 121.0]),
+            "ASSET2": (["2020-01-02"], [90.0]),
+        })
+        extended = portfolio.panel
+        portfolio._panel = None
+        merged = PricePanel.from_assets(portfolio.assets, **portfolio.panel_options)
+
+        for panel in (portfolio.panel, merged):
+            np.testing.assert_array_equal(extended.dates, panel.dates)
+            np.testing.assert_array_equal(extended.prices, panel.prices)
+
+    def test_forward_filled_gap_before_resumed_asset(self, daily_portfolio):
+        """Test that an asset resuming after a missed day is filled over the gap like a rebuilt panel"""
+        portfolio = Portfolio(fill="ffill")
+        for asset in daily_portfolio.assets:
+            portfolio.add_asset(asset.asset_name, asset.weight, values=asset.closes, dates=asset.dates)
+        portfolio.panel
+        portfolio.append_bars({"ASSET1": (["2020-01-01"], [120.0]), "ASSET2": (["2020-01-01"], [90.0])})
+        assert np.isnan(portfolio.panel.column("ASSET3")[-1])
+
+        portfolio.append_bars({name: (["2020-01-02"], [100.0]) for name in ["ASSET1", "ASSET2", "ASSET3"]})
+        extended = portfolio.panel
+        portfolio._panel = None
+
+        np.testing.assert_array_equal(extended.prices, portfolio.panel.prices)
+        assert extended.column("ASSET3")[-2] == daily_portfolio.assets[2].closes[-1]
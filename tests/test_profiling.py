@@ -0,0 +1,56 @@
+"""
+Tests for the profiling instrumentation
+"""
+
+import json
+import pytest
+from portfolio_simulations import profiling
+
+
+class TestProfiling:
+    """Test cases for the profiler and its hooks"""
+
+    def test_disabled_is_a_no_op(self):
+        """Test that stages and counters do nothing without an active profiler"""
+        items = [1, 2]
+
+        assert profiling.stage("windows") is profiling.stage("sampling")
+        assert profiling.timed(items, "windows") is items
+        profiling.count("windows_evaluated")
+        assert profiling.active_profiler() is None
+
+    def test_stages_and_counters(self, daily_portfolio):
+        """Test that a profiled run reports its stages, counters and throughput"""
+        daily_portfolio._panel = None
+        with profiling.profile() as profiler:
+            daily_portfolio.compute_return_distribution(rolling_window=3, num_simulations=300, seed=0, chunk_size=100)
+
+        report = profiler.report()
+        assert {"panel", "sampling", "windows", "results"} <= set(report["stages"])
+        assert report["stages"]["results"]["calls"] == 3
+        assert report["counters"]["windows_evaluated"] == 300
+        assert report["rates"]["windows_per_second"] > 0
+        assert "windows_evaluated" in profiler.format()
+
+    def test_hooks_and_json(self, tmp_path, sample_dates, sample_values):
+        """Test the tracemalloc and cProfile hooks and the JSON report"""
+        from portfolio_simulations.asset import Asset
+
+        with profiling.profile(["cprofile", "tracemalloc"]) as profiler:
+            Asset("TEST", weight=1.0, values=sample_values, dates=sample_dates)
+        profiler.write_json(str(tmp_path / "profile.json"))
+
+        with open(tmp_path / "profile.json") as f:
+            report = json.load(f)
+        assert report["counters"]["assets_loaded"] == 1
+        assert report["memory"]["peak_bytes"] > 0
+        assert "cumulative" in report["cprofile"]
+
+    def test_profilers_do_not_nest(self):
+        """Test that a second profiler cannot start while one is active"""
+        with profiling.profile():
+            with pytest.raises(RuntimeError, match="already active"):
+                with profiling.profile():
+                    pass
+        with pytest.raises(ValueError, match="Unknown profile hooks"):
+            profiling.Profiler(["perf"])
@@ -0,0 +1,71 @@
+"""
+Tests for the rebalancing-aware path accounting
+"""
+
+import numpy as np
+import pytest
+from portfolio_simulations.rebalancing import Rebalancing
+from portfolio_simulations.utils import _path_statistics, simulate_portfolio_paths
+
+
+@pytest.fixture
+def log_returns():
+    return np.random.default_rng(0).normal(0.0003, 0.01, size=(200, 60, 3))
+
+
+class TestRebalancing:
+    """Test cases for Rebalancing"""
+
+    def test_buy_and_hold_matches_path_statistics(self, log_returns):
+        """Test that the "none" policy without costs reproduces the buy-and-hold engine"""
+        weights = np.array([0.5, 0.3, 0.2])
+
+        stats = Rebalancing("none").path_statistics(log_returns, weights)
+        expected = _path_statistics(log_returns.copy(), weights, 252)
+
+        for name in expected:
+            np.testing.assert_allclose(stats[name], expected[name])
+        assert np.all(stats["turnover"] == 0)
+
+    def test_rebalancing_every_step(self, log_returns):
+        """Test that rebalancing at every step compounds the weighted gross returns"""
+        weights = np.array([0.5, 0.3, 0.2])
+
+        stats = Rebalancing("monthly").path_statistics(log_returns, weights, steps_per_year=12)
+
+        np.testing.assert_allclose(stats["terminal_wealth"], np.prod(np.exp(log_returns) @ weights, axis=1))
+        assert np.all(stats["turnover"] > 0)
+
+    def test_threshold_and_costs(self, log_returns):
+        """Test that bands limit trading and that costs reduce the wealth by what was paid"""
+        weights = np.array([0.5, 0.3, 0.2])
+
+        wide = Rebalancing("threshold", threshold=0.9, transaction_cost=0.01).path_statistics(log_returns, weights)
+        narrow = Rebalancing("threshold", threshold=0.01, transaction_cost=0.01).path_statistics(log_returns, weights)
+        free = Rebalancing("threshold", threshold=0.01).path_statistics(log_returns, weights)
+
+        assert np.all(wide["turnover"] == 0)
+        assert narrow["turnover"].mean() > 0
+        assert np.all(narrow["terminal_wealth"] < free["terminal_wealth"])
+        np.testing.assert_allclose(narrow["costs"], 0.01 * narrow["turnover"])
+
+    def test_contributions(self):
+        """Test that contributions add to the wealth but not to the time-weighted returns"""
+        log_returns = np.zeros((5, 63, 2))
+
+        stats = Rebalancing(contribution=0.1, contribution_every=21).path_statistics(log_returns, np.array([0.6, 0.4]))
+
+        np.testing.assert_allclose(stats["terminal_wealth"], 1.3)
+        np.testing.assert_allclose(stats["max_drawdown"], 0)
+        with pytest.raises(ValueError, match="Unknown rebalancing policy"):
+            Rebalancing("weekly")
+
+    def test_simulate_portfolio_paths_with_rebalancing(self):
+        """Test that the path engines account for a rebalancing policy"""
+        stats = simulate_portfolio_paths(
+            [0.0003, 0.0001], [[1e-4, 0], [0, 4e-5]], [0.6, 0.4],
+            num_simulations=100, num_steps=252, seed=0, rebalancing=Rebalancing("quarterly", transaction_cost=0.001)
+        )
+
+        assert set(stats) == {"terminal_wealth", "max_drawdown", "volatility", "turnover", "costs"}
+        assert np.all(stats["costs"] > 0)
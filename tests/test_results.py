@@ -0,0 +1,62 @@
+"""
+Tests for the streaming accumulation of results
+"""
+
+import numpy as np
+import pytest
+from portfolio_simulations.results import StreamingResults
+
+
+@pytest.fixture
+def values():
+    return np.random.default_rng(0).standard_t(4, size=100000) * 0.1
+
+
+class TestStreamingResults:
+    """Test cases for StreamingResults"""
+
+    def test_moments_match_numpy(self, values):
+        """Test that chunked updates give the mean, variance and extremes of the whole array"""
+        results = StreamingResults()
+        for chunk in np.array_split(values, 37):
+            results.update(chunk)
+
+        assert results.count == len(values)
+        assert results.mean == pytest.approx(values.mean())
+        assert results.variance == pytest.approx(values.var())
+        assert (results.min, results.max) == (values.min(), values.max())
+
+    def test_merge_equals_single_pass(self, values):
+        """Test that merging two accumulators matches one accumulator over all the values"""
+        single = StreamingResults().update(values)
+        merged = StreamingResults().update(values[:30000]).merge(StreamingResults().update(values[30000:]))
+
+        assert merged.count == single.count
+        assert merged.mean == pytest.approx(single.mean)
+        assert merged.std == pytest.approx(single.std)
+        np.testing.assert_array_equal(merged.bin_counts, single.bin_counts)
+        assert merged.quantile(0.5) == pytest.approx(single.quantile(0.5), abs=1e-3)
+
+    def test_quantiles_and_tail_risk(self, values):
+        """Test the sketch estimates against the exact quantiles and tail mean"""
+        results = StreamingResults()
+        for chunk in np.array_split(values, 10):
+            results.update(chunk)
+
+        exact = np.quantile(values, [0.01, 0.25, 0.5, 0.75, 0.99])
+        np.testing.assert_allclose(results.quantile(np.array([0.01, 0.25, 0.5, 0.75, 0.99])), exact, atol=2e-3)
+        tail = np.sort(values)[:5000]
+        assert results.value_at_risk(0.95) == pytest.approx(-np.quantile(values, 0.05), abs=2e-3)
+        assert results.conditional_value_at_risk(0.95) == pytest.approx(-tail.mean(), rel=1e-2)
+
+    def test_samples_and_histogram(self, values):
+        """Test that kept samples use the requested dtype and every value is counted once"""
+        results = StreamingResults(keep_samples=True, dtype="float32", histogram_range=(-0.5, 0.5), bins=50)
+        results.update(values[:500]).update(values[500:1000])
+        counts, edges = results.histogram()
+
+        assert results.samples.dtype == np.float32
+        np.testing.assert_array_equal(results.samples, values[:1000].astype(np.float32))
+        assert len(edges) == 51
+        assert counts.sum() + results.underflow + results.overflow == 1000
+        assert StreamingResults().samples is None
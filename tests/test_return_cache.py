@@ -0,0 +1,54 @@
+"""
+Tests for the memo of window returns
+"""
+
+import pytest
+from datetime import datetime
+from portfolio_simulations.asset import Asset
+from portfolio_simulations.portfolio import Portfolio
+from portfolio_simulations.return_cache import ReturnCache, default_return_cache
+
+
+class TestReturnCache:
+    """Test cases for ReturnCache"""
+
+    def test_lru_eviction_and_counters(self):
+        """Test that the least recently used entry is evicted first and lookups are counted"""
+        cache = ReturnCache(maxsize=2)
+        cache.get(("a", 0, 1), lambda: 1.0)
+        cache.get(("b", 0, 1), lambda: 2.0)
+        cache.get(("a", 0, 1), lambda: pytest.fail("a should be cached"))
+        cache.get(("c", 0, 1), lambda: 3.0)
+
+        assert cache.get(("b", 0, 1), lambda: 4.0) == 4.0
+        assert cache.info() == {"hits": 1, "misses": 4, "evictions": 2, "size": 2, "maxsize": 2}
+
+    def test_window_return(self, sample_asset):
+        """Test that memoized window returns match Asset.get_returns and are reused"""
+        cache = ReturnCache()
+        window = sample_asset.window(datetime(2020, 1, 1), datetime(2021, 1, 1))
+
+        assert cache.window_return(window) == pytest.approx(window.get_returns())
+        cache.window_return(sample_asset.window(datetime(2020, 1, 1), datetime(2021, 1, 1)))
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_shared_across_portfolios(self, sample_dates, sample_values):
+        """Test that portfolios holding the same series under other names and weights share entries"""
+        cache = ReturnCache()
+        for name, weight in (("A", 0.3), ("B", 0.7)):
+            portfolio = Portfolio(return_cache=cache)
+            portfolio.add_asset(name, weight=weight, values=sample_values, dates=sample_dates)
+            portfolio.compute_portfolio_returns(datetime(2020, 1, 1), datetime(2021, 1, 1))
+
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_invalidated_when_data_changes(self, sample_dates, sample_values):
+        """Test that replacing the data of an asset drops its memoized windows"""
+        asset = Asset("A", weight=1.0, values=sample_values, dates=sample_dates)
+        default_return_cache.window_return(asset.window(datetime(2020, 1, 1), datetime(2021, 1, 1)))
+        key = asset.content_key
+
+        asset._set_arrays(asset.dates.copy(), asset.closes * 2)
+
+        assert key not in default_return_cache._keys_by_asset
+        assert asset.content_key != key
@@ -0,0 +1,26 @@
+"""
+Tests for the random number helpers
+"""
+
+import numpy as np
+from portfolio_simulations.rng import as_generator, seed_sequence, spawn_generators
+
+
+class TestRng:
+    """Test cases for the seed helpers"""
+
+    def test_as_generator_shares_streams(self):
+        """Test that a Generator is passed through and an int seed is repeatable"""
+        rng = np.random.default_rng(0)
+
+        assert as_generator(rng) is rng
+        assert as_generator(5).integers(1000) == as_generator(5).integers(1000)
+
+    def test_spawned_generators_are_independent(self):
+        """Test that spawned streams differ from each other but repeat for the same seed"""
+        first = [g.random() for g in spawn_generators(11, 3)]
+        second = [g.random() for g in spawn_generators(11, 3)]
+
+        assert first == second
+        assert len(set(first)) == 3
+        assert list(seed_sequence(np.random.default_rng(1)).entropy) != list(seed_sequence(np.random.default_rng(2)).entropy)
@@ -0,0 +1,42 @@
+"""
+Tests for the window sampling methods
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from portfolio_simulations.sampling import sample_windows, year_strata
+
+
+class TestSampling:
+    """Test cases for sample_windows"""
+
+    def test_uniform_without_replacement_is_distinct(self):
+        """Test that draws without replacement never repeat a window"""
+        indices = sample_windows(1000, 1000, seed=0)
+
+        assert sorted(indices) == list(range(1000))
+
+    def test_too_many_samples(self):
+        """Test the error when more distinct windows are requested than exist"""
+        with pytest.raises(ValueError, match="exhaustive=True"):
+            sample_windows(10, 11, seed=0)
+
+        assert len(sample_windows(10, 50, seed=0, replace=True)) == 50
+
+    def test_block_bootstrap(self):
+        """Test that blocks are runs of consecutive windows wrapping around the end"""
+        indices = sample_windows(100, 50, method="block", seed=0, block_size=10)
+
+        blocks = indices.reshape(5, 10)
+        assert np.all(np.diff(blocks, axis=1) % 100 == 1)
+
+    def test_stratified_by_year(self):
+        """Test that each year gets a share of the samples proportional to its windows"""
+        dates = np.array(pd.bdate_range("2010-01-01", "2014-12-31"), dtype="datetime64[ns]")
+        strata = year_strata(dates)
+
+        indices = sample_windows(len(dates), 500, method="stratified", seed=0, strata=strata)
+
+        assert len(np.unique(indices)) == 500
+        assert np.all(np.abs(np.bincount(strata[indices] - 2010) - 100) <= 1)
@@ -0,0 +1,141 @@
+"""
+Tests for the resident simulation service and its client
+"""
+
+import asyncio
+import threading
+import time
+import numpy as np
+import pandas as pd
+import pytest
+from portfolio_simulations.cache import PriceCache
+from portfolio_simulations.portfolio import Portfolio
+from portfolio_simulations.service import ServiceClient, SimulationService
+
+
+class SeriesFetcher:
+    """Stand-in for yfinance serving synthetic tickers from memory, optionally slowly"""
+
+    def __init__(self, delay=0.0):
+        self.dates = pd.bdate_range("2010-01-01", "2019-12-31").to_numpy(dtype="datetime64[ns]")
+        rng = np.random.default_rng(0)
+        self.series = {
+            name: 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.01, len(self.dates))))
+            for name in ("AAA", "BBB", "CCC")
+        }
+        self.delay = delay
+        self.calls = []
+
+    def __call__(self, ticker, start=None):
+        self.calls.append(ticker)
+        time.sleep(self.delay)
+        if ticker not in self.series:
+            return np.array([], dtype="datetime64[ns]"), np.array([])
+        return self.dates, self.series[ticker]
+
+
+@pytest.fixture
+def running_service(tmp_path):
+    """Service listening on a free port in a background event loop"""
+    fetcher = SeriesFetcher()
+    service = SimulationService(cache=PriceCache(str(tmp_path), fetcher=fetcher), timeout=10.0)
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    asyncio.run_coroutine_threadsafe(service.start("127.0.0.1", 0), loop).result()
+    yield service, ServiceClient(service.address), fetcher
+    asyncio.run_coroutine_threadsafe(service.stop(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+
+
+def local_portfolio(fetcher, assets, weights):
+    portfolio = Portfolio(seed=3)
+    for name, weight in zip(assets, weights):
+        portfolio.add_asset(name, weight, values=fetcher.series[name], dates=fetcher.dates)
+    return portfolio
+
+
+class TestSimulationService:
+    """Test cases for SimulationService and ServiceClient"""
+
+    def test_simulate_matches_local_run(self, running_service):
+        """Test that the service answers with the statistics of a local run and loads tickers once"""
+        service, client, fetcher = running_service
+        exhaustive = client.simulate(["AAA", "BBB"], [0.7, 0.3], rolling_window=3)
+        sampled = client.simulate(["BBB", "AAA"], [0.3, 0.7], rolling_window=3, simulations=200, seed=3)
+
+        portfolio = local_portfolio(fetcher, ["AAA", "BBB"], [0.7, 0.3])
+        portfolio.compute_return_distribution(rolling_window=3, exhaustive=True)
+        assert exhaustive["windows"] == portfolio.results.count
+        assert exhaustive["mean"] == pytest.approx(portfolio.results.mean)
+        portfolio.compute_return_distribution(rolling_window=3, num_simulations=200)
+        assert sampled["mean"] == pytest.approx(portfolio.results.mean)
+
+        assert sorted(fetcher.calls) == ["AAA", "BBB"]
+        assert client.status()["matrices"] == 1
+
+    def test_concurrent_requests_are_batched(self, running_service):
+        """Test that what-if weights on the same assets are evaluated in one batch"""
+        service, _, _ = running_service
+        weights = [[w, 1 - w] for w in np.linspace(0, 1, 11)]
+
+        async def simulate_all():
+            return await asyncio.gather(*(
+                service.simulate({"assets": ["AAA", "CCC"], "weights": w, "rolling_window": 2}) for w in weights
+            ))
+
+        results = asyncio.run_coroutine_threadsafe(simulate_all(), service._server.get_loop()).result()
+
+        assert service.counters["batches"] == 1
+        assert results[0]["mean"] != results[-1]["mean"]
+        assert all(result["windows"] == results[0]["windows"] for result in results)
+
+    def test_errors(self, running_service):
+        """Test that unknown tickers and malformed requests are reported to the client"""
+        _, client, _ = running_service
+        with pytest.raises(ValueError, match="Could not load ZZZ"):
+            client.simulate(["AAA", "ZZZ"], [0.5, 0.5])
+        with pytest.raises(ValueError, match="as many weights"):
+            client.simulate(["AAA"], [0.5, 0.5])
+        with pytest.raises(ValueError, match="quantiles"):
+            client.simulate(["AAA"], [1.0], quantiles=[2.0])
+        with pytest.raises(ValueError, match="level"):
+            client.simulate(["AAA"], [1.0], level=1.0)
+        with pytest.raises(ValueError, match="rolling_window"):
+            client.simulate(["AAA"], [1.0], rolling_window=0)
+        with pytest.raises(ValueError, match="simulations"):
+            client.simulate(["AAA"], [1.0], simulations=-5)
+        status, payload = client._request("POST", "/simulate", [1, 2])
+        assert status == 400 and "JSON object" in payload["error"]
+
+    def test_internal_error(self, running_service, monkeypatch, caplog):
+        """Test that an unexpected failure is logged and answered with a 500 while the service keeps serving"""
+        _, client, _ = running_service
+
+        def failing_sweep(*args):
+            raise ZeroDivisionError("boom")
+
+        monkeypatch.setattr("portfolio_simulations.service.sweep_statistics", failing_sweep)
+        with pytest.raises(RuntimeError, match="boom"):
+            client.simulate(["AAA"], [1.0])
+        assert "POST /simulate failed" in caplog.text
+        assert client.status()["errors"] == 1
+
+    def test_timeout(self, tmp_path):
+        """Test that a request exceeding its timeout fails and is dropped from its batch"""
+        service = SimulationService(cache=PriceCache(str(tmp_path), fetcher=SeriesFetcher(delay=0.5)))
+
+        async def slow_request():
+            try:
+                await service.simulate({"assets": ["AAA"], "weights": [1.0], "timeout": 0.05})
+            finally:
+                await service.stop()
+
+        with pytest.raises(TimeoutError):
+            asyncio.run(slow_request())
+        assert service.counters["timeouts"] == 1
+
+    def test_client_without_service(self):
+        """Test that a client reports an unreachable service as unavailable"""
+        assert not ServiceClient("127.0.0.1:1", timeout=0.5).is_available()
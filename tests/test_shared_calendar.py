@@ -0,0 +1,71 @@
+"""
+Tests for the incrementally maintained shared calendar
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from portfolio_simulations.shared_calendar import SharedCalendar
+
+
+def business_days(start, end):
+    return np.array(pd.bdate_range(start, end), dtype="datetime64[ns]")
+
+
+class TestSharedCalendar:
+    """Test cases for SharedCalendar"""
+
+    def test_add_matches_union(self):
+        """Test that adding assets gives the sorted union and the number of assets per date"""
+        first, second = business_days("2020-01-01", "2020-06-30"), business_days("2020-03-01", "2020-12-31")
+        calendar = SharedCalendar()
+        calendar.add(first)
+        calendar.add(second)
+
+        np.testing.assert_array_equal(calendar.dates, np.union1d(first, second))
+        assert calendar.counts.max() == 2
+        assert calendar.counts.sum() == len(first) + len(second)
+
+    def test_remove_restores_calendar(self):
+        """Test that removing an asset drops only the dates no other asset trades on"""
+        first, second = business_days("2020-01-01", "2020-06-30"), business_days("2020-03-01", "2020-12-31")
+        calendar = SharedCalendar()
+        calendar.add(first)
+        calendar.add(second)
+        calendar.remove(first)
+
+        np.testing.assert_array_equal(calendar.dates, second)
+        assert np.all(calendar.counts == 1)
+        with pytest.raises(ValueError, match="were added"):
+            calendar.remove(first)
+
+    def test_add_days_one_at_a_time(self):
+        """Test that dates after the last one are appended in place and earlier views keep their data"""
+        first, second = business_days("2020-01-01", "2020-06-30"), business_days("2020-03-01", "2020-07-31")
+        calendar = SharedCalendar()
+        calendar.add(first)
+        calendar.add(second[:60])
+        before = calendar.dates
+        extended = None
+        for date in second[60:]:
+            calendar.add(date[None])
+            extended = calendar.dates if extended is None else extended
+
+        np.testing.assert_array_equal(calendar.dates, np.union1d(first, second))
+        np.testing.assert_array_equal(before, np.union1d(first, second[:60]))
+        assert np.shares_memory(extended, calendar.dates)
+        assert calendar.counts.sum() == len(first) + len(second)
+
+        calendar.add(business_days("2019-12-02", "2019-12-31"))
+        assert calendar.first_date == np.datetime64("2019-12-02")
+        assert np.all(np.diff(calendar.dates) > np.timedelta64(0))
+
+    def test_common_dates(self):
+        """Test that the dates every asset trades on are the intersection of their dates"""
+        first, second = business_days("2020-01-01", "2020-06-30"), business_days("2020-03-01", "2020-12-31")
+        calendar = SharedCalendar()
+        calendar.add(first)
+        calendar.add(second)
+
+        np.testing.assert_array_equal(calendar.common_dates(2), np.intersect1d(first, second))
+        np.testing.assert_array_equal(calendar.common_dates(1), np.setxor1d(first, second))
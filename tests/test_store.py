@@ -0,0 +1,116 @@
+"""
+Tests for the memory-mapped result store
+"""
+
+import numpy as np
+import pytest
+from portfolio_simulations.portfolio import Portfolio
+from portfolio_simulations.store import ResultStore
+
+
+@pytest.fixture
+def start_dates():
+    return np.arange("2010-01-01", "2010-01-26", dtype="datetime64[D]").astype("datetime64[ns]")
+
+
+class TestResultStore:
+    """Test cases for ResultStore"""
+
+    def test_write_and_read_slices(self, tmp_path, start_dates):
+        """Test that chunks are written through the memory map and read back by slice"""
+        store = ResultStore.create(str(tmp_path / "run"), start_dates, chunk_size=10, dtype="float32", metadata={"engine": "vectorized"})
+        values = np.linspace(-0.1, 0.1, 25)
+        for index in range(store.num_chunks):
+            store.write_chunk(index, values[index * 10:(index + 1) * 10])
+
+        reopened = ResultStore(str(tmp_path / "run"))
+        assert reopened.is_complete
+        assert reopened.metadata["engine"] == "vectorized"
+        assert isinstance(reopened.returns, np.memmap)
+        np.testing.assert_allclose(reopened.read(5, 15), values[5:15].astype(np.float32))
+        np.testing.assert_array_equal(reopened.start_dates, start_dates)
+        assert reopened.to_results().count == 25
+
+    def test_partial_run(self, tmp_path, start_dates):
+        """Test that only completed chunks are read and chunks are written in order"""
+        store = ResultStore.create(str(tmp_path / "run"), start_dates, chunk_size=10)
+        store.write_chunk(0, np.ones(10))
+
+        with pytest.raises(ValueError, match="cannot be written"):
+            store.write_chunk(2, np.ones(5))
+        reopened = ResultStore(str(tmp_path / "run"))
+        assert not reopened.is_complete
+        assert len(reopened.read()) == 10
+        assert len(list(reopened.iter_chunks())) == 1
+
+    def test_append_rows(self, tmp_path, start_dates):
+        """Test that rows appended to a complete store are read back after the earlier ones"""
+        store = ResultStore.create(str(tmp_path / "run"), start_dates[:20], chunk_size=8)
+        for index in range(store.num_chunks):
+            store.write_chunk(index, np.arange(index * 8, min(index * 8 + 8, 20), dtype=float))
+
+        store.append(start_dates[20:], np.arange(20.0, 25.0))
+
+        reopened = ResultStore(str(tmp_path / "run"))
+        assert reopened.is_complete
+        np.testing.assert_array_equal(reopened.read(), np.arange(25.0))
+        np.testing.assert_array_equal(reopened.start_dates, start_dates)
+
+
+class TestPortfolioStore:
+    """Test cases for persisting a return distribution"""
+
+    def test_resume_interrupted_run(self, daily_portfolio, tmp_path, monkeypatch):
+        """Test that a run resumes after its last chunk and matches an uninterrupted run"""
+        daily_portfolio.compute_return_distribution(rolling_window=3, num_simulations=500, seed=5, chunk_size=100)
+        expected = daily_portfolio.portfolio_returns
+
+        write_chunk = ResultStore.write_chunk
+
+        def interrupted_write(store, index, returns):
+            if index == 3:
+                raise KeyboardInterrupt
+            write_chunk(store, index, returns)
+
+        monkeypatch.setattr(ResultStore, "write_chunk", interrupted_write)
+        with pytest.raises(KeyboardInterrupt):
+            daily_portfolio.compute_return_distribution(rolling_window=3, num_simulations=500, seed=5, chunk_size=100, store=str(tmp_path / "run"))
+        assert ResultStore(str(tmp_path / "run")).completed_chunks == 3
+
+        monkeypatch.setattr(ResultStore, "write_chunk", write_chunk)
+        daily_portfolio.compute_return_distribution(rolling_window=3, num_simulations=500, seed=5, chunk_size=100, store=str(tmp_path / "run"))
+
+        np.testing.assert_array_equal(daily_portfolio.portfolio_returns, expected)
+        assert daily_portfolio.results.count == 500
+        assert daily_portfolio.result_store.metadata["assets"] == ["ASSET1", "ASSET2", "ASSET3"]
+
+    def test_different_run_rejected(self, daily_portfolio, tmp_path):
+        """Test that a store is not resumed with other parameters"""
+        daily_portfolio.compute_return_distribution(rolling_window=3, num_simulations=100, seed=5, store=str(tmp_path / "run"))
+
+        with pytest.raises(ValueError, match="different run"):
+            daily_portfolio.compute_return_distribution(rolling_window=3, num_simulations=100, seed=6, store=str(tmp_path / "run"))
+
+    def test_portfolio_seed_recorded(self, daily_portfolio, tmp_path):
+        """Test that the seed of the portfolio random stream is recorded and checked on resume"""
+        first = Portfolio(seed=1)
+        second = Portfolio(seed=2)
+        for portfolio in (first, second):
+            for asset in daily_portfolio.assets:
+                portfolio.add_asset(asset.asset_name, asset.weight, values=asset.closes, dates=asset.dates)
+
+        first.compute_return_distribution(rolling_window=3, num_simulations=100, store=str(tmp_path / "run"))
+
+        assert first.result_store.metadata["seed"] == 1
+        with pytest.raises(ValueError, match="different run"):
+            second.compute_return_distribution(rolling_window=3, num_simulations=100, store=str(tmp_path / "run"))
+
+    def test_changed_prices_rejected(self, daily_portfolio, tmp_path):
+        """Test that a store is not resumed on prices that changed since it was written"""
+        daily_portfolio.compute_return_distribution(rolling_window=3, num_simulations=100, seed=5, store=str(tmp_path / "run"))
+        assert len(daily_portfolio.result_store.metadata["content_keys"]) == 3
+
+        daily_portfolio.append_bars({name: ("2020-01-02", 100.0) for name in ["ASSET1", "ASSET2", "ASSET3"]})
+
+        with pytest.raises(ValueError, match="different run"):
+            daily_portfolio.compute_return_distribution(rolling_window=3, num_simulations=100, seed=5, store=str(tmp_path / "run"))
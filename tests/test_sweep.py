@@ -0,0 +1,82 @@
+"""
+Tests for the weight sweep engine
+"""
+
+import numpy as np
+import pytest
+from portfolio_simulations.sweep import dirichlet_weights, efficient_frontier, sweep_statistics, weight_grid
+
+
+class TestSweep:
+    """Test cases for the candidate weights and their statistics"""
+
+    def test_weight_grid(self):
+        """Test that the grid holds every allocation in steps summing to 1"""
+        grid = weight_grid(3, step=0.25)
+
+        assert grid.shape == (15, 3)
+        np.testing.assert_allclose(grid.sum(axis=1), 1)
+        assert len(np.unique(grid, axis=0)) == 15
+        np.testing.assert_array_equal(weight_grid(1, 0.5), [[1.0]])
+        with pytest.raises(ValueError, match="divide 1"):
+            weight_grid(3, step=0.3)
+
+    def test_dirichlet_weights(self):
+        """Test that random candidates lie on the simplex and are repeatable"""
+        weights = dirichlet_weights(4, 100, seed=0)
+
+        assert weights.shape == (100, 4)
+        np.testing.assert_allclose(weights.sum(axis=1), 1)
+        np.testing.assert_array_equal(weights, dirichlet_weights(4, 100, seed=0))
+
+    def test_statistics_match_direct_evaluation(self):
+        """Test the chunked matrix-product statistics against each candidate evaluated alone"""
+        asset_returns = np.random.default_rng(0).normal(0.05, 0.1, size=(500, 3))
+        candidates = dirichlet_weights(3, 25, seed=1)
+
+        statistics = sweep_statistics(asset_returns, candidates, quantiles=(0.1, 0.5), chunk_size=7)
+
+        for i, weights in enumerate(candidates):
+            returns = asset_returns @ weights
+            assert statistics["mean"][i] == pytest.approx(returns.mean())
+            assert statistics["std"][i] == pytest.approx(returns.std())
+            assert statistics["quantile_0.1"][i] == pytest.approx(np.quantile(returns, 0.1))
+            assert statistics["value_at_risk"][i] == pytest.approx(-np.quantile(returns, 0.05))
+            assert statistics["conditional_value_at_risk"][i] == pytest.approx(-np.sort(returns)[:25].mean())
+
+    def test_invalid_quantiles_and_level(self):
+        """Test that quantiles outside [0, 1] and levels outside (0, 1) are rejected"""
+        asset_returns = np.random.default_rng(0).normal(0.05, 0.1, size=(50, 2))
+        candidates = weight_grid(2, step=0.5)
+
+        for quantiles in [(-0.1,), (0.5, 1.5), (2.0,)]:
+            with pytest.raises(ValueError, match="quantiles"):
+                sweep_statistics(asset_returns, candidates, quantiles=quantiles)
+        for level in [0, 1, -0.5, 1.5]:
+            with pytest.raises(ValueError, match="level"):
+                sweep_statistics(asset_returns, candidates, level=level)
+        statistics = sweep_statistics(asset_returns, candidates, quantiles=(0, 1))
+        np.testing.assert_array_equal(statistics["quantile_0"], statistics["min"])
+        np.testing.assert_array_equal(statistics["quantile_1"], statistics["max"])
+
+    def test_efficient_frontier(self):
+        """Test that dominated candidates are excluded from the frontier"""
+        risk = np.array([0.1, 0.2, 0.2, 0.3, 0.15])
+        reward = np.array([0.02, 0.05, 0.04, 0.03, 0.01])
+
+        np.testing.assert_array_equal(efficient_frontier(risk, reward), [True, True, False, False, False])
+
+
+class TestPortfolioSweep:
+    """Test cases for Portfolio.sweep_weights"""
+
+    def test_grid_includes_portfolio_weights(self, daily_portfolio):
+        """Test that the candidate with the portfolio weights matches the exhaustive distribution"""
+        sweep = daily_portfolio.sweep_weights(candidates="grid", rolling_window=3, step=0.1)
+        daily_portfolio.compute_return_distribution(rolling_window=3, exhaustive=True)
+
+        row = sweep[np.isclose(sweep["ASSET1"], 0.5) & np.isclose(sweep["ASSET2"], 0.3)].iloc[0]
+        assert len(sweep) == 66
+        assert row["mean"] == pytest.approx(daily_portfolio.results.mean)
+        assert sweep["efficient"].any()
+        assert [asset.weight for asset in daily_portfolio.assets] == [0.5, 0.3, 0.2]
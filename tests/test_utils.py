@@ -2,9 +2,13 @@
 Tests for utility functions
 """
 
+import numpy as np
 import pytest
 from datetime import datetime
-from portfolio_simulations.utils import calculate_portfolio_statistics
+from portfolio_simulations.utils import (
+    bootstrap_indices, bootstrap_portfolio_paths, calculate_portfolio_statistics, daily_log_returns,
+    estimate_daily_moments, simulate_portfolio_paths
+)
 from portfolio_simulations.asset import Asset
 
 
@@ -42,3 +46,202 @@ class TestUtils:
         
         # Variance should be non-negative
         assert stats["variance"] >= 0
+
+    def test_simulate_portfolio_paths_deterministic(self):
+        """Test that paths without volatility grow at the mean log return"""
+        stats = simulate_portfolio_paths(
+            mean=[0.001, 0.001], cov=np.eye(2) * 1e-20, weights=[0.5, 0.5],
+            num_simulations=10, num_steps=100, seed=0
+        )
+
+        assert stats["terminal_wealth"] == pytest.approx(np.exp(0.1))
+        assert stats["max_drawdown"] == pytest.approx(0.0, abs=1e-9)
+        assert set(stats) == {"terminal_wealth", "max_drawdown", "volatility"}
+
+    def test_simulate_portfolio_paths_chunking(self):
+        """Test that streaming through a reducer and worker processes do not change the paths"""
+        arguments = dict(mean=[0.0003, 0.0001], cov=[[1e-4, 5e-5], [5e-5, 2e-4]], weights=[0.6, 0.4],
+                         num_simulations=1000, num_steps=50, seed=7, chunk_size=300)
+        chunks = []
+
+        whole = simulate_portfolio_paths(**arguments)
+        parallel = simulate_portfolio_paths(n_jobs=2, **arguments)
+        streamed = simulate_portfolio_paths(reducer=chunks.append, **arguments)
+
+        np.testing.assert_array_equal(parallel["terminal_wealth"], whole["terminal_wealth"])
+
+        assert streamed is None
+        assert [len(chunk["terminal_wealth"]) for chunk in chunks] == [300, 300, 300, 100]
+        np.testing.assert_allclose(np.concatenate([c["volatility"] for c in chunks]), whole["volatility"])
+
+    def test_estimate_daily_moments(self, daily_portfolio):
+        """Test estimating the moments of daily log returns from a panel"""
+        moments = estimate_daily_moments(daily_portfolio.panel)
+
+        assert moments["mean"].shape == (3,)
+        assert moments["cov"].shape == (3, 3)
+        assert np.sqrt(np.diag(moments["cov"])) == pytest.approx(0.01, rel=0.1)
+
+    def test_calculate_portfolio_statistics_seeded(self):
+        """Test that a seed makes the statistics repeatable whatever the number of workers"""
+        dates = [datetime(2020, 1, 1), datetime(2021, 1, 1)]
+        assets = [
+            Asset("TEST1", weight=0.6, values=[100.0, 110.0], dates=dates),
+            Asset("TEST2", weight=0.4, values=[200.0, 260.0], dates=dates),
+        ]
+        arguments = dict(assets=assets, start_date=dates[0], end_date=dates[1], num_simulations=5000, seed=3, chunk_size=1000)
+
+        first = calculate_portfolio_statistics(**arguments)
+        second = calculate_portfolio_statistics(n_jobs=2, **arguments)
+
+        assert first == second
+
+
+class TestVarianceReduction:
+    """Test cases for the variance reduction and early stopping of calculate_portfolio_statistics"""
+
+    @pytest.fixture
+    def arguments(self):
+        dates = [datetime(2020, 1, 1), datetime(2021, 1, 1)]
+        assets = [
+            Asset("TEST1", weight=0.6, values=[100.0, 110.0], dates=dates),
+            Asset("TEST2", weight=0.4, values=[200.0, 260.0], dates=dates),
+        ]
+        return dict(assets=assets, start_date=dates[0], end_date=dates[1], seed=5)
+
+    def test_confidence_intervals(self, arguments):
+        """Test that plain draws report intervals around their estimates covering the true mean"""
+        stats = calculate_portfolio_statistics(num_simulations=20000, **arguments)
+        low, high = stats["confidence_intervals"]["mean_return"]
+
+        assert stats["num_simulations"] == 20000
+        assert low < 0.18 < high
+        assert stats["standard_errors"]["mean_return"] == pytest.approx(0.1 / np.sqrt(20000), rel=0.05)
+        var_low, var_high = stats["confidence_intervals"]["value_at_risk"]
+        assert var_low <= stats["value_at_risk"] <= var_high
+        assert stats["value_at_risk"] == pytest.approx(-(0.18 - 1.645 * 0.1), abs=0.01)
+
+    def test_antithetic_and_control_are_exact(self, arguments):
+        """Test that antithetic pairs and the control variate give the exact mean of the affine model"""
+        antithetic = calculate_portfolio_statistics(num_simulations=1001, variance_reduction="antithetic", **arguments)
+        control = calculate_portfolio_statistics(num_simulations=1000, variance_reduction=["control"], **arguments)
+        plain = calculate_portfolio_statistics(num_simulations=1000, **arguments)
+
+        assert antithetic["num_simulations"] == 1002
+        assert antithetic["mean_return"] == pytest.approx(control["mean_return"])
+        assert antithetic["standard_errors"]["mean_return"] == pytest.approx(0.0, abs=1e-12)
+        assert control["standard_errors"]["mean_return"] == 0.0
+        assert control["variance"] == pytest.approx(plain["variance"])
+
+    def test_target_precision_stops_early(self, arguments):
+        """Test that drawing stops once the standard error of the value at risk meets its target"""
+        stats = calculate_portfolio_statistics(
+            num_simulations=1000000, chunk_size=2000, target_precision={"value_at_risk": 0.005}, **arguments
+        )
+
+        assert stats["converged"]
+        assert stats["standard_errors"]["value_at_risk"] <= 0.005
+        assert stats["num_simulations"] < 1000000
+        assert stats["num_simulations"] % 2000 == 0
+
+    def test_target_precision_rounds_are_not_revisited(self, arguments, monkeypatch):
+        """Test that every chunk is summarized once however many rounds are checked"""
+        from portfolio_simulations import utils
+        updates = []
+        original = utils._ShockAccumulator.update
+
+        def counting_update(self, shocks):
+            updates.append(len(shocks))
+            original(self, shocks)
+
+        monkeypatch.setattr(utils._ShockAccumulator, "update", counting_update)
+        stats = calculate_portfolio_statistics(num_simulations=50000, chunk_size=1000, target_precision=1e-9, **arguments)
+
+        assert updates == [1000] * 50
+        assert stats["num_simulations"] == 50000
+        assert stats["standard_errors"]["mean_return"] == pytest.approx(0.1 / np.sqrt(50000), rel=0.05)
+
+    def test_target_precision_independent_of_n_jobs(self, arguments):
+        """Test that drawing stops at the same chunk with worker processes"""
+        options = dict(num_simulations=100000, chunk_size=1000, target_precision=2e-3, **arguments)
+        serial = calculate_portfolio_statistics(**options)
+        parallel = calculate_portfolio_statistics(n_jobs=2, **options)
+
+        assert serial["converged"]
+        assert serial["num_simulations"] < 100000
+        assert parallel["num_simulations"] == serial["num_simulations"]
+        assert parallel["mean_return"] == serial["mean_return"]
+        assert parallel["value_at_risk"] == serial["value_at_risk"]
+
+    def test_target_precision_not_met(self, arguments):
+        """Test that the budget of simulations is not exceeded when the target is out of reach"""
+        stats = calculate_portfolio_statistics(num_simulations=3000, chunk_size=1000, target_precision=1e-9, **arguments)
+
+        assert not stats["converged"]
+        assert stats["num_simulations"] == 3000
+
+    def test_sobol(self, arguments):
+        """Test that scrambled Sobol shocks estimate the mean with a replicate error"""
+        pytest.importorskip("scipy")
+        stats = calculate_portfolio_statistics(num_simulations=4096, chunk_size=1024, variance_reduction="sobol", **arguments)
+
+        assert stats["mean_return"] == pytest.approx(0.18, abs=0.005)
+        assert stats["standard_errors"]["mean_return"] < 0.1 / np.sqrt(4096)
+
+    def test_invalid_options(self, arguments):
+        """Test that unknown methods and statistics are rejected"""
+        with pytest.raises(ValueError, match="variance reduction"):
+            calculate_portfolio_statistics(variance_reduction="importance", **arguments)
+        with pytest.raises(ValueError, match="target_precision"):
+            calculate_portfolio_statistics(target_precision={"sharpe_ratio": 0.01}, **arguments)
+        with pytest.raises(ValueError, match="num_simulations"):
+            calculate_portfolio_statistics(num_simulations=0, **arguments)
+
+    def test_sobol_single_chunk(self, arguments):
+        """Test that Sobol shocks in a single chunk warn that their error is unknown"""
+        pytest.importorskip("scipy")
+        with pytest.warns(UserWarning, match="single chunk"):
+            stats = calculate_portfolio_statistics(num_simulations=1024, variance_reduction="sobol", **arguments)
+
+        assert stats["standard_errors"]["mean_return"] == np.inf
+
+
+class TestBootstrap:
+    """Test cases for the block-bootstrap path engine"""
+
+    def test_circular_blocks(self):
+        """Test that circular blocks are runs of block_size consecutive days wrapping around"""
+        days = bootstrap_indices(100, 50, 60, method="circular", block_size=20, seed=0)
+
+        assert days.shape == (50, 60)
+        blocks = days.reshape(50, 3, 20)
+        assert np.all(np.diff(blocks, axis=2) % 100 == 1)
+
+    def test_stationary_block_lengths(self):
+        """Test that stationary blocks have a geometric length with the requested mean"""
+        days = bootstrap_indices(10000, 200, 500, method="stationary", block_size=10, seed=0)
+
+        breaks = (np.diff(days, axis=1) % 10000) != 1
+        assert breaks.mean() == pytest.approx(0.1, abs=0.01)
+
+    def test_bootstrap_paths_use_aligned_days(self, daily_portfolio):
+        """Test that paths made of one block reproduce consecutive historical days of all assets together"""
+        returns = daily_log_returns(daily_portfolio.panel)
+        weights = np.array([0.5, 0.3, 0.2])
+
+        stats = bootstrap_portfolio_paths(returns, weights, num_simulations=500, num_steps=2, method="circular", block_size=2, seed=0)
+
+        historical = np.exp(returns + np.roll(returns, -1, axis=0)) @ weights
+        assert np.all(np.isin(np.round(stats["terminal_wealth"], 12), np.round(historical, 12)))
+
+    def test_bootstrap_paths_deterministic(self, daily_portfolio):
+        """Test that paths are repeatable and do not depend on the chunking across workers"""
+        returns = daily_log_returns(daily_portfolio.panel)
+        kwargs = dict(num_simulations=300, num_steps=252, block_size=5, chunk_size=100, seed=3)
+
+        first = bootstrap_portfolio_paths(returns, [0.5, 0.3, 0.2], **kwargs)
+        second = bootstrap_portfolio_paths(returns, [0.5, 0.3, 0.2], n_jobs=2, **kwargs)
+
+        np.testing.assert_array_equal(first["terminal_wealth"], second["terminal_wealth"])
+        with pytest.raises(ValueError, match="Unknown bootstrap method"):
+            bootstrap_portfolio_paths(returns, [0.5, 0.3, 0.2], method="moving")
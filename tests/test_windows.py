@@ -0,0 +1,68 @@
+"""
+Tests for the vectorized rolling-window functions
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from datetime import datetime
+from portfolio_simulations.asset import Asset
+from portfolio_simulations.panel import PricePanel
+from portfolio_simulations.windows import candidate_start_rows, rolling_window_returns
+
+
+class TestWindows:
+    """Test cases for the rolling-window engine"""
+
+    def test_candidate_start_rows_respect_bounds(self, daily_portfolio):
+        """Test that every candidate window fits inside the requested dates"""
+        panel = daily_portfolio.panel
+        dates = panel.dates
+
+        rows = candidate_start_rows(panel, 2, datetime(2012, 1, 1), datetime(2018, 1, 1))
+
+        assert dates[rows].min() >= np.datetime64("2012-01-01")
+        last_end = pd.Timestamp(dates[rows].max()) + pd.DateOffset(years=2)
+        assert last_end <= pd.Timestamp(2018, 1, 1)
+
+    def test_rolling_window_returns_match_get_returns(self, daily_portfolio):
+        """Test that batched window returns match Asset.get_returns"""
+        panel = daily_portfolio.panel
+        dates = panel.dates
+        rows = candidate_start_rows(panel, 3)[::250]
+
+        returns = rolling_window_returns(panel, rows, 3)
+
+        for i, row in enumerate(rows):
+            start = pd.Timestamp(dates[row])
+            for j, asset in enumerate(daily_portfolio.assets):
+                asset.set_window(start, start + pd.DateOffset(years=3))
+                assert returns[i, j] == pytest.approx(asset.get_returns(), rel=1e-12)
+
+    def test_rolling_window_returns_with_gaps(self):
+        """Test that assets with different calendars use their own first and last price"""
+        dates1 = [datetime(2020, 1, 1), datetime(2020, 1, 3), datetime(2020, 12, 30), datetime(2021, 1, 5)]
+        dates2 = [datetime(2020, 1, 2), datetime(2020, 1, 3), datetime(2021, 1, 2)]
+        asset1 = Asset("A", weight=0.5, values=[100.0, 101.0, 110.0, 111.0], dates=dates1)
+        asset2 = Asset("B", weight=0.5, values=[50.0, 51.0, 60.0], dates=dates2)
+        panel = PricePanel.from_assets([asset1, asset2])
+
+        returns = rolling_window_returns(panel, np.array([1]), 1)
+
+        start, end = datetime(2020, 1, 2), datetime(2021, 1, 2)
+        assert returns[0, 0] == pytest.approx(asset1.window(start, end).get_returns())
+        assert returns[0, 1] == pytest.approx(asset2.window(start, end).get_returns())
+
+    def test_forward_fill_keeps_asset_bounds(self):
+        """Test that ffill does not add windows after an asset stopped trading"""
+        dates = pd.bdate_range("2010-01-01", "2019-12-31")
+        early = dates[dates <= "2012-12-31"]
+        assets = [
+            Asset("A", weight=0.5, values=np.linspace(100, 200, len(dates)), dates=dates.to_numpy()),
+            Asset("C", weight=0.5, values=np.linspace(50, 60, len(early)), dates=early.to_numpy()),
+        ]
+
+        filled = candidate_start_rows(PricePanel.from_assets(assets, fill="ffill"), 1)
+        unfilled = candidate_start_rows(PricePanel.from_assets(assets), 1)
+
+        np.testing.assert_array_equal(filled, unfilled)